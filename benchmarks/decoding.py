@@ -0,0 +1,150 @@
+"""Compare the full and selective decoding of PyPI JSON API documents.
+
+For each payload this measures the time taken, and the peak memory
+allocated, to go from the raw body of the response to a `Package`:
+
+- "full" decodes the whole document with `json.loads`, as PISpy used to.
+- "selective" feeds the body through the incremental selective decoder, a
+  chunk at a time, as happens when a response is streamed.
+
+Payloads can be given as files, or fetched from PyPI by name:
+
+    python benchmarks/decoding.py --fetch numpy boto3 botocore
+    python benchmarks/decoding.py recorded/*.json
+"""
+
+##############################################################################
+# Python imports.
+import sys
+from argparse import ArgumentParser, Namespace
+from json import dumps, loads
+from pathlib import Path
+from time import perf_counter
+from tracemalloc import get_traced_memory, reset_peak, start, stop
+from typing import Any, Callable
+from urllib.request import urlopen
+
+##############################################################################
+# Local imports.
+from pispy.data import Package
+from pispy.data.cache import CacheEntry
+
+
+##############################################################################
+def full(body: bytes) -> Package:
+    """Decode a document in full.
+
+    Args:
+        body: The body of the response.
+
+    Returns:
+        The package.
+    """
+    return Package.from_json(loads(body))
+
+
+##############################################################################
+def selective(body: bytes, chunk_size: int = 65536) -> Package:
+    """Decode a document selectively, a chunk at a time.
+
+    Args:
+        body: The body of the response.
+        chunk_size: The size of the chunks to feed to the decoder.
+
+    Returns:
+        The package.
+    """
+    decoder = Package._decoder()
+    for offset in range(0, len(body), chunk_size):
+        decoder.feed(body[offset : offset + chunk_size])
+    return Package._from_decoder(CacheEntry("", 200, b""), decoder)[1]
+
+
+##############################################################################
+def measure(
+    decode: Callable[[bytes], Package], body: bytes, runs: int
+) -> dict[str, float]:
+    """Measure the time and peak memory taken to decode a body.
+
+    Args:
+        decode: The decoding function to measure.
+        body: The body to decode.
+        runs: The number of timed runs to make.
+
+    Returns:
+        The best time, in milliseconds, and peak memory, in megabytes.
+    """
+    best = float("inf")
+    for _ in range(runs):
+        started = perf_counter()
+        decode(body)
+        best = min(best, perf_counter() - started)
+    start()
+    reset_peak()
+    decode(body)
+    _, peak = get_traced_memory()
+    stop()
+    return {"milliseconds": best * 1000, "peak_megabytes": peak / 1_000_000}
+
+
+##############################################################################
+def payloads(arguments: Namespace) -> dict[str, bytes]:
+    """Load or fetch the payloads to benchmark with.
+
+    Args:
+        arguments: The command line arguments.
+
+    Returns:
+        The payloads, keyed by name.
+    """
+    found = {path.stem: path.read_bytes() for path in arguments.payloads}
+    for name in arguments.fetch:
+        with urlopen(f"https://pypi.org/pypi/{name}/json") as response:
+            found[name] = response.read()
+    return found
+
+
+##############################################################################
+def get_args() -> Namespace:
+    """Get the command line arguments.
+
+    Returns:
+        The parsed command line arguments.
+    """
+    parser = ArgumentParser(description="Compare full and selective decoding.")
+    parser.add_argument("payloads", nargs="*", type=Path, help="Payload files")
+    parser.add_argument("--fetch", nargs="*", default=[], help="Packages to fetch")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per payload")
+    parser.add_argument("--output", type=Path, help="File to write the results to")
+    return parser.parse_args()
+
+
+##############################################################################
+def main() -> None:
+    """Main entry point for the benchmark."""
+    arguments = get_args()
+    results: dict[str, Any] = {}
+    for name, body in payloads(arguments).items():
+        results[name] = {
+            "bytes": len(body),
+            "full": measure(full, body, arguments.runs),
+            "selective": measure(selective, body, arguments.runs),
+        }
+        print(
+            f"{name:20} {len(body):>10,} bytes  "
+            + "  ".join(
+                f"{approach}: {results[name][approach]['milliseconds']:7.1f}ms "
+                f"{results[name][approach]['peak_megabytes']:6.1f}MB"
+                for approach in ("full", "selective")
+            ),
+            file=sys.stderr,
+        )
+    if arguments.output:
+        arguments.output.write_text(dumps(results, indent=4))
+
+
+##############################################################################
+if __name__ == "__main__":
+    main()
+
+### decoding.py ends here
@@ -0,0 +1,418 @@
+"""Benchmark looking up, and showing, packages from recorded responses.
+
+Responses from the JSON API are recorded once, to `benchmarks/fixtures`,
+and are then replayed through a stub transport, so that the results don't
+depend on the network (other than through `--latency`, which simulates
+it). For each recorded package this measures:
+
+- The time taken by, and the memory allocated by, `Package.from_pypi`.
+- The time taken to mount the details of the package, and the details of
+  each of its files.
+- The time taken from asking `PackageInformation` to show the package to
+  the display being refreshed, in a headless application.
+
+The results are written as JSON, and can be compared against a previous run
+(of another branch, say) to catch regressions:
+
+    python benchmarks/lookups.py --record requests rich numpy boto3
+    python benchmarks/lookups.py --output before.json
+    python benchmarks/lookups.py --compare before.json
+"""
+
+##############################################################################
+# Python imports.
+import asyncio
+import gc
+import sys
+from argparse import ArgumentParser, Namespace
+from json import dumps, loads
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from tracemalloc import get_traced_memory, reset_peak, start, stop
+from typing import Any, Awaitable, Callable
+from urllib.request import urlopen
+
+##############################################################################
+# httpx imports.
+import httpx
+
+##############################################################################
+# Textual imports.
+from textual.app import App, ComposeResult
+from textual.containers import Vertical
+from textual.pilot import Pilot
+
+##############################################################################
+# Local imports.
+from pispy import __version__
+from pispy.data import (
+    CacheSettings,
+    IndexSettings,
+    Package,
+    configure_cache,
+    configure_index,
+    open_client,
+)
+from pispy.data.index import index
+from pispy.data.package_cache import packages
+from pispy.widgets import PackageInformation
+from pispy.widgets.package_information import FileDetails, PackageDetails
+
+##############################################################################
+FIXTURES = Path(__file__).parent / "fixtures"
+"""The default location of the recorded responses."""
+
+
+##############################################################################
+def record(names: list[str], fixtures: Path) -> None:
+    """Record the responses for some packages.
+
+    Args:
+        names: The names of the packages to record.
+        fixtures: The directory to record the responses to.
+    """
+    fixtures.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        with urlopen(f"{index().json_url}/{name}/json") as response:
+            (fixtures / f"{name}.json").write_bytes(response.read())
+        print(f"Recorded {name}", file=sys.stderr)
+
+
+##############################################################################
+def stub_transport(recorded: dict[str, bytes], latency: float) -> httpx.MockTransport:
+    """Make a transport that replays recorded responses.
+
+    Args:
+        recorded: The recorded responses, keyed by package name.
+        latency: The time, in seconds, to take to respond.
+
+    Returns:
+        The transport. Anything that wasn't recorded is reported as not
+        found.
+    """
+
+    async def respond(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        prefix, name, *rest = request.url.path.strip("/").split("/")
+        if prefix == "pypi" and rest == ["json"] and name in recorded:
+            return httpx.Response(
+                200,
+                content=recorded[name],
+                headers={"content-type": "application/json"},
+            )
+        return httpx.Response(404)
+
+    return httpx.MockTransport(respond)
+
+
+##############################################################################
+def timings(measured: list[float]) -> dict[str, float]:
+    """Summarise a set of timings.
+
+    Args:
+        measured: The timings, in seconds.
+
+    Returns:
+        The best and median timings, in milliseconds.
+    """
+    return {
+        "best_milliseconds": min(measured) * 1000,
+        "median_milliseconds": median(measured) * 1000,
+    }
+
+
+##############################################################################
+async def timed(runs: int, measure: Callable[[], Awaitable[object]]) -> list[float]:
+    """Time a number of runs of some code.
+
+    Args:
+        runs: The number of runs.
+        measure: The code to time.
+
+    Returns:
+        The time taken for each run, in seconds.
+    """
+    measured = []
+    for _ in range(runs):
+        started = perf_counter()
+        await measure()
+        measured.append(perf_counter() - started)
+    return measured
+
+
+##############################################################################
+async def look_up(name: str) -> Package:
+    """Look up a package, without the help of any recently-seen packages.
+
+    Args:
+        name: The name of the package.
+
+    Returns:
+        The package.
+    """
+    packages().clear()
+    found, package = await Package.from_pypi(name)
+    assert found, f"{name} was not found"
+    return package
+
+
+##############################################################################
+async def parsing(name: str, runs: int) -> dict[str, float]:
+    """Measure looking up a package.
+
+    Args:
+        name: The name of the package.
+        runs: The number of timed runs to make.
+
+    Returns:
+        The timings, along with the peak memory allocated while looking the
+        package up and the memory held by the package afterwards, in
+        megabytes.
+    """
+    measured = await timed(runs, lambda: look_up(name))
+    gc.collect()
+    start()
+    reset_peak()
+    baseline, _ = get_traced_memory()
+    package = await look_up(name)
+    gc.collect()
+    held, peak = get_traced_memory()
+    stop()
+    del package
+    packages().clear()
+    return {
+        **timings(measured),
+        "peak_megabytes": (peak - baseline) / 1_000_000,
+        "held_megabytes": (held - baseline) / 1_000_000,
+    }
+
+
+##############################################################################
+class Harness(App[None]):
+    """An application to show packages in."""
+
+    def compose(self) -> ComposeResult:
+        """Compose the application.
+
+        Returns:
+            The application's layout.
+        """
+        yield PackageInformation()
+        yield Vertical(id="scratch")
+
+
+##############################################################################
+async def composing(
+    pilot: Pilot[None], package: Package, runs: int
+) -> dict[str, dict[str, float]]:
+    """Measure mounting the details of a package, and of its files.
+
+    Args:
+        pilot: The pilot of the application.
+        package: The package.
+        runs: The number of timed runs to make.
+
+    Returns:
+        The timings for the details of the package and of its files.
+    """
+    scratch = pilot.app.query_one("#scratch")
+
+    async def details() -> None:
+        await scratch.mount(pane := PackageDetails(package))
+        await pane.remove()
+
+    await scratch.mount(files := FileDetails())
+
+    async def file_details() -> None:
+        for package_url in package.urls:
+            await files.show(package_url)
+
+    results = {
+        "details": timings(await timed(runs, details)),
+        "files": {
+            "count": len(package.urls),
+            **timings(await timed(runs, file_details)),
+        },
+    }
+    await files.remove()
+    return results
+
+
+##############################################################################
+async def showing(pilot: Pilot[None], name: str, runs: int) -> dict[str, float]:
+    """Measure the time to show a package, up to it being on the display.
+
+    Args:
+        pilot: The pilot of the application.
+        name: The name of the package.
+        runs: The number of timed runs to make.
+
+    Returns:
+        The timings.
+    """
+    information = pilot.app.query_one(PackageInformation)
+
+    async def show() -> None:
+        packages().clear()
+        assert await information.show(name).wait(), f"{name} was not shown"
+        await pilot.pause()
+
+    return timings(await timed(runs, show))
+
+
+##############################################################################
+async def benchmark(recorded: dict[str, bytes], runs: int) -> dict[str, Any]:
+    """Run the benchmarks against the recorded responses.
+
+    Args:
+        recorded: The recorded responses, keyed by package name.
+        runs: The number of timed runs to make of each benchmark.
+
+    Returns:
+        The results of the benchmarks, keyed by package name.
+    """
+    results: dict[str, Any] = {
+        name: {"bytes": len(body), "parse": await parsing(name, runs)}
+        for name, body in recorded.items()
+    }
+    async with Harness().run_test(size=(120, 40)) as pilot:
+        for name in recorded:
+            package = await look_up(name)
+            results[name] |= await composing(pilot, package, runs)
+            results[name]["show"] = await showing(pilot, name, runs)
+            print(f"Measured {name}", file=sys.stderr)
+    return results
+
+
+##############################################################################
+def measurements(results: dict[str, Any], path: str = "") -> dict[str, float]:
+    """Flatten the measurements in a set of results.
+
+    Args:
+        results: The results to flatten.
+        path: The path to the results.
+
+    Returns:
+        The measurements, keyed by their path within the results.
+    """
+    found: dict[str, float] = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            found |= measurements(value, f"{path}{key}.")
+        elif key.endswith(("_milliseconds", "_megabytes")):
+            found[f"{path}{key}"] = value
+    return found
+
+
+##############################################################################
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> bool:
+    """Compare results against a baseline, reporting any regressions.
+
+    Args:
+        results: The results of this run.
+        baseline: The results to compare against.
+        tolerance: The fraction by which a measurement may grow before it
+            counts as a regression.
+
+    Returns:
+        `True` if there were no regressions, `False` if there were.
+    """
+    ok = True
+    before = measurements(baseline["packages"])
+    for key, after in measurements(results["packages"]).items():
+        if not before.get(key):
+            continue
+        change = (after - before[key]) / before[key]
+        regressed = change > tolerance
+        ok &= not regressed
+        print(
+            f"{key:45} {before[key]:>10.2f} -> {after:>10.2f} "
+            f"({change:+.1%}){' REGRESSION' if regressed else ''}"
+        )
+    return ok
+
+
+##############################################################################
+def get_args() -> Namespace:
+    """Get the command line arguments.
+
+    Returns:
+        The parsed command line arguments.
+    """
+    parser = ArgumentParser(
+        description="Benchmark looking up, and showing, recorded packages."
+    )
+    parser.add_argument(
+        "packages", nargs="*", help="The recorded packages to use (default: all)"
+    )
+    parser.add_argument(
+        "--fixtures",
+        type=Path,
+        default=FIXTURES,
+        help="The directory of recorded responses",
+    )
+    parser.add_argument(
+        "--record", nargs="+", default=[], help="Packages to record responses for"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Simulated time, in milliseconds, for a response to arrive",
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Runs per benchmark")
+    parser.add_argument("--output", type=Path, help="File to write the results to")
+    parser.add_argument("--compare", type=Path, help="Results to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Allowed fractional slowdown before flagging a regression",
+    )
+    return parser.parse_args()
+
+
+##############################################################################
+def main() -> None:
+    """Main entry point for the benchmark."""
+    arguments = get_args()
+    if arguments.record:
+        record(arguments.record, arguments.fixtures)
+    recorded = {
+        path.stem: path.read_bytes()
+        for path in sorted(arguments.fixtures.glob("*.json"))
+        if not arguments.packages or path.stem in arguments.packages
+    }
+    if not recorded:
+        sys.exit(f"No recorded responses in {arguments.fixtures}; use --record")
+
+    # Nothing should come from, or go to, anywhere but the recordings.
+    configure_cache(CacheSettings(enabled=False))
+    configure_index(IndexSettings())
+    open_client(transport=stub_transport(recorded, arguments.latency / 1000))
+
+    results = {
+        "python": sys.version.split()[0],
+        "pispy": __version__,
+        "runs": arguments.runs,
+        "latency_milliseconds": arguments.latency,
+        "packages": asyncio.run(benchmark(recorded, arguments.runs)),
+    }
+    if arguments.output:
+        arguments.output.write_text(dumps(results, indent=4))
+    else:
+        print(dumps(results, indent=4))
+    if arguments.compare and not compare(
+        results, loads(arguments.compare.read_text()), arguments.tolerance
+    ):
+        sys.exit(1)
+
+
+##############################################################################
+if __name__ == "__main__":
+    main()
+
+### lookups.py ends here
@@ -0,0 +1,120 @@
+"""Measure the time taken to load, and to search, the index of project names.
+
+This builds an index from the project listing of the simple API (or from a
+saved copy of it), then reports the time taken to load the index and to
+make prefix and fuzzy suggestions with it:
+
+    python benchmarks/names.py
+    python benchmarks/names.py --listing simple.html requests reqeusts djnago
+"""
+
+##############################################################################
+# Python imports.
+import sys
+from argparse import ArgumentParser, Namespace
+from json import dumps
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Callable
+from urllib.request import Request, urlopen
+
+##############################################################################
+# Local imports.
+from pispy.data.name_index import NameIndex, _parse
+from pispy.data.simple import ACCEPT
+
+
+##############################################################################
+def listing(arguments: Namespace) -> list[str]:
+    """Load or fetch the project listing to build the index from.
+
+    Args:
+        arguments: The command line arguments.
+
+    Returns:
+        The names of the projects.
+    """
+    if arguments.listing:
+        return _parse(arguments.listing.read_bytes(), arguments.content_type)
+    with urlopen(
+        Request("https://pypi.org/simple/", headers={"Accept": ACCEPT})
+    ) as response:
+        return _parse(response.read(), response.headers.get("Content-Type", ""))
+
+
+##############################################################################
+def best_of(runs: int, measure: Callable[[], object]) -> float:
+    """Get the best time, in milliseconds, over a number of runs.
+
+    Args:
+        runs: The number of runs.
+        measure: The code to time.
+
+    Returns:
+        The best time, in milliseconds.
+    """
+    best = float("inf")
+    for _ in range(runs):
+        started = perf_counter()
+        measure()
+        best = min(best, perf_counter() - started)
+    return best * 1000
+
+
+##############################################################################
+def get_args() -> Namespace:
+    """Get the command line arguments.
+
+    Returns:
+        The parsed command line arguments.
+    """
+    parser = ArgumentParser(description="Measure the project name index.")
+    parser.add_argument(
+        "queries",
+        nargs="*",
+        default=["req", "reqeusts", "djnago", "textaul", "typing_ex", "sqlalchemmy"],
+        help="The text to make suggestions for",
+    )
+    parser.add_argument("--listing", type=Path, help="A saved project listing")
+    parser.add_argument(
+        "--content-type", default="text/html", help="The type of the saved listing"
+    )
+    parser.add_argument("--runs", type=int, default=50, help="Timed runs per query")
+    parser.add_argument("--output", type=Path, help="File to write the results to")
+    return parser.parse_args()
+
+
+##############################################################################
+def main() -> None:
+    """Main entry point for the benchmark."""
+    arguments = get_args()
+    names = listing(arguments)
+    started = perf_counter()
+    content = NameIndex.build(names)
+    build = perf_counter() - started
+    with TemporaryDirectory() as directory:
+        (path := Path(directory) / NameIndex.FILENAME).write_bytes(content)
+        index = NameIndex.load(path)
+        results = {
+            "python": sys.version.split()[0],
+            "names": len(index),
+            "index_bytes": len(content),
+            "build_seconds": build,
+            "load_milliseconds": best_of(arguments.runs, lambda: NameIndex.load(path)),
+            "suggest_milliseconds": {
+                query: best_of(arguments.runs, lambda: index.suggest(query))
+                for query in arguments.queries
+            },
+        }
+    if arguments.output:
+        arguments.output.write_text(dumps(results, indent=4))
+    else:
+        print(dumps(results, indent=4))
+
+
+##############################################################################
+if __name__ == "__main__":
+    main()
+
+### names.py ends here
@@ -0,0 +1,119 @@
+"""Measure the memory held by, and the time taken to build, packages.
+
+This loads recorded PyPI JSON API documents, builds a `Package` from each
+of them, a number of times over (as happens when many packages, or many
+versions of a package, are held at once), and reports the memory that the
+packages keep hold of once everything else has been freed:
+
+    python benchmarks/packages.py recorded/*.json --copies 20
+    python benchmarks/packages.py --fetch numpy boto3 requests django
+"""
+
+##############################################################################
+# Python imports.
+import gc
+import sys
+from argparse import ArgumentParser, Namespace
+from json import dumps
+from pathlib import Path
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+from typing import Any
+from urllib.request import urlopen
+
+##############################################################################
+# Local imports.
+from pispy.data import Package
+from pispy.data.cache import CacheEntry
+
+
+##############################################################################
+def build(body: bytes) -> Package:
+    """Build a package from the body of a response from the API.
+
+    Args:
+        body: The body of the response.
+
+    Returns:
+        The package.
+    """
+    return Package._from_response(CacheEntry("", 200, body))[1]
+
+
+##############################################################################
+def benchmark(bodies: list[bytes], copies: int) -> dict[str, Any]:
+    """Measure the memory held by, and the time to build, packages.
+
+    Args:
+        bodies: The bodies of the responses to build packages from.
+        copies: The number of times to build each package.
+
+    Returns:
+        The results of the benchmark.
+    """
+    gc.collect()
+    start()
+    baseline, _ = get_traced_memory()
+    started = perf_counter()
+    held = [build(body) for _ in range(copies) for body in bodies]
+    elapsed = perf_counter() - started
+    gc.collect()
+    retained, _ = get_traced_memory()
+    stop()
+    return {
+        "python": sys.version.split()[0],
+        "packages": len(held),
+        "files": sum(len(package.urls) for package in held),
+        "bytes_per_package": (retained - baseline) // len(held),
+        "milliseconds_per_package": elapsed * 1000 / len(held),
+    }
+
+
+##############################################################################
+def payloads(arguments: Namespace) -> list[bytes]:
+    """Load or fetch the payloads to benchmark with.
+
+    Args:
+        arguments: The command line arguments.
+
+    Returns:
+        The payloads.
+    """
+    found = [path.read_bytes() for path in arguments.payloads]
+    for name in arguments.fetch:
+        with urlopen(f"https://pypi.org/pypi/{name}/json") as response:
+            found.append(response.read())
+    return found
+
+
+##############################################################################
+def get_args() -> Namespace:
+    """Get the command line arguments.
+
+    Returns:
+        The parsed command line arguments.
+    """
+    parser = ArgumentParser(description="Measure the memory held by packages.")
+    parser.add_argument("payloads", nargs="*", type=Path, help="Payload files")
+    parser.add_argument("--fetch", nargs="*", default=[], help="Packages to fetch")
+    parser.add_argument("--copies", type=int, default=10, help="Copies of each")
+    parser.add_argument("--output", type=Path, help="File to write the results to")
+    return parser.parse_args()
+
+
+##############################################################################
+def main() -> None:
+    """Main entry point for the benchmark."""
+    arguments = get_args()
+    results = benchmark(payloads(arguments), arguments.copies)
+    if arguments.output:
+        arguments.output.write_text(dumps(results, indent=4))
+    else:
+        print(dumps(results, indent=4))
+
+
+##############################################################################
+if __name__ == "__main__":
+    main()
+
+### packages.py ends here
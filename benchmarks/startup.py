@@ -0,0 +1,201 @@
+"""Benchmark the startup time of PISpy.
+
+This measures, over a number of runs:
+
+- The time taken for `pispy --version` to exit.
+- The time taken for the application to draw its first frame.
+- The import time of the `--version` path, as reported by `-X importtime`,
+  along with the modules that contribute the most to it.
+
+The results are written as JSON, and can be compared against a previous run
+to catch regressions:
+
+    python benchmarks/startup.py --output before.json
+    python benchmarks/startup.py --compare before.json
+"""
+
+##############################################################################
+# Python imports.
+import sys
+from argparse import ArgumentParser, Namespace
+from json import dumps, loads
+from pathlib import Path
+from statistics import median
+from subprocess import PIPE, Popen, run
+from time import perf_counter
+from typing import Any
+
+##############################################################################
+# The code used to time how long it takes to get to the first frame.
+FIRST_FRAME = """
+from pispy.app import PISpy
+
+class FirstFrame(PISpy):
+    def on_ready(self) -> None:
+        print("ready", flush=True)
+        self.exit()
+
+FirstFrame(None).run(headless=True)
+"""
+
+
+##############################################################################
+def time_to_exit(runs: int) -> list[float]:
+    """Time how long `pispy --version` takes to run.
+
+    Args:
+        runs: The number of runs to make.
+
+    Returns:
+        The time taken for each run, in seconds.
+    """
+    timings = []
+    for _ in range(runs):
+        start = perf_counter()
+        run([sys.executable, "-m", "pispy", "--version"], check=True, stdout=PIPE)
+        timings.append(perf_counter() - start)
+    return timings
+
+
+##############################################################################
+def time_to_first_frame(runs: int) -> list[float]:
+    """Time how long the application takes to draw its first frame.
+
+    Args:
+        runs: The number of runs to make.
+
+    Returns:
+        The time taken for each run, in seconds.
+    """
+    timings = []
+    for _ in range(runs):
+        start = perf_counter()
+        with Popen([sys.executable, "-c", FIRST_FRAME], stdout=PIPE, text=True) as app:
+            assert app.stdout is not None
+            app.stdout.readline()
+            timings.append(perf_counter() - start)
+    return timings
+
+
+##############################################################################
+def import_times() -> tuple[int, dict[str, int]]:
+    """Get the import times of the modules on the `--version` path.
+
+    Returns:
+        The total import time, and a mapping of module name to cumulative
+        import time; all times are in microseconds.
+    """
+    report = run(
+        [sys.executable, "-X", "importtime", "-m", "pispy", "--version"],
+        check=True,
+        stdout=PIPE,
+        stderr=PIPE,
+        text=True,
+    ).stderr
+    total = 0
+    times: dict[str, int] = {}
+    for line in report.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module = line.removeprefix("import time:").split("|")
+            if cumulative.strip().isdigit():
+                times[module.strip()] = int(cumulative)
+                # Top-level imports are indented by a single space.
+                if not module.startswith("  "):
+                    total += int(cumulative)
+    return total, times
+
+
+##############################################################################
+def benchmark(runs: int) -> dict[str, Any]:
+    """Run the startup benchmarks.
+
+    Args:
+        runs: The number of runs to make of each benchmark.
+
+    Returns:
+        The results of the benchmarks.
+    """
+    total_import_time, imports = import_times()
+    return {
+        "python": sys.version.split()[0],
+        "runs": runs,
+        "version_exit_seconds": median(time_to_exit(runs)),
+        "first_frame_seconds": median(time_to_first_frame(runs)),
+        "version_import_microseconds": total_import_time,
+        "slowest_imports": dict(
+            sorted(imports.items(), key=lambda item: item[1], reverse=True)[:10]
+        ),
+    }
+
+
+##############################################################################
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> bool:
+    """Compare results against a baseline, reporting any regressions.
+
+    Args:
+        results: The results of this run.
+        baseline: The results to compare against.
+        tolerance: The fraction by which a timing may grow before it counts
+            as a regression.
+
+    Returns:
+        `True` if there were no regressions, `False` if there were.
+    """
+    ok = True
+    for key in (
+        "version_exit_seconds",
+        "first_frame_seconds",
+        "version_import_microseconds",
+    ):
+        change = (results[key] - baseline[key]) / baseline[key]
+        regressed = change > tolerance
+        ok &= not regressed
+        print(
+            f"{key:30} {baseline[key]:>12.4f} -> {results[key]:>12.4f} "
+            f"({change:+.1%}){' REGRESSION' if regressed else ''}"
+        )
+    return ok
+
+
+##############################################################################
+def get_args() -> Namespace:
+    """Get the command line arguments.
+
+    Returns:
+        The parsed command line arguments.
+    """
+    parser = ArgumentParser(description="Benchmark the startup time of PISpy.")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per benchmark")
+    parser.add_argument("--output", type=Path, help="File to write the results to")
+    parser.add_argument("--compare", type=Path, help="Results to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Allowed fractional slowdown before flagging a regression",
+    )
+    return parser.parse_args()
+
+
+##############################################################################
+def main() -> None:
+    """Main entry point for the benchmark."""
+    arguments = get_args()
+    results = benchmark(arguments.runs)
+    if arguments.output:
+        arguments.output.write_text(dumps(results, indent=4))
+    else:
+        print(dumps(results, indent=4))
+    if arguments.compare and not compare(
+        results, loads(arguments.compare.read_text()), arguments.tolerance
+    ):
+        sys.exit(1)
+
+
+##############################################################################
+if __name__ == "__main__":
+    main()
+
+### startup.py ends here
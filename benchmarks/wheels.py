@@ -0,0 +1,260 @@
+"""Check, and measure, the inspection of wheels over HTTP range requests.
+
+This serves the given wheels from a local server that honours range
+requests (or, with `--no-ranges`, one that doesn't), inspects each of them
+as PISpy would, checks what was found against the wheel itself, and
+reports how much of each wheel had to be fetched to do so:
+
+    python benchmarks/wheels.py dist/*.whl
+    python benchmarks/wheels.py --sidecar dist/*.whl
+    python benchmarks/wheels.py --no-ranges dist/*.whl
+
+With `--sidecar` the core metadata of each wheel is also served alongside
+it, as an index that supports PEP 658 would.
+"""
+
+##############################################################################
+# Python imports.
+import asyncio
+import sys
+from argparse import ArgumentParser, Namespace
+from configparser import ConfigParser
+from functools import partial
+from hashlib import sha256
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps
+from pathlib import Path
+from re import fullmatch
+from shutil import copy
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter
+from typing import Any
+from zipfile import ZipFile
+
+##############################################################################
+# Local imports.
+from pispy.data import (
+    CacheSettings,
+    PackageURL,
+    WheelError,
+    configure_cache,
+    inspect_wheel,
+    metrics,
+)
+
+
+##############################################################################
+class RangeHandler(SimpleHTTPRequestHandler):
+    """A request handler that honours single range requests."""
+
+    ranges = True
+    """Should range requests be honoured?"""
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Keep quiet about requests."""
+        del format, args
+
+    def do_GET(self) -> None:
+        """Handle a GET request, honouring any range asked for."""
+        byte_range = self.headers.get("Range", "")
+        path = Path(self.translate_path(self.path))
+        if not (self.ranges and byte_range and path.is_file()):
+            super().do_GET()
+            return
+        if (match := fullmatch(r"bytes=(\d*)-(\d*)", byte_range)) is None:
+            self.send_error(416)
+            return
+        size = path.stat().st_size
+        first, last = match.groups()
+        if not first:
+            start, end = max(0, size - int(last)), size - 1
+        else:
+            start, end = int(first), min(int(last or size - 1), size - 1)
+        with path.open("rb") as wheel:
+            wheel.seek(start)
+            body = wheel.read(end - start + 1)
+        self.send_response(206)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+##############################################################################
+class Server(ThreadingHTTPServer):
+    """A server that doesn't complain when a client hangs up early."""
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        """Ignore clients that hang up, as PISpy does with large wheels."""
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+##############################################################################
+def serve(directory: Path, ranges: bool) -> str:
+    """Serve a directory in the background.
+
+    Args:
+        directory: The directory to serve.
+        ranges: Should range requests be honoured?
+
+    Returns:
+        The base URL of the server.
+    """
+    handler = type("Handler", (RangeHandler,), {"ranges": ranges})
+    server = Server(("127.0.0.1", 0), partial(handler, directory=str(directory)))
+    Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+##############################################################################
+def expected(wheel: Path) -> dict[str, Any]:
+    """Read what inspecting a wheel should find, using `zipfile`.
+
+    Args:
+        wheel: The wheel.
+
+    Returns:
+        The metadata, entry points and files of the wheel.
+    """
+    with ZipFile(wheel) as archive:
+        names = archive.namelist()
+        info = {
+            name.partition("/")[2]: name
+            for name in names
+            if name.count("/") == 1 and name.partition("/")[0].endswith(".dist-info")
+        }
+        entry_points = ConfigParser(interpolation=None, delimiters=("=",))
+        entry_points.optionxform = str  # type: ignore[assignment,method-assign]
+        if "entry_points.txt" in info:
+            entry_points.read_string(archive.read(info["entry_points.txt"]).decode())
+        return {
+            "metadata": archive.read(info["METADATA"]).decode(),
+            "entry_points": {
+                group: dict(entry_points[group]) for group in entry_points.sections()
+            },
+            "files": tuple(
+                (item.filename, item.file_size)
+                for item in archive.infolist()
+                if not item.is_dir()
+            ),
+        }
+
+
+##############################################################################
+async def inspect(wheel: Path, base: str, sidecar: bool) -> dict[str, Any]:
+    """Inspect a wheel that is being served, and check what is found.
+
+    Args:
+        wheel: The wheel.
+        base: The base URL of the server.
+        sidecar: Is the core metadata of the wheel being served alongside it?
+
+    Returns:
+        The results of the inspection.
+    """
+    want = expected(wheel)
+    package_url = PackageURL(
+        {
+            "filename": wheel.name,
+            "url": f"{base}/{wheel.name}",
+            "size": wheel.stat().st_size,
+            "digests": {"sha256": sha256(wheel.read_bytes()).hexdigest()},
+            "core-metadata": {"sha256": sha256(want["metadata"].encode()).hexdigest()}
+            if sidecar
+            else False,
+        }
+    )
+    metrics().reset()
+    started = perf_counter()
+    try:
+        found = await inspect_wheel(package_url)
+    except WheelError as error:
+        return {"error": str(error)}
+    elapsed = perf_counter() - started
+    return {
+        "size": package_url.size,
+        "fetched": found.fetched,
+        "fetched_percent": 100 * found.fetched / package_url.size,
+        "ranges": metrics()["wheel.ranges"],
+        "milliseconds": elapsed * 1000,
+        "complete": found.complete,
+        "metadata_ok": found.metadata == want["metadata"],
+        "entry_points_ok": not found.complete
+        or found.entry_points == want["entry_points"],
+        "files_ok": not found.complete or found.files == want["files"],
+    }
+
+
+##############################################################################
+def get_args() -> Namespace:
+    """Get the command line arguments.
+
+    Returns:
+        The parsed command line arguments.
+    """
+    parser = ArgumentParser(description="Check and measure inspecting wheels.")
+    parser.add_argument("wheels", nargs="+", type=Path, help="Wheels to inspect")
+    parser.add_argument(
+        "--sidecar",
+        action="store_true",
+        help="Serve the core metadata of each wheel alongside it (PEP 658)",
+    )
+    parser.add_argument(
+        "--no-ranges",
+        action="store_true",
+        help="Serve the wheels from a server that ignores range requests",
+    )
+    parser.add_argument("--output", type=Path, help="File to write the results to")
+    return parser.parse_args()
+
+
+##############################################################################
+async def inspect_all(arguments: Namespace, directory: Path) -> dict[str, Any]:
+    """Inspect all of the wheels.
+
+    Args:
+        arguments: The command line arguments.
+        directory: The directory to serve the wheels from.
+
+    Returns:
+        The results of inspecting each wheel, keyed by filename.
+    """
+    for wheel in arguments.wheels:
+        copy(wheel, directory)
+        if arguments.sidecar:
+            (directory / f"{wheel.name}.metadata").write_text(
+                expected(wheel)["metadata"]
+            )
+    base = serve(directory, not arguments.no_ranges)
+    return {
+        wheel.name: await inspect(directory / wheel.name, base, arguments.sidecar)
+        for wheel in arguments.wheels
+    }
+
+
+##############################################################################
+def main() -> None:
+    """Main entry point for the benchmark."""
+    arguments = get_args()
+    with TemporaryDirectory() as directory:
+        configure_cache(CacheSettings(enabled=False))
+        results = asyncio.run(inspect_all(arguments, Path(directory)))
+    if arguments.output:
+        arguments.output.write_text(dumps(results, indent=4))
+    else:
+        print(dumps(results, indent=4))
+    if not all(
+        result.get(check, False)
+        for result in results.values()
+        for check in ("metadata_ok", "entry_points_ok", "files_ok")
+    ):
+        sys.exit(1)
+
+
+##############################################################################
+if __name__ == "__main__":
+    main()
+
+### wheels.py ends here
@@ -2,12 +2,204 @@
 
 ##############################################################################
 # Python imports.
+import sys
 from argparse import ArgumentParser, Namespace
+from pathlib import Path
 
 ##############################################################################
 # Local imports.
 from . import __version__
-from .app import PISpy
+from .data import CacheSettings, ClientSettings, IndexSettings, StoreSettings
+
+
+##############################################################################
+def add_shared_options(parser: ArgumentParser) -> None:
+    """Add the options that every command shares.
+
+    Args:
+        parser: The parser to add the options to.
+    """
+    # Add the HTTP client tuning options.
+    defaults = ClientSettings()
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=defaults.timeout,
+        help=f"Network timeout in seconds (default: {defaults.timeout})",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=defaults.max_connections,
+        help=f"Maximum concurrent connections (default: {defaults.max_connections})",
+    )
+    parser.add_argument(
+        "--http2",
+        help="Use HTTP/2 if available (requires httpx[http2])",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=defaults.retries,
+        help="Times to retry a request that times out, or that the index is "
+        f"too busy for (default: {defaults.retries})",
+    )
+
+    # Add the cache options.
+    cache_defaults = CacheSettings()
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=cache_defaults.ttl,
+        help=f"Seconds before cached data is revalidated (default: {cache_defaults.ttl})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        help="Don't use the on-disk cache",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--offline",
+        help="Only show data that is held in the on-disk cache",
+        action="store_true",
+    )
+
+    # Add the index options.
+    index_defaults = IndexSettings()
+    parser.add_argument(
+        "-i",
+        "--index-url",
+        help="Base URL of the simple API of the index to use "
+        "(default: $PISPY_INDEX_URL, $PIP_INDEX_URL, the config file, or PyPI)",
+    )
+    parser.add_argument(
+        "--extra-index-url",
+        action="append",
+        help="Base URL of the simple API of another index to use as a mirror "
+        "(can be given more than once)",
+    )
+    parser.add_argument(
+        "--files-from",
+        choices=("simple", "json"),
+        default=index_defaults.files_from[0],
+        help="The API to prefer for listing the files of a package "
+        f"(default: {index_defaults.files_from[0]})",
+    )
+
+    # Add the diagnostic options.
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        metavar="FILE",
+        help="Write timings of what is done to FILE, in Chrome trace event format",
+    )
+
+
+##############################################################################
+def get_download_args(arguments: list[str]) -> Namespace:
+    """Get the command line arguments for downloading a file of a package.
+
+    Args:
+        arguments: The command line arguments that follow the command.
+
+    Returns:
+        The parsed command line arguments.
+    """
+    parser = ArgumentParser(
+        prog="pispy download",
+        description="Download a file of a package from PyPI, checking its digest.",
+        epilog=f"v{__version__}",
+    )
+    parser.add_argument(
+        "spec",
+        help="The package to download a file of, optionally with a version "
+        "(for example: textual or textual==0.86.0)",
+    )
+    parser.add_argument(
+        "--select",
+        default="",
+        help="Pick the file to download by its type (bdist_wheel or sdist) or "
+        "by text in its filename (default: the best wheel for this Python, "
+        "or the source distribution)",
+    )
+    parser.add_argument(
+        "-d",
+        "--dest",
+        type=Path,
+        default=Path("."),
+        help="The directory to download the file to (default: .)",
+    )
+    parser.add_argument(
+        "-c",
+        "--connections",
+        type=int,
+        default=4,
+        help="The number of chunks of the file to download at once (default: 4)",
+    )
+    add_shared_options(parser)
+    parser.set_defaults(
+        command="download",
+        print=False,
+        json=False,
+        populate=None,
+        store=False,
+        live=False,
+        clear_cache=False,
+    )
+    return parser.parse_args(arguments)
+
+
+##############################################################################
+def get_audit_args(arguments: list[str]) -> Namespace:
+    """Get the command line arguments for auditing a requirements or lock file.
+
+    Args:
+        arguments: The command line arguments that follow the command.
+
+    Returns:
+        The parsed command line arguments.
+    """
+    parser = ArgumentParser(
+        prog="pispy audit",
+        description="Check every package pinned by a requirements or lock file: "
+        "for newer releases, yanked releases and files, support for this "
+        "Python, and wheels for this platform.",
+        epilog=f"v{__version__}",
+    )
+    parser.add_argument(
+        "file",
+        type=Path,
+        help="The file to audit (a requirements file, the output of pip-compile, "
+        "pyproject.toml, uv.lock, poetry.lock, pdm.lock or pylock.toml)",
+    )
+    parser.add_argument(
+        "--json",
+        help="Write the report out as JSON rather than as a table",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=16,
+        help="The number of packages to check at once (default: 16)",
+    )
+    add_shared_options(parser)
+    parser.set_defaults(
+        command="audit",
+        print=False,
+        populate=None,
+        store=False,
+        live=False,
+        clear_cache=False,
+    )
+    return parser.parse_args(arguments)
+
+
+##############################################################################
+_COMMANDS = {"audit": get_audit_args, "download": get_download_args}
+"""The commands that can be given, and how to get the arguments for each."""
 
 
 ##############################################################################
@@ -17,18 +209,86 @@ def get_args() -> Namespace:
     Returns:
         The parsed command line arguments.
     """
+    if (command := _COMMANDS.get("".join(sys.argv[1:2]))) is not None:
+        return command(sys.argv[2:])
+
     parser = ArgumentParser(
         prog="pispy",
         description="Look up package information on PyPI.",
-        epilog=f"v{__version__}",
+        epilog="Use `pispy download --help` to see how to download the files of "
+        "a package, and `pispy audit --help` to see how to audit a requirements "
+        f"or lock file. v{__version__}",
     )
 
     # Add the package argument.
     parser.add_argument(
         "package",
-        nargs="?",
-        help="A package to look up",
+        nargs="*",
+        help="A package to look up (more than one can be given with --json)",
+    )
+
+    # Add the headless options.
+    parser.add_argument(
+        "--json",
+        help="Look the packages up without the UI, writing them out as NDJSON",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--print",
+        help="Print the package (given as NAME or NAME@VERSION) without the UI, "
+        "then exit; as plain text if the output isn't a terminal",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--from-file",
+        type=Path,
+        help="Read the names of the packages to look up from a requirements file",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=16,
+        help="The number of packages to look up at once with --json (default: 16)",
+    )
+
+    # Add the store options.
+    parser.add_argument(
+        "--store",
+        help="Keep the packages that are looked up in a local store that can be "
+        "searched (default: $PISPY_STORE, or the config file)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--populate",
+        type=Path,
+        metavar="FILE",
+        help="Look up the packages named in a requirements file (or - for "
+        "standard input) and add them to the local store, then exit",
+    )
+
+    # Add the interactive options.
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("OLD", "NEW"),
+        help="Compare two packages, or two releases of a package, side by side "
+        "(give each as NAME or NAME@VERSION)",
+    )
+    parser.add_argument(
+        "--live",
+        help="Look packages up as their names are typed",
+        action="store_true",
+    )
+
+    # Add the options shared with the other commands.
+    add_shared_options(parser)
+    parser.add_argument(
+        "--clear-cache",
+        help="Clear the on-disk cache and exit",
+        action="store_true",
     )
+    parser.set_defaults(command="")
 
     # Add --version
     parser.add_argument(
@@ -39,15 +299,122 @@ def get_args() -> Namespace:
         version=f"%(prog)s {__version__}",
     )
 
-    # Return the arguments.
-    return parser.parse_args()
+    # Parse the arguments and check they make sense.
+    arguments = parser.parse_args()
+    if not arguments.json and (len(arguments.package) > 1 or arguments.from_file):
+        parser.error("more than one package can only be looked up with --json")
+    if arguments.compare and (arguments.package or arguments.json):
+        parser.error("--compare can't be used with a package to look up, or --json")
+    if arguments.print and (arguments.json or len(arguments.package) != 1):
+        parser.error(
+            "--print needs one package to look up, and can't be used with --json"
+        )
+    return arguments
 
 
 ##############################################################################
 def run() -> None:
     """Run the application."""
     arguments = get_args()
-    PISpy(arguments.package).run(inline=arguments.package is not None)
+
+    # Only now that we know what we're doing do we pull in anything heavy.
+    from .config import extra_index_urls, index_url, store_enabled
+    from .data import configure_cache, configure_index, configure_store
+
+    cache = configure_cache(
+        CacheSettings(
+            ttl=arguments.cache_ttl,
+            offline=arguments.offline,
+            enabled=not arguments.no_cache,
+        )
+    )
+    index_defaults = IndexSettings()
+    configure_index(
+        IndexSettings.from_index_url(
+            index_url(arguments.index_url),
+            extra_index_urls(arguments.extra_index_url),
+            files_from=(
+                arguments.files_from,
+                *(
+                    source
+                    for source in index_defaults.files_from
+                    if source != arguments.files_from
+                ),
+            ),
+        )
+    )
+    configure_store(
+        StoreSettings(
+            enabled=store_enabled(arguments.store) or arguments.populate is not None
+        )
+    )
+    if arguments.clear_cache:
+        cache.clear()
+        print(f"Cleared the cache in {cache.location}")
+        return
+    client_settings = ClientSettings(
+        timeout=arguments.timeout,
+        max_connections=arguments.max_connections,
+        http2=arguments.http2,
+        retries=max(0, arguments.retries),
+    )
+    if arguments.trace:
+        from .data import tracer
+
+        tracer().start_trace(arguments.trace)
+    try:
+        if arguments.command == "audit":
+            from .headless import run_audit
+
+            sys.exit(
+                run_audit(
+                    arguments.file, arguments.jobs, arguments.json, client_settings
+                )
+            )
+        elif arguments.command == "download":
+            from .headless import run_download
+
+            sys.exit(
+                run_download(
+                    arguments.spec,
+                    arguments.select,
+                    arguments.dest,
+                    arguments.connections,
+                    client_settings,
+                )
+            )
+        elif arguments.populate is not None:
+            from .headless import run_populate
+
+            sys.exit(run_populate(arguments.populate, arguments.jobs, client_settings))
+        elif arguments.print:
+            from .headless import run_print
+
+            sys.exit(run_print(arguments.package[0], client_settings))
+        elif arguments.json:
+            from .headless import run_headless
+
+            sys.exit(
+                run_headless(
+                    arguments.package,
+                    arguments.from_file,
+                    arguments.jobs,
+                    client_settings,
+                )
+            )
+        else:
+            from .app import PISpy
+
+            package = arguments.package[0] if arguments.package else None
+            PISpy(
+                package,
+                client_settings,
+                arguments.live,
+                tuple(arguments.compare) if arguments.compare else None,
+            ).run(inline=package is not None)
+    finally:
+        if arguments.trace:
+            tracer().stop_trace()
 
 
 ##############################################################################
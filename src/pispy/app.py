@@ -2,13 +2,34 @@
 
 ##############################################################################
 # Textual imports.
-from textual import on
+from textual import on, work
 from textual.app import App, ComposeResult
-from textual.widgets import Input
+from textual.timer import Timer
+from textual.widgets import Input, OptionList
+from textual.worker import Worker
 
 ##############################################################################
 # Local imports.
-from .widgets import PackageInformation
+from .data import (
+    ClientSettings,
+    close_client,
+    indexes,
+    load_names,
+    metrics,
+    names,
+    normalise,
+    open_client,
+    package_store,
+    refresh_names,
+)
+from .history import History, Location
+from .widgets import (
+    NameSuggestions,
+    PackageInformation,
+    PackageNameInput,
+    PerformancePanel,
+    SearchResults,
+)
 
 
 ##############################################################################
@@ -30,26 +51,53 @@ class PISpy(App[None]):
     Screen:inline {
         height: 50vh;
 
-        Input {
+        Input, NameSuggestions, SearchResults {
             display: none;
         }
     }
     """
 
-    BINDINGS = [("escape", "quit", "Quit")]
+    BINDINGS = [
+        ("escape", "quit", "Quit"),
+        ("alt+left", "history_back", "Back"),
+        ("alt+right", "history_forward", "Forward"),
+        ("f2", "metrics", "Metrics"),
+        ("f3", "performance", "Performance"),
+        ("ctrl+f", "search", "Search"),
+    ]
     """The main application bindings."""
 
+    LIVE_DELAY = 0.35
+    """The time, in seconds, typing must pause for before a live lookup."""
+
     ENABLE_COMMAND_PALETTE = False
     """Disable the command palette."""
 
-    def __init__(self, initial_package: str | None) -> None:
+    def __init__(
+        self,
+        initial_package: str | None,
+        client_settings: ClientSettings | None = None,
+        live: bool = False,
+        compare: tuple[str, str] | None = None,
+    ) -> None:
         """Initialise the application.
 
         Args:
             initial_package: The initial package to look up.
+            client_settings: The settings for the HTTP client.
+            live: Should packages be looked up as their names are typed?
+            compare: The specs of two packages to start off comparing.
         """
         super().__init__()
         self._package = initial_package
+        self._compare = compare
+        self._client_settings = client_settings
+        self._live = live
+        self._history = History()
+        self._lookup: Worker[bool] | None = None
+        self._live_timer: Timer | None = None
+        self._showing = ""
+        self._searching = False
 
     def compose(self) -> ComposeResult:
         """Compose the stats screen.
@@ -57,19 +105,220 @@ class PISpy(App[None]):
         Returns:
             The stats screen's layout.
         """
-        yield Input(placeholder="Name of the package to look up in PyPI")
+        yield PackageNameInput()
+        yield NameSuggestions()
+        yield SearchResults()
         yield PackageInformation()
+        yield PerformancePanel()
 
     async def on_mount(self) -> None:
         """Pre-fill the display if a package is passed on the command line."""
+        open_client(self._client_settings)
         if self._package is not None:
             await self.run_action(f"lookup('{self._package}')")
+        elif self._compare is not None:
+            self.query_one(Input).value = " ".join(self._compare)
+            self.query_one(PackageInformation).compare(*self._compare)
+            self._load_names()
+        else:
+            self._load_names()
+
+    @work(group="names")
+    async def _load_names(self) -> None:
+        """Load the index of package names, and refresh it if it's stale.
+
+        Note:
+            Loading the index only maps it into memory, so it's quick; it's
+            still done after the display is up so as not to hold it up.
+        """
+        load_names()
+        await refresh_names()
+
+    async def on_unmount(self) -> None:
+        """Tidy up when the application is shutting down."""
+        await close_client()
+
+    def _show(self, location: Location, focus: bool = True) -> None:
+        """Show the package at the given location.
+
+        Args:
+            location: The location to show.
+            focus: Should the package information be focused?
+        """
+        if self._lookup is not None and self._lookup.is_running:
+            metrics().count("lookups.superseded")
+        information = self.query_one(PackageInformation)
+        self._lookup = information.show(location.package, location.tab)
+        self._showing = normalise(location.package.strip())
+        if focus:
+            information.focus()
+
+    def _remember_tab(self) -> None:
+        """Remember the tab being viewed in the navigation history."""
+        self._history.remember_tab(self.query_one(PackageInformation).active)
+
+    @on(Input.Changed)
+    def suggest_names(self, event: Input.Changed) -> None:
+        """Suggest package names as the user types.
+
+        Args:
+            event: The input change event.
+        """
+        if event.input.has_focus and self._searching:
+            self.query_one(SearchResults).search_for(event.value)
+        elif event.input.has_focus:
+            self.query_one(NameSuggestions).suggest_for(event.value)
+            if self._live:
+                self._queue_live_lookup(event.value)
+
+    def _queue_live_lookup(self, value: str) -> None:
+        """Queue up a live lookup of the package being typed.
+
+        Args:
+            value: The name typed so far.
+
+        Note:
+            The lookup only happens once typing has paused; each change
+            made before then replaces the lookup that was queued.
+        """
+        metrics().count("live.changes")
+        if self._live_timer is not None:
+            self._live_timer.stop()
+            metrics().count("live.debounced")
+        self._live_timer = self.set_timer(
+            self.LIVE_DELAY, lambda: self._live_lookup(value)
+        )
+
+    def _live_lookup(self, value: str) -> None:
+        """Look up the package being typed, if it's worth doing.
+
+        Args:
+            value: The name that was typed.
+
+        Note:
+            Names that aren't in the index of package names (once it's
+            loaded) aren't looked up, as they can only be unknown.
+        """
+        self._live_timer = None
+        if not (package := value.strip()):
+            return
+        if normalise(package) == self._showing:
+            metrics().count("live.unchanged")
+        elif len(names()) and package not in names():
+            metrics().count("live.unknown")
+        else:
+            metrics().count("live.lookups")
+            self._show(Location(package), focus=False)
+
+    @on(OptionList.OptionSelected)
+    def lookup_suggestion(self, event: OptionList.OptionSelected) -> None:
+        """Look up a suggested package name that has been picked.
+
+        Args:
+            event: The option selection event.
+        """
+        if event.option.id is not None:
+            self.action_lookup(event.option.id)
 
     @on(Input.Submitted)
     def lookup_package(self) -> None:
         """React to the user hitting enter in the input field."""
-        if self.query_one(PackageInformation).show(self.query_one(Input).value):
+        if self._searching:
+            self.query_one(PackageNameInput).action_suggestions()
+            return
+        self.query_one(NameSuggestions).hide()
+        if self._live_timer is not None:
+            self._live_timer.stop()
+            self._live_timer = None
+        if len(specs := self.query_one(Input).value.split()) == 2:
+            self._showing = ""
+            self.query_one(PackageInformation).compare(*specs)
             self.query_one(PackageInformation).focus()
+            return
+        if package := self.query_one(Input).value.strip():
+            self._remember_tab()
+            self._history.visit(Location(package))
+            if self._live and normalise(package) == self._showing:
+                # Live lookup has already got it showing.
+                self.query_one(PackageInformation).focus()
+                return
+        self._show(Location(self.query_one(Input).value))
+
+    def _go_to(self, location: Location | None) -> None:
+        """Go to a location in the navigation history.
+
+        Args:
+            location: The location to go to, if there is one.
+        """
+        if location is not None:
+            self.query_one(Input).value = location.package
+            self.query_one(Input).cursor_position = len(location.package)
+            self._show(location)
+
+    def action_history_back(self) -> None:
+        """Go back to the previously-viewed package."""
+        self._remember_tab()
+        self._go_to(self._history.back())
+
+    def action_history_forward(self) -> None:
+        """Go forward to the next-viewed package."""
+        self._remember_tab()
+        self._go_to(self._history.forward())
+
+    def action_metrics(self) -> None:
+        """Show the counts of the work that has been done, and avoided.
+
+        The health of each index in use is shown too.
+        """
+        self.notify(
+            "\n".join(
+                [
+                    *(
+                        f"{name}: {count:,}"
+                        for name, count in metrics().snapshot().items()
+                    ),
+                    *(
+                        f"{url}: {health.latency * 1000:,.0f}ms, "
+                        f"{health.error_rate:.0%} errors"
+                        f"{'' if health.healthy else ', avoided'}"
+                        for url, health in indexes().health.items()
+                        if health.requests
+                    ),
+                ]
+            )
+            or "Nothing yet",
+            title="Metrics",
+            timeout=10,
+        )
+
+    def action_performance(self) -> None:
+        """Toggle the performance panel."""
+        self.query_one(PerformancePanel).toggle()
+
+    def _search_mode(self, searching: bool) -> None:
+        """Switch between looking packages up and searching the local store.
+
+        Args:
+            searching: Should the local store be searched?
+        """
+        self._searching = searching
+        self.query_one(PackageNameInput).search_mode(searching)
+        self.query_one(NameSuggestions).hide()
+        self.query_one(SearchResults).hide()
+
+    def action_search(self) -> None:
+        """Toggle searching the local store of packages."""
+        if not package_store().settings.enabled:
+            self.notify(
+                "The local package store isn't enabled; run with --store to use it.",
+                title="Search",
+                severity="warning",
+            )
+            return
+        self._search_mode(not self._searching)
+        (search := self.query_one(PackageNameInput)).focus()
+        if self._searching:
+            self.query_one(SearchResults).search_for(search.value)
 
     def action_lookup(self, package: str) -> None:
         """React to a hyperlink of a project being clicked on.
@@ -77,6 +326,8 @@ class PISpy(App[None]):
         Args:
             package: The name of the package to look up.
         """
+        if self._searching:
+            self._search_mode(False)
         self.query_one(Input).value = package
         self.query_one(Input).cursor_position = len(package)
         self.lookup_package()
@@ -0,0 +1,158 @@
+"""Provides configuration that comes from the environment or a file.
+
+Settings are looked for, in order, on the command line, in the environment
+(with pip's own variables honoured too) and then in the configuration file,
+which is an INI file like this:
+
+    [index]
+    index-url = https://mirror.example.com/simple
+    extra-index-url =
+        https://pypi.org/simple
+        https://other.example.com/simple
+
+    [store]
+    enabled = yes
+"""
+
+##############################################################################
+# Python imports.
+import sys
+from configparser import ConfigParser, Error
+from os import environ
+from pathlib import Path
+from urllib.parse import urlparse
+
+##############################################################################
+# Platform directory imports.
+from platformdirs import user_config_path
+
+##############################################################################
+DEFAULT_INDEX_URL = "https://pypi.org/simple"
+"""The index to use if none is configured."""
+
+
+##############################################################################
+def config_file() -> Path:
+    """Get the location of the configuration file.
+
+    Returns:
+        The path to the configuration file; `PISPY_CONFIG` can be used to
+        point to a different file.
+    """
+    if location := environ.get("PISPY_CONFIG"):
+        return Path(location)
+    return user_config_path("pispy") / "pispy.ini"
+
+
+##############################################################################
+def _from_file(key: str, section: str = "index") -> str:
+    """Get a value from the configuration file.
+
+    Args:
+        key: The key of the value.
+        section: The section the value is in.
+
+    Returns:
+        The value, or an empty string if it isn't set.
+    """
+    config = ConfigParser()
+    try:
+        config.read(config_file())
+    except Error:
+        return ""
+    return config.get(section, key, fallback="")
+
+
+##############################################################################
+def _usable(url: str, source: str) -> bool:
+    """Is the given URL one that an index can be used from?
+
+    Args:
+        url: The URL of the index.
+        source: Where the URL came from, to say so if it isn't usable.
+
+    Returns:
+        `True` if the URL is an HTTP or HTTPS URL, `False` if not; in which
+        case a warning is written to standard error.
+
+    Note:
+        pip happily takes local directories and `file://` URLs as indexes,
+        so its settings can hold them; PISpy only talks to indexes over
+        HTTP.
+    """
+    if urlparse(url).scheme.lower() in ("http", "https"):
+        return True
+    print(
+        f"pispy: ignoring the index {url!r} from {source}; "
+        "only http and https indexes can be used",
+        file=sys.stderr,
+    )
+    return False
+
+
+##############################################################################
+def index_url(given: str | None = None) -> str:
+    """Get the base URL of the simple API of the index to use.
+
+    Args:
+        given: The URL given on the command line, if any.
+
+    Returns:
+        The URL of the index; taken from the command line, `PISPY_INDEX_URL`,
+        `PIP_INDEX_URL`, the configuration file, or otherwise PyPI. A URL
+        that isn't HTTP or HTTPS is ignored, with a warning.
+    """
+    for url, source in (
+        (given, "--index-url"),
+        (environ.get("PISPY_INDEX_URL"), "PISPY_INDEX_URL"),
+        (environ.get("PIP_INDEX_URL"), "PIP_INDEX_URL"),
+        (_from_file("index-url"), str(config_file())),
+    ):
+        if url and _usable(url, source):
+            return url
+    return DEFAULT_INDEX_URL
+
+
+##############################################################################
+def extra_index_urls(given: list[str] | None = None) -> list[str]:
+    """Get the base URLs of the simple API of any other indexes to use.
+
+    Args:
+        given: The URLs given on the command line, if any.
+
+    Returns:
+        The URLs of the other indexes; taken from the command line,
+        `PISPY_EXTRA_INDEX_URL`, `PIP_EXTRA_INDEX_URL` or the configuration
+        file. The environment variables and the file can hold more than one
+        URL, separated by whitespace. URLs that aren't HTTP or HTTPS are
+        ignored, with a warning.
+    """
+    for urls, source in (
+        (given, "--extra-index-url"),
+        (environ.get("PISPY_EXTRA_INDEX_URL", "").split(), "PISPY_EXTRA_INDEX_URL"),
+        (environ.get("PIP_EXTRA_INDEX_URL", "").split(), "PIP_EXTRA_INDEX_URL"),
+        (_from_file("extra-index-url").split(), str(config_file())),
+    ):
+        if urls:
+            return [url for url in urls if _usable(url, source)]
+    return []
+
+
+##############################################################################
+def store_enabled(given: bool = False) -> bool:
+    """Should the local store of package metadata be used?
+
+    Args:
+        given: Was the store asked for on the command line?
+
+    Returns:
+        `True` if asked for on the command line, or if `PISPY_STORE`, or
+        the `enabled` setting in the `store` section of the configuration
+        file, is set to a true value (such as `1`, `yes` or `true`).
+    """
+    return given or (
+        environ.get("PISPY_STORE") or _from_file("enabled", "store")
+    ).strip().lower() in ("1", "yes", "true", "on")
+
+
+### config.py ends here
@@ -1,11 +1,153 @@
 """Code for getting data from PyPI."""
 
 ##############################################################################
-# Local imports.
-from .package import Package, PackageURL
+# Python imports.
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+##############################################################################
+# Type checking imports.
+if TYPE_CHECKING:
+    from .audit import AuditResult, Pin, audit_pins, pins_from_file
+    from .cache import configure_cache
+    from .client import close_client, open_client
+    from .comparison import (
+        Comparison,
+        Difference,
+        compare_packages,
+        split_spec,
+    )
+    from .download import Download, DownloadError, best_file
+    from .index import configure_index, indexes
+    from .instrumentation import Metrics, Span, Tracer, metrics, tracer
+    from .listing import list_files
+    from .name_index import NameIndex, load_names, names, normalise, refresh_names
+    from .package import Package, PackageURL
+    from .prefetching import prefetch, prefetch_candidates, prefetch_releases
+    from .releases import Release, load_releases
+    from .settings import CacheSettings, ClientSettings, IndexSettings, StoreSettings
+    from .store import PackageStore, SearchResult, configure_store, package_store
+    from .wheel import WheelContents, WheelError, inspect_wheel
+
+##############################################################################
+# The module that provides each export. These are imported on first use, so
+# that importing the package (say, just for the settings) is cheap.
+_EXPORTS = {
+    "audit_pins": "audit",
+    "AuditResult": "audit",
+    "best_file": "download",
+    "CacheSettings": "settings",
+    "ClientSettings": "settings",
+    "close_client": "client",
+    "compare_packages": "comparison",
+    "Comparison": "comparison",
+    "configure_cache": "cache",
+    "configure_index": "index",
+    "configure_store": "store",
+    "Difference": "comparison",
+    "Download": "download",
+    "DownloadError": "download",
+    "indexes": "index",
+    "IndexSettings": "settings",
+    "inspect_wheel": "wheel",
+    "list_files": "listing",
+    "load_names": "name_index",
+    "load_releases": "releases",
+    "Metrics": "instrumentation",
+    "metrics": "instrumentation",
+    "NameIndex": "name_index",
+    "names": "name_index",
+    "normalise": "name_index",
+    "open_client": "client",
+    "Package": "package",
+    "package_store": "store",
+    "PackageStore": "store",
+    "PackageURL": "package",
+    "Pin": "audit",
+    "pins_from_file": "audit",
+    "prefetch": "prefetching",
+    "prefetch_candidates": "prefetching",
+    "prefetch_releases": "prefetching",
+    "refresh_names": "name_index",
+    "Release": "releases",
+    "SearchResult": "store",
+    "Span": "instrumentation",
+    "split_spec": "comparison",
+    "StoreSettings": "settings",
+    "Tracer": "instrumentation",
+    "tracer": "instrumentation",
+    "WheelContents": "wheel",
+    "WheelError": "wheel",
+}
 
 ##############################################################################
 # Exprots.
-__all__ = ["Package", "PackageURL"]
+__all__ = [
+    "audit_pins",
+    "AuditResult",
+    "best_file",
+    "CacheSettings",
+    "ClientSettings",
+    "close_client",
+    "compare_packages",
+    "Comparison",
+    "configure_cache",
+    "configure_index",
+    "configure_store",
+    "Difference",
+    "Download",
+    "DownloadError",
+    "indexes",
+    "IndexSettings",
+    "inspect_wheel",
+    "list_files",
+    "load_names",
+    "load_releases",
+    "Metrics",
+    "metrics",
+    "NameIndex",
+    "names",
+    "normalise",
+    "open_client",
+    "Package",
+    "package_store",
+    "PackageStore",
+    "PackageURL",
+    "Pin",
+    "pins_from_file",
+    "prefetch",
+    "prefetch_candidates",
+    "prefetch_releases",
+    "refresh_names",
+    "Release",
+    "SearchResult",
+    "Span",
+    "split_spec",
+    "StoreSettings",
+    "Tracer",
+    "tracer",
+    "WheelContents",
+    "WheelError",
+]
+
+
+##############################################################################
+def __getattr__(name: str) -> Any:
+    """Import an export on first use.
+
+    Args:
+        name: The name of the export.
+
+    Returns:
+        The exported value.
+
+    Raises:
+        AttributeError: If the name isn't exported from this package.
+    """
+    if (module := _EXPORTS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = export = getattr(import_module(f".{module}", __name__), name)
+    return export
+
 
 ### __init__.py ends here
@@ -0,0 +1,483 @@
+"""Provides auditing of the packages pinned by a requirements or lock file.
+
+Every pinned package is checked against the index: is there a newer
+release, has the pinned release (or any of its files) been yanked, does it
+support the running Python, and are there wheels for this platform? Each
+project is fetched just once, however many times it is pinned, with one
+request for its whole listing; projects are checked concurrently, and go
+through the cache like everything else.
+"""
+
+##############################################################################
+# Python imports.
+import sys
+from asyncio import Queue, gather, to_thread
+from pathlib import Path
+from platform import python_version
+from typing import Any, Iterable, Iterator, NamedTuple
+
+##############################################################################
+# httpx imports.
+import httpx
+
+##############################################################################
+# Packaging imports.
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
+from packaging.version import InvalidVersion, Version
+
+##############################################################################
+# Local imports.
+from .decoding import decode
+from .fetch import fetch
+from .index import index
+from .instrumentation import tracer
+from .name_index import normalise
+from .package import Package, PackageURL
+from .simple import simple_files, version_of
+
+##############################################################################
+# TOML imports.
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+
+##############################################################################
+class Pin(NamedTuple):
+    """A package pinned by a requirements or lock file."""
+
+    name: str
+    """The name of the package."""
+
+    version: str
+    """The version the package is pinned to, or empty if it isn't pinned."""
+
+
+##############################################################################
+class AuditResult(NamedTuple):
+    """The result of auditing a pinned package."""
+
+    name: str
+    """The name of the package."""
+
+    pinned: str
+    """The version the package is pinned to, or empty if it isn't pinned."""
+
+    found: bool = False
+    """Was the package found on the index?"""
+
+    release_found: bool = False
+    """Was the pinned release found on the index?"""
+
+    latest: str = ""
+    """The latest release of the package."""
+
+    yanked: bool = False
+    """Has the pinned release been yanked?"""
+
+    yanked_reason: str = ""
+    """The reason the pinned release, or any of its files, was yanked."""
+
+    yanked_files: int = 0
+    """The number of files of the pinned release that have been yanked."""
+
+    requires_python: str = ""
+    """The versions of Python the pinned release needs."""
+
+    python_supported: bool = True
+    """Does the pinned release support the running Python?"""
+
+    wheels: int = 0
+    """The number of wheels of the pinned release for this platform."""
+
+    sdist: bool = False
+    """Does the pinned release have a source distribution?"""
+
+    error: str = ""
+    """Any error that stopped the package from being audited."""
+
+    @property
+    def outdated(self) -> bool:
+        """Is there a newer release than the one that is pinned?"""
+        try:
+            return bool(self.latest) and Version(self.latest) > Version(self.pinned)
+        except InvalidVersion:
+            return False
+
+    @property
+    def problems(self) -> list[str]:
+        """The problems found with the pinned release."""
+        if self.error:
+            return [self.error]
+        if not self.found:
+            return ["not found on the index"]
+        if not self.release_found:
+            return [f"{self.pinned} not found on the index"]
+        problems = []
+        if self.yanked:
+            problems.append(
+                f"yanked{f': {self.yanked_reason}' if self.yanked_reason else ''}"
+            )
+        elif self.yanked_files:
+            problems.append(
+                f"{self.yanked_files} file(s) yanked"
+                f"{f': {self.yanked_reason}' if self.yanked_reason else ''}"
+            )
+        if not self.python_supported:
+            problems.append(f"needs Python {self.requires_python}")
+        if not self.wheels:
+            problems.append(
+                "no wheel for this platform" + ("" if self.sdist else " and no sdist")
+            )
+        return problems
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the result as a dictionary of plain values.
+
+        Returns:
+            The result, suitable for serialising as JSON.
+        """
+        return {
+            **self._asdict(),
+            "outdated": self.outdated,
+            "problems": self.problems,
+        }
+
+
+##############################################################################
+def pins_from_requirements(lines: Iterable[str]) -> Iterator[Pin]:
+    """Get the pinned packages from lines of requirements-style text.
+
+    Args:
+        lines: The lines of text.
+
+    Yields:
+        The packages, along with the versions they're pinned to with `==`
+        or `===` (if they are).
+
+    Note:
+        This copes with the output of `pip-compile`, `pip freeze`, `uv pip
+        compile` and `rye`: continuation lines, hashes, comments, options
+        and editable or local installs are all skipped.
+    """
+    for line in lines:
+        line = line.partition(" #")[0].strip()
+        if not line or line.startswith(("#", "-")):
+            continue
+        try:
+            requirement = Requirement(line.removesuffix("\\").strip())
+        except InvalidRequirement:
+            continue
+        if requirement.url:
+            continue
+        yield Pin(
+            requirement.name,
+            next(
+                (
+                    specifier.version
+                    for specifier in requirement.specifier
+                    if specifier.operator in ("==", "===")
+                    and "*" not in specifier.version
+                ),
+                "",
+            ),
+        )
+
+
+##############################################################################
+def _pins_from_pyproject(data: dict[str, Any]) -> Iterator[Pin]:
+    """Get the pinned packages from a `pyproject.toml` file.
+
+    Args:
+        data: The content of the file.
+
+    Yields:
+        The packages required by the project, its extras and its
+        dependency groups.
+    """
+    project = data.get("project") or {}
+    yield from pins_from_requirements(project.get("dependencies") or ())
+    for requirements in (project.get("optional-dependencies") or {}).values():
+        yield from pins_from_requirements(requirements)
+    for requirements in (data.get("dependency-groups") or {}).values():
+        yield from pins_from_requirements(
+            requirement for requirement in requirements if isinstance(requirement, str)
+        )
+
+
+##############################################################################
+_NOT_FROM_AN_INDEX = {
+    "archive",
+    "directory",
+    "editable",
+    "file",
+    "git",
+    "path",
+    "url",
+    "vcs",
+    "virtual",
+}
+"""The sources of locked packages that don't come from an index.
+
+These cover the keys `uv.lock` uses in the source of a package, the types
+of source in `poetry.lock`, and the keys `pylock.toml` uses in a package.
+"""
+
+
+##############################################################################
+def _pins_from_lock(data: dict[str, Any]) -> Iterator[Pin]:
+    """Get the pinned packages from a TOML lock file.
+
+    Args:
+        data: The content of the lock file.
+
+    Yields:
+        The packages that the lock file pins that come from an index.
+
+    Note:
+        This copes with `uv.lock`, `poetry.lock`, `pdm.lock` and PEP 751's
+        `pylock.toml`.
+    """
+    for package in data.get("package") or data.get("packages") or ():
+        source = package.get("source") or {}
+        kind = source.get("type") or next(iter(source), "registry")
+        if kind in _NOT_FROM_AN_INDEX or _NOT_FROM_AN_INDEX & set(package):
+            continue
+        if package.get("name"):
+            yield Pin(package["name"], str(package.get("version") or ""))
+
+
+##############################################################################
+def pins_from_file(path: Path) -> list[Pin]:
+    """Get the pinned packages from a requirements or lock file.
+
+    Args:
+        path: The path to the file.
+
+    Returns:
+        The packages the file pins, without duplicates.
+
+    Raises:
+        OSError: If the file can't be read.
+        ValueError: If a TOML file doesn't parse.
+    """
+    if path.suffix == ".toml" or (path.suffix == ".lock" and _looks_like_toml(path)):
+        data = tomllib.loads(path.read_text(encoding="utf-8"))
+        if "project" in data or "dependency-groups" in data:
+            return list(dict.fromkeys(_pins_from_pyproject(data)))
+        return list(dict.fromkeys(_pins_from_lock(data)))
+    with path.open(encoding="utf-8") as lines:
+        return list(dict.fromkeys(pins_from_requirements(lines)))
+
+
+##############################################################################
+def _looks_like_toml(path: Path) -> bool:
+    """Does a lock file look like it is TOML?
+
+    Args:
+        path: The path to the lock file.
+
+    Returns:
+        `True` if the file looks like TOML, `False` if it looks like a
+        requirements file.
+    """
+    with path.open(encoding="utf-8") as lines:
+        return any(
+            line.startswith(("[[package", "version =", "lock-version ="))
+            for line in lines
+        )
+
+
+##############################################################################
+async def _files_by_version(name: str) -> dict[str, list[dict[str, Any]]] | None:
+    """Get every file of a project, grouped by the version they belong to.
+
+    Args:
+        name: The name of the project.
+
+    Returns:
+        The files of each version, or `None` if the index doesn't know the
+        project.
+
+    Note:
+        The sources of file listings are tried in the preferred order, so
+        normally this is a single request for the project's simple page.
+    """
+    for source in index().files_from:
+        if source == "simple":
+            if (files := await simple_files(name)) is None:
+                continue
+            releases: dict[str, list[dict[str, Any]]] = {}
+            for file in files:
+                if (version := version_of(file["filename"])) is not None:
+                    releases.setdefault(str(version), []).append(file)
+            return releases
+        response = await fetch(Package.api_url(name))
+        if response.status == httpx.codes.OK:
+            releases = (
+                await to_thread(decode, response.body, wanted=("releases",))
+            ).get("releases") or {}
+            return releases
+    return None
+
+
+##############################################################################
+def _latest(releases: dict[str, list[dict[str, Any]]]) -> str:
+    """Find the latest release of a project that hasn't been yanked.
+
+    Args:
+        releases: The files of each version of the project.
+
+    Returns:
+        The latest final release, or the latest pre-release if there are
+        only pre-releases; or an empty string if there is none.
+    """
+    candidates: list[Version] = []
+    for version, files in releases.items():
+        if files and all(file.get("yanked") for file in files):
+            continue
+        try:
+            candidates.append(Version(version))
+        except InvalidVersion:
+            pass
+    final = [version for version in candidates if not version.is_prerelease]
+    return str(max(final or candidates)) if candidates else ""
+
+
+##############################################################################
+def _find_release(
+    pinned: str, releases: dict[str, list[dict[str, Any]]]
+) -> list[dict[str, Any]] | None:
+    """Find the files of the pinned release of a project.
+
+    Args:
+        pinned: The version that is pinned.
+        releases: The files of each version.
+
+    Returns:
+        The files of the release, or `None` if there is no such release.
+    """
+    if pinned in releases:
+        return releases[pinned]
+    try:
+        wanted = Version(pinned)
+    except InvalidVersion:
+        return None
+    for version, files in releases.items():
+        try:
+            if Version(version) == wanted:
+                return files
+        except InvalidVersion:
+            pass
+    return None
+
+
+##############################################################################
+def _supports_python(requires_python: str) -> bool:
+    """Does a `Requires-Python` specifier allow the running Python?
+
+    Args:
+        requires_python: The specifier.
+
+    Returns:
+        `True` if the running Python is allowed, `False` if not.
+    """
+    try:
+        return SpecifierSet(requires_python).contains(
+            python_version(), prereleases=True
+        )
+    except InvalidSpecifier:
+        return True
+
+
+##############################################################################
+def check(pin: Pin, releases: dict[str, list[dict[str, Any]]] | None) -> AuditResult:
+    """Check a pinned package against what the index has.
+
+    Args:
+        pin: The pinned package.
+        releases: The files of each version of the package, or `None` if
+            the index doesn't know the package.
+
+    Returns:
+        The result of the audit.
+
+    Note:
+        A package that isn't pinned to a version is checked against its
+        latest release.
+    """
+    if releases is None:
+        return AuditResult(pin.name, pin.version)
+    latest = _latest(releases)
+    pinned = pin.version or latest
+    if (files := _find_release(pinned, releases)) is None:
+        return AuditResult(pin.name, pin.version, found=True, latest=latest)
+    urls = [PackageURL(file) for file in files]
+    yanked = [file for file in files if file.get("yanked")]
+    requires_python = next(
+        (file["requires_python"] for file in files if file.get("requires_python")), ""
+    )
+    return AuditResult(
+        name=pin.name,
+        pinned=pin.version,
+        found=True,
+        release_found=True,
+        latest=latest,
+        yanked=bool(files) and len(yanked) == len(files),
+        yanked_reason=next(
+            (file["yanked_reason"] for file in yanked if file.get("yanked_reason")), ""
+        ),
+        yanked_files=len(yanked),
+        requires_python=requires_python,
+        python_supported=_supports_python(requires_python),
+        wheels=sum(1 for url in urls if url.is_wheel and url.compatible),
+        sdist=any(url.packagetype == "sdist" for url in urls),
+    )
+
+
+##############################################################################
+async def audit_pins(pins: Iterable[Pin], jobs: int = 16) -> list[AuditResult]:
+    """Audit some pinned packages.
+
+    Args:
+        pins: The pinned packages.
+        jobs: The number of projects to check at once.
+
+    Returns:
+        The result of auditing each pin, in the order they were given.
+
+    Note:
+        Each project is fetched only once, even if it's pinned more than
+        once (say, with different markers).
+    """
+    pins = list(pins)
+    pending: Queue[str] = Queue()
+    for project in dict.fromkeys(normalise(pin.name) for pin in pins):
+        pending.put_nowait(project)
+    listings: dict[str, dict[str, list[dict[str, Any]]] | None] = {}
+    errors: dict[str, str] = {}
+
+    async def worker() -> None:
+        while not pending.empty():
+            project = pending.get_nowait()
+            try:
+                listings[project] = await _files_by_version(project)
+            except (httpx.HTTPError, ValueError) as error:
+                # Whether the project couldn't be fetched, or what came back
+                # couldn't be decoded, it's reported against its pins; the
+                # rest of the audit goes on.
+                errors[project] = str(error) or type(error).__name__
+
+    with tracer().span("audit", "audit", pins=len(pins)):
+        await gather(*(worker() for _ in range(max(1, jobs))))
+    return [
+        AuditResult(pin.name, pin.version, error=errors[project])
+        if (project := normalise(pin.name)) in errors
+        else check(pin, listings.get(project))
+        for pin in pins
+    ]
+
+
+### audit.py ends here
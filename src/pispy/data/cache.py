@@ -0,0 +1,280 @@
+"""Provides a persistent on-disk cache of responses from PyPI."""
+
+##############################################################################
+# Python imports.
+from contextlib import suppress
+from hashlib import sha256
+from json import dumps, loads
+from os import replace
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from time import time
+from typing import NamedTuple
+
+##############################################################################
+# Platform directory imports.
+from platformdirs import user_cache_path
+
+##############################################################################
+# Local imports.
+from .settings import CacheSettings
+
+
+##############################################################################
+class CacheEntry(NamedTuple):
+    """A response held in the cache."""
+
+    url: str
+    """The URL the response was for."""
+
+    status: int
+    """The HTTP status of the response."""
+
+    body: bytes
+    """The body of the response."""
+
+    etag: str = ""
+    """The `ETag` of the response."""
+
+    last_modified: str = ""
+    """The `Last-Modified` value of the response."""
+
+    serial: str = ""
+    """The `X-PyPI-Last-Serial` value of the response."""
+
+    validated: float = 0.0
+    """The time at which the response was last known to be current."""
+
+    content_type: str = ""
+    """The `Content-Type` of the response."""
+
+    @property
+    def age(self) -> float:
+        """The time, in seconds, since the entry was last validated."""
+        return time() - self.validated
+
+
+##############################################################################
+class HTTPCache:
+    """A size-bounded on-disk cache of HTTP responses.
+
+    Each response is held in its own file, named after a hash of the URL.
+    The file starts with a single line of JSON holding the metadata for the
+    response, followed by the raw body of the response.
+
+    The size of the cache is counted once, and then kept as a running total
+    as responses are written, so that writing a response doesn't mean
+    looking at every file in the cache; that only happens when the cache
+    has grown too large and needs responses evicting, or now and again to
+    take account of other processes using the same cache.
+    """
+
+    SUFFIX = ".cache"
+    """The suffix for the files held in the cache."""
+
+    RECOUNT_EVERY = 1_000
+    """The number of writes after which the size of the cache is recounted."""
+
+    EVICT_TO = 0.9
+    """The fraction of the maximum size that eviction brings the cache down to.
+
+    Eviction goes below the maximum, rather than just to it, so that there
+    is room for a good number of writes before it's needed again.
+    """
+
+    def __init__(self, settings: CacheSettings | None = None) -> None:
+        """Initialise the cache.
+
+        Args:
+            settings: The settings for the cache.
+        """
+        self.settings = settings or CacheSettings()
+        """The settings for the cache."""
+        self.location = self.settings.location or user_cache_path("pispy") / "http"
+        """The location of the cache on disk."""
+        self._size: int | None = None
+        self._writes = 0
+        self._lock = Lock()
+
+    def _path_for(self, url: str) -> Path:
+        """Get the path of the cache file for the given URL.
+
+        Args:
+            url: The URL to get the path for.
+
+        Returns:
+            The path to the cache file.
+        """
+        return self.location / f"{sha256(url.encode()).hexdigest()}{self.SUFFIX}"
+
+    def get(self, url: str) -> CacheEntry | None:
+        """Get a cached response for the given URL.
+
+        Args:
+            url: The URL to get the response for.
+
+        Returns:
+            The cached response, or `None` if there isn't one, or it can't
+            be read.
+        """
+        if not self.settings.enabled:
+            return None
+        try:
+            raw = (path := self._path_for(url)).read_bytes()
+            metadata, _, body = raw.partition(b"\n")
+            entry = CacheEntry(body=body, **loads(metadata))
+            # Touch the file so that eviction treats it as recently used.
+            path.touch()
+        except (OSError, ValueError, TypeError):
+            return None
+        return entry
+
+    def put(self, entry: CacheEntry) -> None:
+        """Put a response into the cache.
+
+        Args:
+            entry: The response to cache.
+
+        Note:
+            If the response can't be written (the disk is full, say, or the
+            cache's location can't be written to) it simply isn't cached.
+        """
+        if not self.settings.enabled:
+            return
+        metadata = entry._asdict()
+        del metadata["body"]
+        path = self._path_for(entry.url)
+        written: Path | None = None
+        try:
+            self.location.mkdir(parents=True, exist_ok=True)
+            with NamedTemporaryFile(
+                "wb", dir=self.location, delete=False
+            ) as cache_file:
+                written = Path(cache_file.name)
+                cache_file.write(dumps(metadata).encode())
+                cache_file.write(b"\n")
+                cache_file.write(entry.body)
+                size = cache_file.tell()
+            try:
+                replaced = path.stat().st_size
+            except OSError:
+                replaced = 0
+            replace(written, path)
+        except OSError:
+            if written is not None:
+                with suppress(OSError):
+                    written.unlink(missing_ok=True)
+            return
+        with self._lock:
+            self._writes += 1
+            if self._size is None or self._writes % self.RECOUNT_EVERY == 0:
+                self._size = self._count()
+            else:
+                self._size += size - replaced
+            too_large = self._size > self.settings.max_size
+        if too_large:
+            self.evict()
+
+    def revalidated(self, entry: CacheEntry) -> CacheEntry:
+        """Record that a cached response has been revalidated.
+
+        Args:
+            entry: The entry that has been revalidated.
+
+        Returns:
+            The updated entry.
+        """
+        self.put(entry := entry._replace(validated=time()))
+        return entry
+
+    @property
+    def size(self) -> int:
+        """The current size of the cache, in bytes."""
+        return sum(
+            cache_file.stat().st_size
+            for cache_file in self.location.glob(f"*{self.SUFFIX}")
+        )
+
+    def _count(self) -> int:
+        """Count the size of the cache, in bytes.
+
+        Returns:
+            The size of the cache; if a file goes missing while it is being
+            counted (say, evicted by another process), it is counted again.
+        """
+        while True:
+            try:
+                return self.size
+            except OSError:
+                pass
+
+    def evict(self) -> None:
+        """Evict the least recently used responses until the cache fits.
+
+        Responses are evicted until the cache is back down to `EVICT_TO` of
+        its maximum size.
+        """
+        try:
+            cache_files = sorted(
+                (
+                    (cache_file.stat(), cache_file)
+                    for cache_file in self.location.glob(f"*{self.SUFFIX}")
+                ),
+                key=lambda candidate: candidate[0].st_mtime,
+            )
+        except OSError:
+            return
+        size = sum(stat.st_size for stat, _ in cache_files)
+        if size <= self.settings.max_size:
+            with self._lock:
+                self._size = size
+            return
+        for stat, cache_file in cache_files:
+            if size <= self.settings.max_size * self.EVICT_TO:
+                break
+            with suppress(OSError):
+                cache_file.unlink(missing_ok=True)
+                size -= stat.st_size
+        with self._lock:
+            self._size = size
+
+    def clear(self) -> None:
+        """Remove everything from the cache."""
+        for cache_file in self.location.glob(f"*{self.SUFFIX}"):
+            cache_file.unlink(missing_ok=True)
+        with self._lock:
+            self._size = 0
+
+
+##############################################################################
+_cache = HTTPCache()
+"""The application-wide cache."""
+
+
+##############################################################################
+def configure_cache(settings: CacheSettings) -> HTTPCache:
+    """Configure the application-wide cache.
+
+    Args:
+        settings: The settings for the cache.
+
+    Returns:
+        The application-wide cache.
+    """
+    global _cache
+    _cache = HTTPCache(settings)
+    return _cache
+
+
+##############################################################################
+def cache() -> HTTPCache:
+    """Get the application-wide cache.
+
+    Returns:
+        The application-wide cache.
+    """
+    return _cache
+
+
+### cache.py ends here
@@ -0,0 +1,97 @@
+"""Provides the application-wide HTTP client used to talk to PyPI."""
+
+##############################################################################
+# Python imports.
+from importlib.util import find_spec
+
+##############################################################################
+# httpx imports.
+import httpx
+
+##############################################################################
+# Local imports.
+from .settings import ClientSettings
+
+##############################################################################
+_client: httpx.AsyncClient | None = None
+"""The shared HTTP client."""
+
+_settings = ClientSettings()
+"""The settings the shared HTTP client was opened with."""
+
+
+##############################################################################
+def http2_available() -> bool:
+    """Is HTTP/2 support available?
+
+    Returns:
+        `True` if the optional HTTP/2 support for httpx is installed.
+    """
+    return find_spec("h2") is not None
+
+
+##############################################################################
+def open_client(
+    settings: ClientSettings | None = None,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> httpx.AsyncClient:
+    """Open the shared HTTP client.
+
+    Args:
+        settings: The settings for the client.
+        transport: The transport for the client to use, if not the network.
+
+    Returns:
+        The shared HTTP client.
+
+    Note:
+        If a client is already open it is returned as-is and the settings
+        are ignored.
+    """
+    global _client, _settings
+    if _client is None:
+        _settings = settings = settings or ClientSettings()
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.timeout, connect=settings.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_keepalive_connections,
+                keepalive_expiry=settings.keepalive_expiry,
+            ),
+            http2=settings.http2 and http2_available(),
+            follow_redirects=True,
+            transport=transport,
+        )
+    return _client
+
+
+##############################################################################
+def client() -> httpx.AsyncClient:
+    """Get the shared HTTP client.
+
+    Returns:
+        The shared HTTP client, opened with default settings if need be.
+    """
+    return open_client()
+
+
+##############################################################################
+def client_settings() -> ClientSettings:
+    """Get the settings of the shared HTTP client.
+
+    Returns:
+        The settings the client was opened with.
+    """
+    return _settings
+
+
+##############################################################################
+async def close_client() -> None:
+    """Close the shared HTTP client, if it is open."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+### client.py ends here
@@ -0,0 +1,274 @@
+"""Provides comparison of two packages, or of two releases of a package."""
+
+##############################################################################
+# Python imports.
+from typing import Iterable, NamedTuple
+
+##############################################################################
+# Packaging imports.
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
+
+##############################################################################
+# Local imports.
+from .name_index import normalise
+from .package import Package
+
+
+##############################################################################
+class Difference(NamedTuple):
+    """A value that may differ between the two sides of a comparison."""
+
+    title: str
+    """The title of the value."""
+
+    old: str
+    """The value on the old side of the comparison, or empty if it has none."""
+
+    new: str
+    """The value on the new side of the comparison, or empty if it has none."""
+
+    same: bool = False
+    """Are the values the same, even if they're written differently?"""
+
+    @property
+    def kind(self) -> str:
+        """The kind of difference.
+
+        One of `same`, `added`, `removed` or `changed`.
+        """
+        if self.same or self.old == self.new:
+            return "same"
+        if not self.old:
+            return "added"
+        if not self.new:
+            return "removed"
+        return "changed"
+
+
+##############################################################################
+class Comparison(NamedTuple):
+    """A comparison of two packages, or two releases of a package."""
+
+    old: Package
+    """The package on the old side of the comparison."""
+
+    new: Package
+    """The package on the new side of the comparison."""
+
+    fields: tuple[Difference, ...]
+    """The differences in the details of the packages."""
+
+    requirements: tuple[Difference, ...]
+    """The differences in the requirements of the packages, keyed by name."""
+
+    classifiers: tuple[Difference, ...]
+    """The differences in the classifiers of the packages."""
+
+    def counts(self, differences: Iterable[Difference]) -> dict[str, int]:
+        """Count the kinds of some differences.
+
+        Args:
+            differences: The differences to count.
+
+        Returns:
+            The number of each kind of difference, other than `same`.
+        """
+        counts = {"added": 0, "removed": 0, "changed": 0}
+        for difference in differences:
+            if difference.kind != "same":
+                counts[difference.kind] += 1
+        return counts
+
+
+##############################################################################
+def split_spec(spec: str) -> tuple[str, str]:
+    """Split a package spec into the name and version of the package.
+
+    Args:
+        spec: The spec, as `name`, `name@version` or `name==version`.
+
+    Returns:
+        The name and version; the version is empty if none was given.
+    """
+    name, _, version = spec.replace("==", "@", 1).partition("@")
+    return name.strip(), version.strip()
+
+
+##############################################################################
+def _same_specifiers(old: str, new: str) -> bool:
+    """Are two version specifiers the same, however they're written?
+
+    Args:
+        old: The old specifier.
+        new: The new specifier.
+
+    Returns:
+        `True` if they match the same versions, `False` if not.
+    """
+    try:
+        return SpecifierSet(old) == SpecifierSet(new)
+    except InvalidSpecifier:
+        return old == new
+
+
+##############################################################################
+def _keyed_requirements(
+    requirements: Iterable[str],
+) -> dict[str, tuple[str, Requirement | None]]:
+    """Key requirements by what they require, and when.
+
+    Args:
+        requirements: The requirements.
+
+    Returns:
+        Each requirement, along with its parsed form if it parses, keyed by
+        the normalised name of what is required and any environment marker.
+    """
+    keyed: dict[str, tuple[str, Requirement | None]] = {}
+    for text in requirements:
+        try:
+            requirement = Requirement(text)
+        except InvalidRequirement:
+            key, parsed = text, None
+        else:
+            key = normalise(requirement.name)
+            if requirement.marker is not None:
+                key = f"{key}; {requirement.marker}"
+            parsed = requirement
+        while key in keyed:
+            key = f"{key} "
+        keyed[key] = (text, parsed)
+    return keyed
+
+
+##############################################################################
+def _same_requirement(old: Requirement | None, new: Requirement | None) -> bool:
+    """Are two requirements the same, however they're written?
+
+    Args:
+        old: The old requirement.
+        new: The new requirement.
+
+    Returns:
+        `True` if they require the same thing, `False` if not.
+    """
+    return (
+        old is not None
+        and new is not None
+        and old.extras == new.extras
+        and old.specifier == new.specifier
+        and old.url == new.url
+    )
+
+
+##############################################################################
+def requirement_differences(
+    old: Iterable[str], new: Iterable[str]
+) -> tuple[Difference, ...]:
+    """Compare two sets of requirements.
+
+    Args:
+        old: The old requirements.
+        new: The new requirements.
+
+    Returns:
+        The differences, sorted by what is required.
+
+    Note:
+        Requirements are matched up by the name of what they require and
+        their environment marker, and compared by their extras, version
+        specifiers and URL, so `foo>=1.0,<2` is the same as `Foo<2,>=1`.
+        Requirements that don't parse are compared as they're written.
+    """
+    old_keyed = _keyed_requirements(old)
+    new_keyed = _keyed_requirements(new)
+    differences = []
+    for key in sorted({*old_keyed, *new_keyed}):
+        old_text, old_requirement = old_keyed.get(key, ("", None))
+        new_text, new_requirement = new_keyed.get(key, ("", None))
+        differences.append(
+            Difference(
+                key.strip(),
+                old_text,
+                new_text,
+                _same_requirement(old_requirement, new_requirement),
+            )
+        )
+    return tuple(differences)
+
+
+##############################################################################
+def _line_differences(old: Iterable[str], new: Iterable[str]) -> tuple[Difference, ...]:
+    """Compare two collections of lines of text.
+
+    Args:
+        old: The old lines.
+        new: The new lines.
+
+    Returns:
+        The differences, sorted.
+    """
+    old_lines, new_lines = set(old), set(new)
+    return tuple(
+        Difference(
+            line,
+            line if line in old_lines else "",
+            line if line in new_lines else "",
+        )
+        for line in sorted(old_lines | new_lines)
+    )
+
+
+##############################################################################
+def compare_packages(old: Package, new: Package) -> Comparison:
+    """Compare two packages, or two releases of a package.
+
+    Args:
+        old: The package on the old side of the comparison.
+        new: The package on the new side of the comparison.
+
+    Returns:
+        The comparison.
+    """
+    return Comparison(
+        old,
+        new,
+        (
+            Difference(
+                "Name", old.name, new.name, normalise(old.name) == normalise(new.name)
+            ),
+            Difference("Version", old.version, new.version),
+            Difference("Summary", old.summary, new.summary),
+            Difference(
+                "Requires Python",
+                old.requires_python,
+                new.requires_python,
+                _same_specifiers(old.requires_python, new.requires_python),
+            ),
+            Difference("License", old.license, new.license),
+            Difference("Author", old.author, new.author),
+            Difference("Maintainer", old.maintainer, new.maintainer),
+            Difference("Homepage", old.homepage, new.homepage),
+            Difference("Keywords", ", ".join(old.keywords), ", ".join(new.keywords)),
+            Difference("Files", f"{len(old.urls):,}", f"{len(new.urls):,}"),
+            Difference(
+                "Total Size",
+                f"{sum(url.size for url in old.urls):,}",
+                f"{sum(url.size for url in new.urls):,}",
+            ),
+            Difference(
+                "Largest File",
+                f"{max((url.size for url in old.urls), default=0):,}",
+                f"{max((url.size for url in new.urls), default=0):,}",
+            ),
+            Difference(
+                "Yanked", "Yes" if old.yanked else "No", "Yes" if new.yanked else "No"
+            ),
+        ),
+        requirement_differences(old.requires_dist, new.requires_dist),
+        _line_differences(old.classifiers, new.classifiers),
+    )
+
+
+### comparison.py ends here
@@ -0,0 +1,256 @@
+"""Provides incremental, selective, decoding of JSON objects.
+
+The documents served by the PyPI JSON API can run to several megabytes,
+almost all of which is the legacy `releases` mapping. Decoding all of that
+just to throw it away is wasted time and memory. The decoder here scans a
+JSON object as its bytes arrive, only decoding the keys that are wanted,
+and holding back others so that they can be decoded on demand.
+"""
+
+##############################################################################
+# Python imports.
+from json import loads
+from re import Pattern, compile
+from typing import Any, Collection
+
+##############################################################################
+# Regular expressions used to scan the JSON.
+_WHITESPACE = compile(rb"[ \t\n\r]*")
+_KEY = compile(rb'[ \t\n\r]*,?[ \t\n\r]*"((?:[^"\\]|\\.)*)"[ \t\n\r]*:[ \t\n\r]*')
+_END = compile(rb"[ \t\n\r]*}")
+_STRING = compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+_SCALAR = compile(rb"[^,}\] \t\n\r]+")
+_FILL = compile(rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*')
+
+
+##############################################################################
+def _skip(pattern: Pattern[bytes], data: bytearray, position: int) -> int:
+    """Skip over whatever the pattern matches.
+
+    Args:
+        pattern: The pattern to skip.
+        data: The data to skip through.
+        position: The position to start skipping from.
+
+    Returns:
+        The position after the match.
+    """
+    return position if (match := pattern.match(data, position)) is None else match.end()
+
+
+##############################################################################
+class DecodingError(ValueError):
+    """Raised when the data being decoded isn't a valid JSON object."""
+
+
+##############################################################################
+class LazyJSON:
+    """A JSON value that is only decoded when it is first needed."""
+
+    __slots__ = ("_raw", "_value", "size")
+
+    def __init__(self, raw: bytes) -> None:
+        """Initialise the lazy value.
+
+        Args:
+            raw: The raw JSON for the value.
+        """
+        self._raw: bytes | None = raw
+        self._value: Any = None
+        self.size = len(raw)
+        """The size of the raw JSON for the value."""
+
+    def decode(
+        self, wanted: Collection[str] | None = None, lazy: Collection[str] = ()
+    ) -> dict[str, Any]:
+        """Selectively decode the value, which must be an object.
+
+        Args:
+            wanted: The keys whose values should be decoded, or `None` for
+                all keys.
+            lazy: The keys whose values should be held as `LazyJSON`.
+
+        Returns:
+            The decoded values.
+        """
+        if self._raw is None:
+            return dict(self._value)
+        return decode(self._raw, wanted, lazy)
+
+    @property
+    def value(self) -> Any:
+        """The decoded value."""
+        if self._raw is not None:
+            self._value = loads(self._raw)
+            self._raw = None
+        return self._value
+
+
+##############################################################################
+class SelectiveDecoder:
+    """An incremental decoder for selected keys of a JSON object.
+
+    Data is passed to the decoder with `feed` as it arrives; the decoder
+    scans as far as it can with what it has been given. Values for keys
+    that aren't wanted are skipped without being decoded.
+    """
+
+    def __init__(
+        self, wanted: Collection[str] | None = None, lazy: Collection[str] = ()
+    ) -> None:
+        """Initialise the decoder.
+
+        Args:
+            wanted: The keys whose values should be decoded, or `None` for
+                all keys.
+            lazy: The keys whose values should be held as `LazyJSON`.
+        """
+        self._wanted = wanted
+        self._lazy = lazy
+        self._buffer = bytearray()
+        self._position = 0
+        self._started = False
+        self._finished = False
+        self._key: str | None = None
+        self._depth = 0
+        self._value_start = 0
+        self.values: dict[str, Any] = {}
+        """The values that have been decoded so far."""
+
+    def feed(self, data: bytes) -> None:
+        """Feed more data to the decoder.
+
+        Args:
+            data: The data to feed.
+
+        Raises:
+            DecodingError: If the data isn't a valid JSON object.
+        """
+        self._buffer += data
+        while not self._finished and self._step():
+            pass
+
+    def close(self) -> dict[str, Any]:
+        """Finish decoding.
+
+        Returns:
+            The decoded values.
+
+        Raises:
+            DecodingError: If the object wasn't complete.
+        """
+        if not self._finished:
+            raise DecodingError("Incomplete JSON object")
+        return self.values
+
+    def _step(self) -> bool:
+        """Take a step through the data.
+
+        Returns:
+            `True` if progress was made, `False` if more data is needed.
+        """
+        buffer = self._buffer
+        if not self._started:
+            self._position = _skip(_WHITESPACE, buffer, self._position)
+            if self._position == len(buffer):
+                return False
+            if buffer[self._position] != ord("{"):
+                raise DecodingError("Expected a JSON object")
+            self._position += 1
+            self._started = True
+            return True
+        if self._key is None:
+            return self._next_key()
+        return self._scan_value()
+
+    def _next_key(self) -> bool:
+        """Move on to the next key in the object.
+
+        Returns:
+            `True` if progress was made, `False` if more data is needed.
+        """
+        if end := _END.match(self._buffer, self._position):
+            self._position = end.end()
+            self._finished = True
+            return True
+        key = _KEY.match(self._buffer, self._position)
+        if key is None or key.end() == len(self._buffer):
+            # A key, or the whitespace after it, may still be arriving.
+            if len(self._buffer) - self._position > 4096 and key is None:
+                raise DecodingError("Expected a key")
+            return False
+        self._key = loads(b'"' + key[1] + b'"')
+        self._position = self._value_start = key.end()
+        self._depth = 0
+        return True
+
+    def _scan_value(self) -> bool:
+        """Scan the value of the current key.
+
+        Returns:
+            `True` if progress was made, `False` if more data is needed.
+        """
+        buffer = self._buffer
+        start = buffer[self._value_start]
+        if start in b"{[":
+            while True:
+                self._position = _skip(_FILL, buffer, self._position)
+                if self._position == len(buffer) or buffer[self._position] == ord('"'):
+                    # We're at the end of the data, or in a string that
+                    # hasn't fully arrived yet.
+                    return False
+                self._depth += 1 if buffer[self._position] in b"{[" else -1
+                self._position += 1
+                if not self._depth:
+                    break
+        else:
+            value = (_STRING if start == ord('"') else _SCALAR).match(
+                buffer, self._value_start
+            )
+            if value is None or value.end() == len(buffer):
+                return False
+            self._position = value.end()
+        self._keep()
+        return True
+
+    def _keep(self) -> None:
+        """Keep the value of the current key, if it is wanted."""
+        assert self._key is not None
+        if self._key in self._lazy:
+            self.values[self._key] = LazyJSON(
+                bytes(self._buffer[self._value_start : self._position])
+            )
+        elif self._wanted is None or self._key in self._wanted:
+            try:
+                self.values[self._key] = loads(
+                    self._buffer[self._value_start : self._position]
+                )
+            except ValueError as error:
+                raise DecodingError(str(error)) from None
+        self._key = None
+
+
+##############################################################################
+def decode(
+    data: bytes, wanted: Collection[str] | None = None, lazy: Collection[str] = ()
+) -> dict[str, Any]:
+    """Selectively decode a complete JSON object.
+
+    Args:
+        data: The JSON data.
+        wanted: The keys whose values should be decoded, or `None` for all
+            keys.
+        lazy: The keys whose values should be held as `LazyJSON`.
+
+    Returns:
+        The decoded values.
+
+    Raises:
+        DecodingError: If the data isn't a valid JSON object.
+    """
+    decoder = SelectiveDecoder(wanted, lazy)
+    decoder.feed(data)
+    return decoder.close()
+
+
+### decoding.py ends here
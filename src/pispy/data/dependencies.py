@@ -0,0 +1,173 @@
+"""Provides concurrent resolution of a package's dependency tree."""
+
+##############################################################################
+# Python imports.
+from asyncio import Queue, Semaphore, Task, create_task
+from collections import defaultdict
+from typing import AsyncIterator, Iterable, NamedTuple
+
+##############################################################################
+# httpx imports.
+import httpx
+
+##############################################################################
+# Packaging imports.
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import NormalizedName, canonicalize_name
+
+##############################################################################
+# Local imports.
+from .package import Package
+
+
+##############################################################################
+class Resolution(NamedTuple):
+    """The result of resolving a package in a dependency tree."""
+
+    name: NormalizedName
+    """The normalised name of the package."""
+
+    package: Package | None
+    """The package, or `None` if it couldn't be found."""
+
+    requirements: list[Requirement]
+    """The requirements of the package that are newly in play."""
+
+
+##############################################################################
+def applicable(
+    requirement: Requirement, extras: Iterable[str], evaluate_markers: bool
+) -> bool:
+    """Does a requirement apply, given the extras in play?
+
+    Args:
+        requirement: The requirement to check.
+        extras: The extras that have been asked for.
+        evaluate_markers: Should environment markers be evaluated?
+
+    Returns:
+        `True` if the requirement applies, `False` if not.
+
+    Note:
+        If markers aren't being evaluated every requirement applies.
+    """
+    if requirement.marker is None or not evaluate_markers:
+        return True
+    return any(requirement.marker.evaluate({"extra": extra}) for extra in extras)
+
+
+##############################################################################
+def requirements_of(package: Package) -> Iterable[Requirement]:
+    """Get the parsed requirements of a package.
+
+    Args:
+        package: The package to get the requirements for.
+
+    Yields:
+        The requirements of the package, skipping any that can't be parsed.
+    """
+    for requirement in package.requires_dist:
+        try:
+            yield Requirement(requirement)
+        except InvalidRequirement:
+            pass
+
+
+##############################################################################
+async def resolve(
+    root: str | Package,
+    extras: Iterable[str] = (),
+    concurrency: int = 8,
+    evaluate_markers: bool = True,
+) -> AsyncIterator[Resolution]:
+    """Resolve the dependency tree of a package.
+
+    Args:
+        root: The package to resolve the tree for, or its name to resolve
+            the tree of its latest release.
+        extras: The extras of the root package to include.
+        concurrency: The maximum number of packages to fetch at once.
+        evaluate_markers: Should environment markers be evaluated?
+
+    Yields:
+        The resolution of each package in the tree, as it arrives.
+
+    Note:
+        Every package in the tree is fetched only once, no matter how many
+        times it appears. If a package is required again with extras that
+        haven't been seen before, a further resolution is yielded that
+        carries only the requirements that those extras bring into play.
+    """
+
+    slots = Semaphore(concurrency)
+    results: Queue[tuple[NormalizedName, Package | None]] = Queue()
+    in_flight: dict[NormalizedName, Task[None]] = {}
+    packages: dict[NormalizedName, Package | None] = {}
+    wanted: defaultdict[NormalizedName, set[str]] = defaultdict(set)
+    expanded: defaultdict[NormalizedName, set[str]] = defaultdict(set)
+
+    async def fetch(name: NormalizedName) -> None:
+        found = False
+        try:
+            async with slots:
+                found, package = await Package.from_pypi(name)
+        except (httpx.HTTPError, ValueError):
+            # Couldn't get it, or couldn't make sense of what we got; either
+            # way it's not found.
+            pass
+        finally:
+            # Always say how it went, or the tree would wait on it forever.
+            results.put_nowait((name, package if found else None))
+
+    def schedule(name: NormalizedName) -> None:
+        if name not in packages and name not in in_flight:
+            in_flight[name] = create_task(fetch(name))
+
+    def expand(name: NormalizedName) -> Iterable[Resolution]:
+        if (package := packages[name]) is None:
+            if not expanded[name]:
+                expanded[name].add("")
+                yield Resolution(name, None, [])
+            return
+        # Work out which of the extras wanted for this package are new.
+        previous = set(expanded[name])
+        if not (extras := ({""} | wanted[name]) - previous):
+            return
+        expanded[name] |= extras
+        requirements = [
+            requirement
+            for requirement in requirements_of(package)
+            if applicable(requirement, extras, evaluate_markers)
+            and not (previous and applicable(requirement, previous, evaluate_markers))
+        ]
+        yield Resolution(name, package, requirements)
+        for requirement in requirements:
+            wanted[child := canonicalize_name(requirement.name)] |= requirement.extras
+            if child in packages:
+                yield from expand(child)
+            else:
+                schedule(child)
+
+    try:
+        if isinstance(root, Package):
+            # We already have the release being viewed; start from that
+            # rather than looking up whatever the latest release is.
+            wanted[root_name := canonicalize_name(root.name)] |= set(extras)
+            packages[root_name] = root
+            for resolution in expand(root_name):
+                yield resolution
+        else:
+            wanted[root_name := canonicalize_name(root)] |= set(extras)
+            schedule(root_name)
+        while in_flight:
+            name, package = await results.get()
+            del in_flight[name]
+            packages[name] = package
+            for resolution in expand(name):
+                yield resolution
+    finally:
+        for task in in_flight.values():
+            task.cancel()
+
+
+### dependencies.py ends here
@@ -0,0 +1,374 @@
+"""Provides preparation of package descriptions for display."""
+
+##############################################################################
+# Python imports.
+from collections import OrderedDict
+from itertools import accumulate
+from re import Match, compile
+from typing import Iterator
+
+##############################################################################
+# Markdown imports.
+from markdown_it import MarkdownIt
+from markdown_it.token import Token
+
+##############################################################################
+# Local imports.
+from .package import Package
+
+##############################################################################
+# reStructuredText constructs that we translate.
+_ADORNMENT = compile(r"^([=\-~^\"'`#*+_:.])\1{2,}\s*$")
+_DIRECTIVE = compile(r"^\.\.\s+(?:\|[^|]+\|\s+)?([\w:-]+)::\s*(.*)$")
+_TARGET = compile(r"^\.\.\s+_`?([^:`]+)`?:\s*(\S+)\s*$")
+_SIMPLE_TABLE = compile(r"^\s*=+(\s+=+)+\s*$")
+_ENUMERATED = compile(r"^(\s*)#\.\s")
+_INLINE_LITERAL = compile(r"``(.+?)``")
+_EMBEDDED_LINK = compile(r"`([^`<]+?)\s*<([^>]+)>`__?")
+_NAMED_LINK = compile(r"`([^`]+)`__?(?!\w)")
+_ROLE = compile(r":[\w:-]+:`([^`]+)`")
+_ADMONITIONS = {
+    "attention",
+    "caution",
+    "danger",
+    "error",
+    "hint",
+    "important",
+    "note",
+    "tip",
+    "warning",
+}
+
+
+##############################################################################
+def _indented_block(lines: list[str], start: int) -> tuple[list[str], int]:
+    """Collect the indented block that starts at the given line.
+
+    Args:
+        lines: The lines of the document.
+        start: The line to start collecting from.
+
+    Returns:
+        The dedented lines of the block, and the line after the block.
+    """
+    end = start
+    while end < len(lines) and (not lines[end].strip() or lines[end][:1].isspace()):
+        end += 1
+    block = lines[start:end]
+    while block and not block[-1].strip():
+        block.pop()
+    while block and not block[0].strip():
+        block.pop(0)
+    indent = min(
+        (len(line) - len(line.lstrip()) for line in block if line.strip()), default=0
+    )
+    return [line[indent:] for line in block], end
+
+
+##############################################################################
+def _inline(text: str, targets: dict[str, str]) -> str:
+    """Translate the inline markup of a line of reStructuredText.
+
+    Args:
+        text: The text to translate.
+        targets: The named hyperlink targets in the document.
+
+    Returns:
+        The text as Markdown.
+    """
+
+    def named(match: Match[str]) -> str:
+        name = match[1]
+        return f"[{name}]({targets[name.lower()]})" if name.lower() in targets else name
+
+    text = _EMBEDDED_LINK.sub(r"[\1](\2)", text)
+    text = _ROLE.sub(r"`\1`", text)
+    text = _NAMED_LINK.sub(named, text)
+    return _INLINE_LITERAL.sub(r"`\1`", text)
+
+
+##############################################################################
+def rst_to_markdown(text: str) -> str:
+    """Translate reStructuredText into Markdown.
+
+    Args:
+        text: The reStructuredText to translate.
+
+    Returns:
+        The text as Markdown.
+
+    Note:
+        This covers the constructs that are commonly used in package
+        descriptions (section titles, literal and code blocks, hyperlinks,
+        admonitions and inline markup); anything else is passed through
+        as-is, which generally reads well enough as Markdown.
+    """
+    lines = text.expandtabs().splitlines()
+    targets = {
+        match[1].lower(): match[2] for line in lines if (match := _TARGET.match(line))
+    }
+    levels: list[str] = []
+    output: list[str] = []
+
+    def heading(title: str, adornment: str) -> None:
+        if adornment not in levels:
+            levels.append(adornment)
+        output.extend((f"{'#' * min(levels.index(adornment) + 1, 6)} {title}", ""))
+
+    line = 0
+    while line < len(lines):
+        current = lines[line]
+        following = lines[line + 1] if line + 1 < len(lines) else ""
+
+        # Section titles, with or without an overline.
+        if _ADORNMENT.match(current) and line + 2 < len(lines):
+            if _ADORNMENT.match(lines[line + 2]) and lines[line + 1].strip():
+                heading(lines[line + 1].strip(), f"over{current[0]}")
+                line += 3
+                continue
+        if current.strip() and not current[0].isspace() and _ADORNMENT.match(following):
+            if len(following.rstrip()) >= len(current.rstrip()):
+                heading(_inline(current.strip(), targets), following[0])
+                line += 2
+                continue
+
+        # Directives, comments and hyperlink targets.
+        if current.startswith(".."):
+            body, line = _indented_block(lines, line + 1)
+            if directive := _DIRECTIVE.match(current):
+                name, argument = directive[1].lower(), directive[2].strip()
+                if name in ("code", "code-block", "sourcecode"):
+                    output.extend((f"```{argument}", *body, "```", ""))
+                elif name in ("image", "figure") and argument:
+                    output.extend((f"![{argument}]({argument})", ""))
+                elif name in _ADMONITIONS:
+                    output.extend(
+                        (
+                            f"> **{name.title()}:** {_inline(argument, targets)}",
+                            *(f"> {_inline(text, targets)}" for text in body),
+                            "",
+                        )
+                    )
+            continue
+
+        # Literal blocks, introduced by a paragraph ending in `::`.
+        if current.rstrip().endswith("::") and not current.startswith(".."):
+            if introduction := current.rstrip()[:-2].rstrip():
+                output.append(_inline(f"{introduction}:", targets))
+            body, line = _indented_block(lines, line + 1)
+            output.extend(("", "```", *body, "```", ""))
+            continue
+
+        # Transitions.
+        if _ADORNMENT.match(current):
+            output.extend(("---", ""))
+            line += 1
+            continue
+
+        # Tables are shown as they are, which is how they were drawn.
+        if current.lstrip().startswith("+-") or _SIMPLE_TABLE.match(current):
+            table, line = [current], line + 1
+            while line < len(lines) and lines[line].strip():
+                table.append(lines[line])
+                line += 1
+            output.extend(("```", *table, "```"))
+            continue
+
+        output.append(_inline(_ENUMERATED.sub(r"\g<1>1. ", current), targets))
+        line += 1
+
+    return "\n".join(output)
+
+
+##############################################################################
+def _blocks(markdown: str) -> Iterator[list[str]]:
+    """Split Markdown into blocks that are safe to render separately.
+
+    Args:
+        markdown: The Markdown to split.
+
+    Yields:
+        The lines of each block.
+
+    Note:
+        Blocks are split at blank lines, but never inside a fenced code
+        block.
+    """
+    block: list[str] = []
+    fence = ""
+    for line in markdown.splitlines():
+        stripped = line.lstrip()
+        if fence:
+            if stripped.startswith(fence):
+                fence = ""
+        elif stripped.startswith(("```", "~~~")):
+            fence = stripped[:3]
+        block.append(line)
+        if not fence and not line.strip():
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+##############################################################################
+def chunked(markdown: str, first: int = 80, rest: int = 400) -> list[str]:
+    """Split Markdown into chunks for progressive rendering.
+
+    Args:
+        markdown: The Markdown to split.
+        first: The approximate number of lines in the first chunk.
+        rest: The approximate number of lines in each following chunk.
+
+    Returns:
+        The chunks of Markdown.
+    """
+    chunks: list[str] = []
+    chunk: list[str] = []
+    for block in _blocks(markdown):
+        chunk.extend(block)
+        if len(chunk) >= (rest if chunks else first):
+            chunks.append("\n".join(chunk))
+            chunk = []
+    if chunk or not chunks:
+        chunks.append("\n".join(chunk))
+    return chunks
+
+
+##############################################################################
+def is_markup(package: Package) -> bool:
+    """Is the description of the package in a markup language we render?
+
+    Args:
+        package: The package to check.
+
+    Returns:
+        `True` if the description is Markdown or reStructuredText.
+    """
+    return package.description_content_type.split(";")[0].strip() in (
+        "text/markdown",
+        "text/x-rst",
+        "",
+    )
+
+
+##############################################################################
+_prepared: OrderedDict[tuple[str, str], list[str]] = OrderedDict()
+"""The cache of prepared descriptions."""
+
+
+##############################################################################
+def prepare(package: Package, cache_size: int = 32) -> list[str]:
+    """Prepare the description of a package for display.
+
+    Args:
+        package: The package whose description should be prepared.
+        cache_size: The number of prepared descriptions to keep.
+
+    Returns:
+        The description as chunks of Markdown, ready to be rendered in
+        order.
+
+    Note:
+        Descriptions are cached by package name and version. Descriptions
+        with no content type are treated as reStructuredText, as that is
+        the default for the core metadata.
+    """
+    if (key := (package.name, package.version)) in _prepared:
+        _prepared.move_to_end(key)
+        return _prepared[key]
+    description = package.description
+    if package.description_content_type.split(";")[0].strip() != "text/markdown":
+        description = rst_to_markdown(description)
+    _prepared[key] = chunks = chunked(description)
+    while len(_prepared) > cache_size:
+        _prepared.popitem(last=False)
+    return chunks
+
+
+##############################################################################
+PARSER = "gfm-like"
+"""The Markdown parser configuration used to render descriptions."""
+
+_parsed: OrderedDict[tuple[str, str], list[tuple[str, list[Token]]]] = OrderedDict()
+"""The cache of parsed descriptions."""
+
+
+##############################################################################
+def _split(
+    markdown: str, tokens: list[Token], starts: list[int]
+) -> list[tuple[str, list[Token]]]:
+    """Split a parsed Markdown document into chunks.
+
+    Args:
+        markdown: The Markdown that was parsed.
+        tokens: The tokens of the whole document.
+        starts: The lines at which chunks would ideally start.
+
+    Returns:
+        Each chunk of the document, along with its tokens.
+
+    Note:
+        The tokens are only split where a top-level block starts, so a
+        block that spans one of the ideal starts is kept whole, in the
+        chunk it starts in.
+    """
+    lines = markdown.split("\n")
+    groups: list[tuple[int, list[Token]]] = [(0, [])]
+    wanted = iter(starts)
+    boundary = next(wanted, None)
+    for token in tokens:
+        if (
+            boundary is not None
+            and token.level == 0
+            and token.nesting >= 0
+            and token.map is not None
+            and token.map[0] >= boundary
+        ):
+            while boundary is not None and token.map[0] >= boundary:
+                boundary = next(wanted, None)
+            if groups[-1][1]:
+                groups.append((token.map[0], []))
+        groups[-1][1].append(token)
+    return [
+        ("\n".join(lines[start:end]), group)
+        for (start, group), end in zip(
+            groups, [*(start for start, _ in groups[1:]), len(lines)]
+        )
+    ]
+
+
+##############################################################################
+def parse(package: Package, cache_size: int = 32) -> list[tuple[str, list[Token]]]:
+    """Prepare and parse the description of a package for display.
+
+    Args:
+        package: The package whose description should be parsed.
+        cache_size: The number of parsed descriptions to keep.
+
+    Returns:
+        Each chunk of the prepared description, along with its Markdown
+        tokens.
+
+    Note:
+        This is the costly part of rendering a description, so it is meant
+        to be run in a thread; all that is left to do on the event loop is
+        to build the widgets from the tokens. The description is parsed as
+        a whole, so that references (such as the link definitions for
+        badges, which tend to be at the end) apply throughout, and then
+        split into chunks. Parsed descriptions are cached by package name
+        and version.
+    """
+    if (key := (package.name, package.version)) in _parsed:
+        _parsed.move_to_end(key)
+        return _parsed[key]
+    chunks = prepare(package)
+    markdown = "\n".join(chunks)
+    starts = list(accumulate(chunk.count("\n") + 1 for chunk in chunks[:-1]))
+    _parsed[key] = parsed = _split(markdown, MarkdownIt(PARSER).parse(markdown), starts)
+    while len(_parsed) > cache_size:
+        _parsed.popitem(last=False)
+    return parsed
+
+
+### description.py ends here
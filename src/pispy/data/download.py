@@ -0,0 +1,399 @@
+"""Provides downloading of the files of a package.
+
+Files are downloaded as a number of chunks at once, using HTTP range
+requests over the shared client's pool of connections, with each chunk
+written straight to its place in the file as it arrives. The digests of
+the file are worked out as the download goes: whenever the start of the
+file has been written without gaps, it is read back and hashed, so the
+whole file is never held in memory.
+
+Partly-downloaded files are kept next to where the file is going, along
+with a note of the chunks that are complete, so that a download that is
+interrupted picks up where it left off.
+"""
+
+##############################################################################
+# Python imports.
+from asyncio import Queue, create_task, gather
+from hashlib import blake2b, sha256
+from io import FileIO
+from json import dumps, loads
+from pathlib import Path
+from time import monotonic
+from typing import Any, Callable
+
+##############################################################################
+# httpx imports.
+import httpx
+
+##############################################################################
+# Local imports.
+from .client import client
+from .instrumentation import metrics, tracer
+from .package import PackageURL
+
+
+##############################################################################
+class DownloadError(Exception):
+    """Raised when a file can't be downloaded."""
+
+
+##############################################################################
+class _RangesUnsupported(DownloadError):
+    """Raised when the server won't honour range requests."""
+
+
+##############################################################################
+_HASHES: dict[str, Callable[[], Any]] = {
+    "sha256": sha256,
+    "blake2b_256": lambda: blake2b(digest_size=32),
+}
+"""The digests that can be checked, and how to work them out."""
+
+
+##############################################################################
+def _write(file: FileIO, data: bytes, offset: int) -> None:
+    """Write data to a file at a given offset.
+
+    Args:
+        file: The file to write to.
+        data: The data to write.
+        offset: The offset to write the data at.
+    """
+    file.seek(offset)
+    view = memoryview(data)
+    while view:
+        view = view[file.write(view) or 0 :]
+
+
+##############################################################################
+class Download:
+    """The download of a file of a package."""
+
+    CHUNK_SIZE = 4 * 1024 * 1024
+    """The size of each chunk of the file that is downloaded."""
+
+    CONNECTIONS = 4
+    """The default number of chunks to download at once."""
+
+    _HASH_BLOCK = 1024 * 1024
+    """The amount of the file that is read back at a time to hash it."""
+
+    def __init__(
+        self, package_url: PackageURL, destination: Path, connections: int = 0
+    ) -> None:
+        """Initialise the download.
+
+        Args:
+            package_url: The file to download.
+            destination: The directory to download the file to.
+            connections: The number of chunks to download at once.
+        """
+        self.package_url = package_url
+        """The file being downloaded."""
+        self.target = destination / package_url.filename
+        """The path the file is being downloaded to."""
+        self.connections = max(1, connections or self.CONNECTIONS)
+        """The number of chunks to download at once."""
+        self.total = package_url.size
+        """The size of the file."""
+        self.done = 0
+        """The number of bytes of the file that have been downloaded."""
+        self.resumed = 0
+        """The number of bytes that were already downloaded when this started."""
+        self.started = 0.0
+        """The time at which the download started."""
+        self.finished = 0.0
+        """The time at which the download finished."""
+        self._partial = self.target.with_name(f"{self.target.name}.part")
+        self._state = self.target.with_name(f"{self.target.name}.part.json")
+        self._complete: set[int] = set()
+        self._hashed = 0
+        self._hashes = {
+            algorithm: _HASHES[algorithm]()
+            for algorithm in package_url.digests
+            if algorithm in _HASHES
+        }
+
+    @property
+    def elapsed(self) -> float:
+        """The time, in seconds, the download has taken so far."""
+        if not self.started:
+            return 0.0
+        return (self.finished or monotonic()) - self.started
+
+    @property
+    def rate(self) -> float:
+        """The rate of the download, in bytes per second."""
+        if not (elapsed := self.elapsed):
+            return 0.0
+        return (self.done - self.resumed) / elapsed
+
+    @property
+    def status(self) -> str:
+        """A description of how far the download has got."""
+        percent = 100 * self.done / self.total if self.total else 0
+        return (
+            f"{percent:.0f}% ({self.done:,} of {self.total:,} bytes) "
+            f"at {self.rate / 1_000_000:.1f} MB/s"
+        )
+
+    @property
+    def _chunks(self) -> int:
+        """The number of chunks in the file."""
+        return max(1, -(-self.total // self.CHUNK_SIZE))
+
+    def _load_state(self) -> None:
+        """Load the state of an earlier attempt at the download, if there was one."""
+        try:
+            state = loads(self._state.read_text())
+        except (OSError, ValueError):
+            return
+        if (
+            state.get("url") == self.package_url.url
+            and state.get("size") == self.total
+            and state.get("chunk_size") == self.CHUNK_SIZE
+            and self._partial.exists()
+        ):
+            self._complete = set(state.get("complete", ()))
+            self.resumed = self.done = sum(
+                self._chunk_range(chunk)[1] - self._chunk_range(chunk)[0]
+                for chunk in self._complete
+            )
+
+    def _save_state(self) -> None:
+        """Save the state of the download, so that it can be resumed."""
+        self._state.write_text(
+            dumps(
+                {
+                    "url": self.package_url.url,
+                    "size": self.total,
+                    "chunk_size": self.CHUNK_SIZE,
+                    "complete": sorted(self._complete),
+                }
+            )
+        )
+
+    def _chunk_range(self, chunk: int) -> tuple[int, int]:
+        """Get the range of the file covered by a chunk.
+
+        Args:
+            chunk: The number of the chunk.
+
+        Returns:
+            The offset of the start of the chunk, and of just after its end.
+        """
+        start = chunk * self.CHUNK_SIZE
+        return start, min(start + self.CHUNK_SIZE, self.total)
+
+    def _hash_written(self, file: FileIO) -> None:
+        """Hash as much of the start of the file as has been written without gaps.
+
+        Args:
+            file: The file being written.
+        """
+        while (chunk := self._hashed // self.CHUNK_SIZE) in self._complete:
+            end = self._chunk_range(chunk)[1]
+            while self._hashed < end:
+                file.seek(self._hashed)
+                block = file.read(min(self._HASH_BLOCK, end - self._hashed))
+                if not block:
+                    raise DownloadError(f"{self._partial} is shorter than expected")
+                for digest in self._hashes.values():
+                    digest.update(block)
+                self._hashed += len(block)
+            if end >= self.total:
+                break
+
+    async def _fetch_chunk(self, file: FileIO, chunk: int) -> None:
+        """Download a chunk of the file, writing it as it arrives.
+
+        Args:
+            file: The file being written.
+            chunk: The number of the chunk.
+
+        Raises:
+            DownloadError: If the server doesn't send the chunk.
+        """
+        start, end = self._chunk_range(chunk)
+        with tracer().span("download.chunk", "http", chunk=chunk, bytes=end - start):
+            async with client().stream(
+                "GET",
+                self.package_url.url,
+                headers={"Range": f"bytes={start}-{end - 1}"},
+            ) as response:
+                if response.status_code == httpx.codes.OK:
+                    raise _RangesUnsupported()
+                if response.status_code != httpx.codes.PARTIAL_CONTENT:
+                    raise DownloadError(
+                        f"The server responded to a range request with "
+                        f"{response.status_code}"
+                    )
+                offset = start
+                async for data in response.aiter_bytes():
+                    if offset + len(data) > end:
+                        raise DownloadError("The server sent more than was asked for")
+                    _write(file, data, offset)
+                    offset += len(data)
+                    self.done += len(data)
+                    metrics().count("bytes.downloaded", len(data))
+        if offset != end:
+            raise DownloadError("The server sent less than was asked for")
+        self._complete.add(chunk)
+        self._save_state()
+        self._hash_written(file)
+
+    async def _fetch_whole(self, file: FileIO) -> None:
+        """Download the whole of the file in one go, writing it as it arrives.
+
+        Args:
+            file: The file being written.
+        """
+        self._complete.clear()
+        self.done = self.resumed = self._hashed = 0
+        for digest, make in _HASHES.items():
+            if digest in self._hashes:
+                self._hashes[digest] = make()
+        file.truncate(0)
+        with tracer().span("download.whole", "http", url=self.package_url.url):
+            async with client().stream("GET", self.package_url.url) as response:
+                response.raise_for_status()
+                async for data in response.aiter_bytes():
+                    _write(file, data, self.done)
+                    for hashing in self._hashes.values():
+                        hashing.update(data)
+                    self.done += len(data)
+                    metrics().count("bytes.downloaded", len(data))
+        self.total = self._hashed = self.done
+
+    async def _probe(self) -> None:
+        """Find the size of the file, if the server will serve it in chunks.
+
+        Note:
+            Not every index says how big its files are; when the size isn't
+            known it is asked for, and it is only kept if the server says it
+            honours range requests.
+        """
+        with tracer().span("download.probe", "http", url=self.package_url.url):
+            response = await client().head(self.package_url.url)
+        if response.is_success and response.headers.get("accept-ranges") == "bytes":
+            self.total = int(response.headers.get("content-length", 0) or 0)
+
+    def _verify(self) -> None:
+        """Check the digests of the downloaded file.
+
+        Raises:
+            DownloadError: If a digest doesn't match.
+        """
+        expected = self.package_url.digests
+        for algorithm, digest in self._hashes.items():
+            if digest.hexdigest() != expected[algorithm]:
+                raise DownloadError(
+                    f"The {algorithm} digest of {self.target.name} doesn't match; "
+                    "the download has been discarded"
+                )
+
+    def _discard(self) -> None:
+        """Throw away what has been downloaded."""
+        self._partial.unlink(missing_ok=True)
+        self._state.unlink(missing_ok=True)
+
+    async def run(self) -> Path:
+        """Download the file.
+
+        Returns:
+            The path to the downloaded file.
+
+        Raises:
+            DownloadError: If the file couldn't be downloaded, or its digest
+                didn't match.
+            httpx.HTTPError: If there was a problem talking to the server.
+        """
+        self.target.parent.mkdir(parents=True, exist_ok=True)
+        if not self.total:
+            await self._probe()
+        self._load_state()
+        self.started = monotonic()
+        file = FileIO(self._partial, "r+" if self._partial.exists() else "w+")
+        try:
+            with tracer().span("download.file", "http", url=self.package_url.url):
+                if self.total:
+                    await self._fetch_chunks(file)
+                else:
+                    await self._fetch_whole(file)
+            self._verify()
+        except DownloadError:
+            file.close()
+            self._discard()
+            raise
+        finally:
+            file.close()
+        self.finished = monotonic()
+        self._partial.replace(self.target)
+        self._state.unlink(missing_ok=True)
+        return self.target
+
+    async def _fetch_chunks(self, file: FileIO) -> None:
+        """Download the chunks of the file that aren't yet downloaded.
+
+        Args:
+            file: The file being written.
+
+        Note:
+            If the server won't honour range requests, the whole file is
+            downloaded instead.
+        """
+        file.truncate(self.total)
+        self._hash_written(file)
+        pending: Queue[int] = Queue()
+        for chunk in range(self._chunks):
+            if chunk not in self._complete:
+                pending.put_nowait(chunk)
+
+        async def worker() -> None:
+            while not pending.empty():
+                await self._fetch_chunk(file, pending.get_nowait())
+
+        workers = [create_task(worker()) for _ in range(self.connections)]
+        try:
+            await gather(*workers)
+        except BaseException as error:
+            for running in workers:
+                running.cancel()
+            await gather(*workers, return_exceptions=True)
+            if not isinstance(error, _RangesUnsupported) or self._complete:
+                raise
+            await self._fetch_whole(file)
+
+
+##############################################################################
+def best_file(urls: tuple[PackageURL, ...], select: str = "") -> PackageURL | None:
+    """Pick the file of a package to download.
+
+    Args:
+        urls: The files of the package.
+        select: Text to select the file with; it's matched against the
+            type of each file, and searched for in its filename.
+
+    Returns:
+        The first matching file, preferring wheels that are compatible with
+        this Python and then source distributions; or `None` if no file
+        matches.
+    """
+    candidates = [
+        url
+        for url in urls
+        if not select or select == url.packagetype or select in url.filename
+    ]
+    for wanted in (
+        lambda url: url.is_wheel and url.compatible,
+        lambda url: url.packagetype == "sdist",
+        lambda _: True,
+    ):
+        for url in candidates:
+            if wanted(url):
+                return url
+    return None
+
+
+### download.py ends here
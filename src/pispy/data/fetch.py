@@ -0,0 +1,446 @@
+"""Provides cache-aware fetching of data from PyPI."""
+
+##############################################################################
+# Python imports.
+from asyncio import (
+    AbstractEventLoop,
+    CancelledError,
+    Future,
+    Semaphore,
+    get_running_loop,
+    shield,
+    sleep,
+    to_thread,
+)
+from email.utils import parsedate_to_datetime
+from random import uniform
+from time import monotonic, perf_counter, time
+from typing import Any, Awaitable, Callable
+
+##############################################################################
+# httpx imports.
+import httpx
+
+##############################################################################
+# Local imports.
+from .cache import CacheEntry, cache
+from .client import client, client_settings
+from .index import indexes
+from .instrumentation import metrics, tracer
+
+
+##############################################################################
+async def cached(url: str) -> CacheEntry | None:
+    """Get whatever is held in the cache for the given URL.
+
+    Args:
+        url: The URL to get the cached response for.
+
+    Returns:
+        The cached response, regardless of its age, or `None`.
+    """
+    with tracer().span("cache.read", "cache", url=url) as details:
+        entry = await to_thread(cache().get, url)
+        details["hit"] = entry is not None
+    if entry is None:
+        metrics().count("cache.misses")
+    else:
+        metrics().count("cache.hits")
+        metrics().count("bytes.from_cache", len(entry.body))
+    return entry
+
+
+##############################################################################
+def _http_trace(url: str) -> Callable[[str, dict[str, Any]], Awaitable[None]]:
+    """Make a tracer for the phases of an HTTP request.
+
+    Args:
+        url: The URL being requested.
+
+    Returns:
+        A callback for httpx's `trace` extension, which records a span for
+        each phase of the request (connecting, the TLS handshake, sending
+        the request, waiting for the response, and so on).
+    """
+    started: dict[str, float] = {}
+
+    async def trace(event: str, info: dict[str, Any]) -> None:
+        del info
+        phase, _, state = event.rpartition(".")
+        if state == "started":
+            started[phase] = perf_counter()
+        elif phase in started:
+            tracer().record(
+                phase, started.pop(phase), "http", url=url, failed=state == "failed"
+            )
+
+    return trace
+
+
+##############################################################################
+_RETRY_STATUSES = frozenset(
+    {
+        httpx.codes.TOO_MANY_REQUESTS,
+        httpx.codes.BAD_GATEWAY,
+        httpx.codes.SERVICE_UNAVAILABLE,
+        httpx.codes.GATEWAY_TIMEOUT,
+    }
+)
+"""The statuses of responses that say to try again later."""
+
+##############################################################################
+_RETRY_ERRORS = (
+    httpx.TimeoutException,
+    httpx.ConnectError,
+    httpx.ReadError,
+    httpx.WriteError,
+    httpx.RemoteProtocolError,
+)
+"""The transport errors that say a request may well work if it is made again.
+
+Any other transport error (an unsupported protocol, say, or a bad proxy)
+will fail the same way however often the request is made, and says nothing
+about the health of the index.
+"""
+
+
+##############################################################################
+class _RetryLater(Exception):
+    """Raised when a request failed in a way that may well pass."""
+
+    def __init__(self, after: float | None = None) -> None:
+        """Initialise the exception.
+
+        Args:
+            after: How long the index asked for us to wait, in seconds, if
+                it did.
+        """
+        super().__init__()
+        self.after = after
+        """How long the index asked for us to wait, in seconds, if it did."""
+
+
+##############################################################################
+def retry_after(value: str) -> float | None:
+    """Interpret the value of a `Retry-After` header.
+
+    Args:
+        value: The value of the header.
+
+    Returns:
+        The number of seconds to wait, or `None` if the value doesn't say.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+    except (TypeError, ValueError):
+        return None
+
+
+##############################################################################
+def backoff(attempt: int, after: float | None = None) -> float:
+    """Work out how long to wait before retrying a request.
+
+    Args:
+        attempt: The number of the retry, from zero.
+        after: How long the index asked for us to wait, if it did.
+
+    Returns:
+        The time to wait, in seconds.
+
+    Note:
+        Unless the index says how long to wait, the delay is picked at
+        random from up to an exponentially-growing limit ("full jitter"),
+        so that requests that failed together don't all come back
+        together. The delay is never longer than the configured maximum.
+    """
+    settings = client_settings()
+    if after is not None:
+        return min(after, settings.max_backoff)
+    return uniform(0, min(settings.max_backoff, settings.backoff * 2**attempt))
+
+
+##############################################################################
+_slots: tuple[AbstractEventLoop, Semaphore] | None = None
+"""The limit on the number of requests made at once, and the loop it's for."""
+
+
+##############################################################################
+def _request_slots() -> Semaphore:
+    """Get the limit on the number of requests made at once.
+
+    Returns:
+        A semaphore that a request must hold while it is being made.
+
+    Note:
+        Requests beyond the limit wait here, rather than in the client's
+        pool of connections, where they would count against its timeout.
+    """
+    global _slots
+    loop = get_running_loop()
+    if _slots is None or _slots[0] is not loop:
+        _slots = (loop, Semaphore(max(1, client_settings().max_connections)))
+    return _slots[1]
+
+
+##############################################################################
+_in_flight: dict[tuple[str, str], "Future[CacheEntry]"] = {}
+"""The requests being made, keyed by URL and accepted content types."""
+
+
+##############################################################################
+def _deliver(entry: CacheEntry, on_chunk: Callable[[bytes], None] | None) -> CacheEntry:
+    """Deliver the body of a successful response all at once.
+
+    Args:
+        entry: The response.
+        on_chunk: The callback to give the body to, if there is one.
+
+    Returns:
+        The response.
+    """
+    if on_chunk is not None and entry.status == httpx.codes.OK:
+        on_chunk(entry.body)
+    return entry
+
+
+##############################################################################
+async def fetch(
+    url: str, on_chunk: Callable[[bytes], None] | None = None, accept: str = ""
+) -> CacheEntry:
+    """Fetch the given URL, making use of the cache.
+
+    Args:
+        url: The URL to fetch.
+        on_chunk: Optional callback that is given the body of a successful
+            response; a chunk at a time as it is downloaded, or all at once
+            if it comes from the cache.
+        accept: The content types to accept, if the URL needs them to be
+            negotiated.
+
+    Returns:
+        The response for the URL.
+
+    Raises:
+        httpx.HTTPError: If the URL couldn't be fetched, even after
+            retrying.
+
+    Note:
+        If the cache holds a fresh response it is returned without any
+        network access. If it holds a stale response a conditional request
+        is made to revalidate it. When working offline the cached response
+        is always used; if there is none the returned response has a status
+        of `504 Gateway Timeout`, as per `Cache-Control: only-if-cached`.
+
+        Requests are routed to the best of the configured indexes; if an
+        index fails to answer, or has an error, the next best is tried.
+        Requests that time out, or that the indexes are too busy for, are
+        retried after a while. Only so many requests are made at once.
+
+        If the URL is already being fetched, the response to that request
+        is shared rather than another request being made.
+    """
+    key = (url, accept)
+    while (shared := _in_flight.get(key)) is not None:
+        metrics().count("requests.coalesced")
+        try:
+            return _deliver(await shield(shared), on_chunk)
+        except CancelledError:
+            # If whoever was making the request gave up on it, make it
+            # ourselves; otherwise it's us that's being cancelled.
+            if not shared.cancelled():
+                raise
+    _in_flight[key] = request = get_running_loop().create_future()
+    # Nobody might be waiting on the request, so make sure any error it
+    # ends with is seen as having been dealt with.
+    request.add_done_callback(lambda done: done.cancelled() or done.exception())
+    try:
+        with tracer().span("fetch", "http", url=url) as details:
+            response = await _fetch(url, on_chunk, accept)
+            details["status"] = response.status
+    except CancelledError:
+        request.cancel()
+        raise
+    except Exception as error:
+        request.set_exception(error)
+        raise
+    else:
+        request.set_result(response)
+        return response
+    finally:
+        if _in_flight.get(key) is request:
+            del _in_flight[key]
+
+
+##############################################################################
+async def _fetch(
+    url: str, on_chunk: Callable[[bytes], None] | None, accept: str
+) -> CacheEntry:
+    """Fetch the given URL, making use of the cache.
+
+    Args:
+        url: The URL to fetch.
+        on_chunk: Optional callback that is given the body of a successful
+            response.
+        accept: The content types to accept.
+
+    Returns:
+        The response for the URL.
+    """
+    settings = cache().settings
+    entry = await cached(url)
+
+    # Working offline, or the cache is fresh? We're done.
+    if settings.offline:
+        return _deliver(
+            entry or CacheEntry(url, httpx.codes.GATEWAY_TIMEOUT, b""), on_chunk
+        )
+    if entry is not None and entry.age < settings.ttl:
+        metrics().count("requests.cached")
+        return _deliver(entry, on_chunk)
+
+    # Build any headers needed to negotiate the content, and to make the
+    # request conditional.
+    headers: dict[str, str] = {"Accept": accept} if accept else {}
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+    # Make the request, trying again after a while if it fails in a way
+    # that might pass.
+    retries = max(0, client_settings().retries)
+    attempt = 0
+    while True:
+        try:
+            async with _request_slots():
+                return await _request(url, entry, headers, on_chunk, attempt == retries)
+        except _RetryLater as retry:
+            metrics().count("requests.retried")
+            with tracer().span("backoff", "http", url=url, attempt=attempt):
+                await sleep(backoff(attempt, retry.after))
+        attempt += 1
+
+
+##############################################################################
+async def _request(
+    url: str,
+    entry: CacheEntry | None,
+    headers: dict[str, str],
+    on_chunk: Callable[[bytes], None] | None,
+    last_attempt: bool,
+) -> CacheEntry:
+    """Request the given URL from the best of the indexes.
+
+    Args:
+        url: The URL to request.
+        entry: What the cache holds for the URL, if anything.
+        headers: The headers to send with the request.
+        on_chunk: Optional callback that is given the body of a successful
+            response.
+        last_attempt: Is this the last attempt at the request?
+
+    Returns:
+        The response for the URL.
+
+    Raises:
+        _RetryLater: If no index could answer, in a way that may well pass.
+        httpx.TransportError: If the request can't be made at all, or
+            failed on the last attempt.
+    """
+    # Try each index in turn, best first, until one of them answers.
+    routes = indexes().routes(url)
+    chunks: list[bytes] = []
+    for attempt, route in enumerate(routes, start=1):
+        final = attempt == len(routes)
+        started = monotonic()
+        streamed = False
+        metrics().count("requests.sent")
+        try:
+            async with client().stream(
+                "GET", route, headers=headers, extensions={"trace": _http_trace(route)}
+            ) as response:
+                if response.status_code in _RETRY_STATUSES or response.is_server_error:
+                    if response.status_code != httpx.codes.TOO_MANY_REQUESTS:
+                        indexes().failed(route)
+                    if not final:
+                        metrics().count("requests.failed_over")
+                        continue
+                    if not last_attempt and response.status_code in _RETRY_STATUSES:
+                        raise _RetryLater(
+                            retry_after(response.headers.get("Retry-After", ""))
+                        )
+                else:
+                    indexes().succeeded(route, monotonic() - started)
+
+                # Another index might have what this one doesn't.
+                if response.status_code == httpx.codes.NOT_FOUND and not final:
+                    continue
+
+                # If what we have is still good, note that and carry on
+                # using it.
+                if (
+                    entry is not None
+                    and response.status_code == httpx.codes.NOT_MODIFIED
+                ):
+                    metrics().count("requests.not_modified")
+                    return _deliver(
+                        await to_thread(cache().revalidated, entry), on_chunk
+                    )
+
+                # Pass the body on as it arrives, if anyone is interested.
+                with tracer().span("download", "http", url=route) as details:
+                    async for chunk in response.aiter_bytes():
+                        chunks.append(chunk)
+                        if (
+                            on_chunk is not None
+                            and response.status_code == httpx.codes.OK
+                        ):
+                            streamed = True
+                            on_chunk(chunk)
+                    details["bytes"] = size = sum(map(len, chunks))
+                metrics().count("bytes.downloaded", size)
+        except CancelledError:
+            # Leaving the stream closes the response, so the request really
+            # is abandoned rather than left to finish unwanted.
+            metrics().count("requests.cancelled")
+            raise
+        except _RETRY_ERRORS:
+            # Only move on to another index, or try again, if nothing has
+            # been passed on yet; otherwise whoever is being fed would get
+            # a mix of the two.
+            indexes().failed(route)
+            if streamed:
+                raise
+            chunks.clear()
+            if not final:
+                metrics().count("requests.failed_over")
+                continue
+            if last_attempt:
+                raise
+            raise _RetryLater() from None
+        break
+
+    fetched = CacheEntry(
+        url=url,
+        status=response.status_code,
+        body=b"".join(chunks),
+        etag=response.headers.get("ETag", ""),
+        last_modified=response.headers.get("Last-Modified", ""),
+        serial=response.headers.get("X-PyPI-Last-Serial", ""),
+        validated=time(),
+        content_type=response.headers.get("Content-Type", ""),
+    )
+    if fetched.status == httpx.codes.OK:
+        with tracer().span("cache.write", "cache", url=url):
+            await to_thread(cache().put, fetched)
+    return fetched
+
+
+### fetch.py ends here
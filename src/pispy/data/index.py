@@ -0,0 +1,206 @@
+"""Provides the application-wide package index settings, and index selection.
+
+Every index that has been configured is treated as a mirror of every
+other. URLs are always made against the main index (so that what is cached
+for a URL doesn't depend on which index it came from), and each request is
+then routed to whichever index is currently the best: indexes that have
+recently failed are avoided for a while, and of the rest, those that have
+been answering the quickest are preferred.
+"""
+
+##############################################################################
+# Python imports.
+from time import monotonic
+
+##############################################################################
+# Local imports.
+from .settings import IndexSettings, json_url_for
+
+
+##############################################################################
+class IndexHealth:
+    """The health of an index, as seen from the requests made of it."""
+
+    SMOOTHING = 0.3
+    """The weight given to each new observation."""
+
+    COOLDOWN = 30.0
+    """The time, in seconds, that an index is avoided for after it fails."""
+
+    MAX_COOLDOWN = 300.0
+    """The longest time, in seconds, that an index is avoided for."""
+
+    __slots__ = ("latency", "error_rate", "failures", "avoid_until", "requests")
+
+    def __init__(self) -> None:
+        """Initialise the health of the index."""
+        self.latency = 0.0
+        """The smoothed time, in seconds, the index takes to respond."""
+        self.error_rate = 0.0
+        """The smoothed proportion of requests of the index that fail."""
+        self.failures = 0
+        """The number of requests of the index that have failed in a row."""
+        self.avoid_until = 0.0
+        """The time until which the index should be avoided."""
+        self.requests = 0
+        """The number of requests made of the index."""
+
+    @property
+    def healthy(self) -> bool:
+        """Is the index currently considered healthy?"""
+        return monotonic() >= self.avoid_until
+
+    def succeeded(self, latency: float) -> None:
+        """Record a request of the index that succeeded.
+
+        Args:
+            latency: The time, in seconds, the index took to respond.
+        """
+        self.requests += 1
+        self.latency = (
+            latency
+            if self.requests == 1
+            else self.latency + self.SMOOTHING * (latency - self.latency)
+        )
+        self.error_rate -= self.SMOOTHING * self.error_rate
+        self.failures = 0
+        self.avoid_until = 0.0
+
+    def failed(self) -> None:
+        """Record a request of the index that failed."""
+        self.requests += 1
+        self.error_rate += self.SMOOTHING * (1 - self.error_rate)
+        self.failures += 1
+        self.avoid_until = monotonic() + min(
+            self.COOLDOWN * 2 ** (self.failures - 1), self.MAX_COOLDOWN
+        )
+
+
+##############################################################################
+class Indexes:
+    """The indexes in use, and their health."""
+
+    def __init__(self, settings: IndexSettings) -> None:
+        """Initialise the indexes.
+
+        Args:
+            settings: The settings for the indexes.
+        """
+        self.settings = settings
+        """The settings for the indexes."""
+        self._bases = [
+            (settings.simple_url.rstrip("/"), settings.json_url.rstrip("/")),
+            *((url, json_url_for(url)) for url in settings.extra_urls),
+        ]
+        self._health = {simple: IndexHealth() for simple, _ in self._bases}
+
+    @property
+    def health(self) -> dict[str, IndexHealth]:
+        """The health of each index, keyed by the base URL of its simple API."""
+        return self._health
+
+    def _ranked(self) -> list[tuple[str, str]]:
+        """Get the bases of the indexes, best first.
+
+        Returns:
+            The base URLs of the simple and JSON APIs of each index.
+        """
+        return sorted(
+            self._bases,
+            key=lambda base: (
+                not (health := self._health[base[0]]).healthy,
+                health.latency,
+            ),
+        )
+
+    def routes(self, url: str) -> list[str]:
+        """Get the URLs to try, best first, for a URL on the main index.
+
+        Args:
+            url: The URL, made against the main index.
+
+        Returns:
+            The equivalent URL on each index, best first; or just the URL
+            if it isn't one on the main index.
+        """
+        for kind, base in enumerate(self._bases[0]):
+            if url.startswith(f"{base}/"):
+                tail = url[len(base) :]
+                return [f"{bases[kind]}{tail}" for bases in self._ranked()]
+        return [url]
+
+    def _health_of(self, url: str) -> IndexHealth | None:
+        """Get the health of the index that a URL is on.
+
+        Args:
+            url: The URL.
+
+        Returns:
+            The health of the index, or `None` if the URL isn't on an index.
+        """
+        for simple, json in self._bases:
+            if url.startswith((f"{simple}/", f"{json}/")):
+                return self._health[simple]
+        return None
+
+    def succeeded(self, url: str, latency: float) -> None:
+        """Record a request that succeeded.
+
+        Args:
+            url: The URL that was requested.
+            latency: The time, in seconds, the index took to respond.
+        """
+        if (health := self._health_of(url)) is not None:
+            health.succeeded(latency)
+
+    def failed(self, url: str) -> None:
+        """Record a request that failed.
+
+        Args:
+            url: The URL that was requested.
+        """
+        if (health := self._health_of(url)) is not None:
+            health.failed()
+
+
+##############################################################################
+_indexes = Indexes(IndexSettings())
+"""The application-wide indexes."""
+
+
+##############################################################################
+def configure_index(settings: IndexSettings) -> IndexSettings:
+    """Configure the application-wide package index.
+
+    Args:
+        settings: The settings for the index.
+
+    Returns:
+        The application-wide index settings.
+    """
+    global _indexes
+    _indexes = Indexes(settings)
+    return _indexes.settings
+
+
+##############################################################################
+def index() -> IndexSettings:
+    """Get the application-wide package index settings.
+
+    Returns:
+        The application-wide index settings.
+    """
+    return _indexes.settings
+
+
+##############################################################################
+def indexes() -> Indexes:
+    """Get the application-wide indexes.
+
+    Returns:
+        The application-wide indexes, and their health.
+    """
+    return _indexes
+
+
+### index.py ends here
@@ -0,0 +1,260 @@
+"""Provides instrumentation of what the application has been doing.
+
+Counts are kept so that the effect of things like debouncing, cancellation
+and caching on the work done, and the requests made, can be seen. Timing
+spans are kept so that it can be seen where the time goes; the most recent
+are held in memory, and all of them can be written to a file in the Chrome
+trace event format (which can be loaded into `chrome://tracing` or
+Perfetto).
+"""
+
+##############################################################################
+# Python imports.
+from asyncio import current_task
+from collections import Counter, deque
+from contextlib import contextmanager
+from json import dumps
+from os import getpid
+from pathlib import Path
+from threading import Lock, current_thread
+from time import perf_counter
+from typing import Any, Iterator, NamedTuple, TextIO
+
+
+##############################################################################
+class Metrics:
+    """A collection of named counts."""
+
+    def __init__(self) -> None:
+        """Initialise the metrics."""
+        self._counts: Counter[str] = Counter()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Count something happening.
+
+        Args:
+            name: The name of the thing that happened.
+            amount: How many times it happened.
+        """
+        self._counts[name] += amount
+
+    def __getitem__(self, name: str) -> int:
+        return self._counts[name]
+
+    def snapshot(self) -> dict[str, int]:
+        """Get a snapshot of the counts.
+
+        Returns:
+            The counts, keyed by name, in name order.
+        """
+        return dict(sorted(self._counts.items()))
+
+    def reset(self) -> None:
+        """Reset all of the counts."""
+        self._counts.clear()
+
+
+##############################################################################
+def _lane() -> str:
+    """Get the name of the line of execution that is running.
+
+    Returns:
+        The name of the current asyncio task, if there is one, otherwise
+        the name of the current thread.
+    """
+    try:
+        task = current_task()
+    except RuntimeError:
+        task = None
+    return current_thread().name if task is None else task.get_name()
+
+
+##############################################################################
+class Span(NamedTuple):
+    """A timed span of work."""
+
+    name: str
+    """The name of the work."""
+
+    category: str
+    """The category of the work."""
+
+    start: float
+    """The time, in seconds since tracing began, that the work started."""
+
+    duration: float
+    """The time, in seconds, the work took."""
+
+    lane: str
+    """The name of the task or thread that did the work."""
+
+    args: dict[str, Any]
+    """Any details of the work."""
+
+
+##############################################################################
+class Tracer:
+    """Records timed spans of work."""
+
+    RECENT = 1000
+    """The number of recent spans that are kept in memory."""
+
+    def __init__(self) -> None:
+        """Initialise the tracer."""
+        self._origin = perf_counter()
+        self._lock = Lock()
+        self._trace: TextIO | None = None
+        self._events = 0
+        self._lanes: dict[str, int] = {}
+        self.recent: deque[Span] = deque(maxlen=self.RECENT)
+        """The most recent spans."""
+
+    def start_trace(self, path: Path) -> None:
+        """Start writing spans to a trace file.
+
+        Args:
+            path: The path of the file to write to.
+
+        Note:
+            The file is written as a JSON array of Chrome trace events. It
+            is only a complete JSON document once the trace is stopped, but
+            the trace viewers will load an unfinished one.
+        """
+        with self._lock:
+            self._trace = path.open("w", encoding="utf-8")
+            self._trace.write("[")
+            self._events = 0
+            self._lanes.clear()
+
+    def stop_trace(self) -> None:
+        """Stop writing spans to the trace file."""
+        with self._lock:
+            if self._trace is not None:
+                self._trace.write("\n]\n")
+                self._trace.close()
+                self._trace = None
+
+    def _write(self, event: dict[str, Any]) -> None:
+        """Write an event to the trace file.
+
+        Args:
+            event: The event to write.
+        """
+        assert self._trace is not None
+        self._trace.write(f"{',' if self._events else ''}\n{dumps(event, default=str)}")
+        self._events += 1
+
+    def _lane_id(self, lane: str) -> int:
+        """Get the ID of a lane in the trace file, naming it if it's new.
+
+        Args:
+            lane: The name of the lane.
+
+        Returns:
+            The ID of the lane.
+        """
+        if (lane_id := self._lanes.get(lane)) is None:
+            lane_id = self._lanes[lane] = len(self._lanes) + 1
+            self._write(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": getpid(),
+                    "tid": lane_id,
+                    "args": {"name": lane},
+                }
+            )
+        return lane_id
+
+    def record(
+        self, name: str, started: float, category: str = "pispy", **args: Any
+    ) -> Span:
+        """Record a span of work that has just finished.
+
+        Args:
+            name: The name of the work.
+            started: The `perf_counter` time the work started.
+            category: The category of the work.
+            args: Any details of the work.
+
+        Returns:
+            The span.
+        """
+        span = Span(
+            name,
+            category,
+            started - self._origin,
+            perf_counter() - started,
+            _lane(),
+            args,
+        )
+        with self._lock:
+            self.recent.append(span)
+            if self._trace is not None:
+                self._write(
+                    {
+                        "name": span.name,
+                        "cat": span.category,
+                        "ph": "X",
+                        "ts": round(span.start * 1_000_000),
+                        "dur": round(span.duration * 1_000_000),
+                        "pid": getpid(),
+                        "tid": self._lane_id(span.lane),
+                        "args": span.args,
+                    }
+                )
+        return span
+
+    @contextmanager
+    def span(
+        self, name: str, category: str = "pispy", **args: Any
+    ) -> Iterator[dict[str, Any]]:
+        """Time a span of work.
+
+        Args:
+            name: The name of the work.
+            category: The category of the work.
+            args: Any details of the work.
+
+        Yields:
+            The details of the work, which can be added to as the work
+            is done.
+        """
+        started = perf_counter()
+        try:
+            yield args
+        finally:
+            self.record(name, started, category, **args)
+
+
+##############################################################################
+_metrics = Metrics()
+"""The application-wide metrics."""
+
+
+##############################################################################
+def metrics() -> Metrics:
+    """Get the application-wide metrics.
+
+    Returns:
+        The application-wide metrics.
+    """
+    return _metrics
+
+
+##############################################################################
+_tracer = Tracer()
+"""The application-wide tracer."""
+
+
+##############################################################################
+def tracer() -> Tracer:
+    """Get the application-wide tracer.
+
+    Returns:
+        The application-wide tracer.
+    """
+    return _tracer
+
+
+### instrumentation.py ends here
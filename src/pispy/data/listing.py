@@ -0,0 +1,193 @@
+"""Provides the listing of the files of a release of a package.
+
+The lookup of a package normally brings its files along with it, from the
+JSON API; when they're all there, with all their details, they're only
+added to from the simple API, which alone says if the core metadata of a
+file can be had on its own. Otherwise files can be listed from more than
+one source; which are used, and in what order, is set by the index
+settings. Some indexes leave out details of the files (such as their
+sizes) that the JSON API provides; where they are missing, they are filled
+in from the JSON API.
+"""
+
+##############################################################################
+# Python imports.
+from asyncio import to_thread
+from typing import Any, Awaitable, Callable, Iterable
+
+##############################################################################
+# httpx imports.
+import httpx
+
+##############################################################################
+# Packaging imports.
+from packaging.version import InvalidVersion, Version
+
+##############################################################################
+# Local imports.
+from .decoding import decode
+from .fetch import fetch
+from .index import index
+from .package import Package, PackageURL
+from .simple import simple_files, version_of
+
+##############################################################################
+FileSource = Callable[[str, str], Awaitable[list[dict[str, Any]] | None]]
+"""The type of a source of file listings.
+
+A source is called with the name and version of a package, and returns the
+files of that release described with the keys used by the JSON API, or
+`None` if the source has nothing for the release.
+"""
+
+_BACKFILL = ("size", "upload_time_iso_8601")
+"""The details of a file that, if missing, are filled in from the JSON API."""
+
+
+##############################################################################
+async def from_simple(package: str, version: str) -> list[dict[str, Any]] | None:
+    """List the files of a release using the simple API.
+
+    Args:
+        package: The name of the package.
+        version: The version of the package.
+
+    Returns:
+        The files of the release, or `None` if none could be found.
+    """
+    try:
+        wanted = Version(version)
+    except InvalidVersion:
+        return None
+    files = [
+        file
+        for file in await simple_files(package) or ()
+        if version_of(file["filename"]) == wanted
+    ]
+    return files or None
+
+
+##############################################################################
+async def from_json(package: str, version: str) -> list[dict[str, Any]] | None:
+    """List the files of a release using the JSON API.
+
+    Args:
+        package: The name of the package.
+        version: The version of the package.
+
+    Returns:
+        The files of the release, or `None` if none could be found.
+    """
+    response = await fetch(Package.api_url(package, version))
+    if response.status == httpx.codes.OK:
+        data = await to_thread(decode, response.body, ("urls",))
+        return data.get("urls") or None
+    # Not every index can look up a single release; in that case fall back
+    # to the release's entry in the data for the package as a whole.
+    response = await fetch(Package.api_url(package))
+    if response.status != httpx.codes.OK:
+        return None
+    data = await to_thread(decode, response.body, ("releases",))
+    return (data.get("releases") or {}).get(version) or None
+
+
+##############################################################################
+SOURCES: dict[str, FileSource] = {"simple": from_simple, "json": from_json}
+"""The sources of file listings, keyed by the name used in the index settings."""
+
+
+##############################################################################
+def _backfilled(file: dict[str, Any], fallback: dict[str, Any]) -> dict[str, Any]:
+    """Fill in the missing details of a file.
+
+    Args:
+        file: The details of the file.
+        fallback: Other details of the same file.
+
+    Returns:
+        The details of the file, with anything missing taken from the
+        fallback details.
+    """
+    return {
+        **fallback,
+        **{key: value for key, value in file.items() if value},
+        "digests": {**(fallback.get("digests") or {}), **file["digests"]},
+    }
+
+
+##############################################################################
+def _complete(files: tuple[PackageURL, ...]) -> bool:
+    """Are the files of a release all there, with all their details?
+
+    Args:
+        files: The files of the release.
+
+    Returns:
+        `True` if there are files, and every one of them has its size,
+        upload time and SHA256 digest; `False` if not.
+
+    Note:
+        Only the details that the JSON API provides are looked at; it never
+        says if the core metadata of a file is available.
+    """
+    return bool(files) and all(
+        file.size and file.upload_time_iso_8601 and "sha256" in file.digests
+        for file in files
+    )
+
+
+##############################################################################
+async def list_files(
+    package: str, version: str, known: Iterable[PackageURL] = ()
+) -> tuple[PackageURL, ...]:
+    """List the files of a release of a package.
+
+    Args:
+        package: The name of the package.
+        version: The version of the package.
+        known: Files of the release that are already known, from the JSON
+            API, which are used to fill in any missing details.
+
+    Returns:
+        The files of the release.
+
+    Note:
+        If the known files are complete they are kept, and the simple API
+        (if it is one of the sources) is only used to add what the JSON API
+        doesn't say: if the core metadata of each file is available on its
+        own, and any other digests. If no source has any files for the
+        release, the known files are returned.
+    """
+    if _complete(known := tuple(known)):
+        if "simple" not in index().files_from:
+            return known
+        simple = {
+            file["filename"]: file for file in await from_simple(package, version) or ()
+        }
+        return tuple(
+            PackageURL(_backfilled(simple[url.filename], url.as_dict()))
+            if url.filename in simple
+            else url
+            for url in known
+        )
+    for source in index().files_from:
+        if (files := await SOURCES[source](package, version)) is not None:
+            break
+    else:
+        return known
+    if source != "json" and any(
+        not file.get(detail) for file in files for detail in _BACKFILL
+    ):
+        fallback = {url.filename: url.as_dict() for url in known} or {
+            file["filename"]: file for file in await from_json(package, version) or ()
+        }
+        files = [
+            _backfilled(file, fallback[file["filename"]])
+            if file["filename"] in fallback
+            else file
+            for file in files
+        ]
+    return tuple(map(PackageURL, files))
+
+
+### listing.py ends here
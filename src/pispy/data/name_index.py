@@ -0,0 +1,477 @@
+"""Provides a compact, local, index of the names of every project on the index.
+
+The index is held in a single file, which is memory-mapped rather than
+read, so that loading it costs next to nothing and the names it holds never
+become Python objects until they're asked for. The file holds:
+
+- A header: a magic value, the number of names, and the length of the
+  `ETag` of the listing the names came from, followed by that `ETag`.
+- The offset of the start of each name, and of the end of the last name,
+  as native unsigned integers.
+- The PEP 503 normalised names, sorted and packed together.
+
+As the names are sorted, looking for those with a given prefix is a binary
+search; looking for those that are a typo away from what was typed walks
+the names as if they were a trie, as each run of names with a common prefix
+is contiguous.
+
+The index is refreshed as a whole, rather than by applying the changes
+since it was built: the simple API has no way of asking for only what has
+changed, and the changelog that PyPI's mirrors follow is only available
+through its deprecated XML-RPC API, which no other index provides. Instead
+the listing is only fetched when the index is a day old, and then only if
+it has changed since it was last fetched.
+"""
+
+##############################################################################
+# Python imports.
+from array import array
+from asyncio import to_thread
+from mmap import ACCESS_READ, mmap
+from os import replace
+from pathlib import Path
+from re import compile as compile_re
+from struct import Struct
+from tempfile import NamedTemporaryFile
+from time import monotonic, time
+from typing import Iterable, Iterator
+
+##############################################################################
+# httpx imports.
+import httpx
+
+##############################################################################
+# Local imports.
+from .cache import cache
+from .client import client
+from .index import index, indexes
+from .simple import ACCEPT
+
+##############################################################################
+_SEPARATORS = compile_re(r"[-_.]+")
+"""Runs of characters that PEP 503 normalises to a single hyphen."""
+
+_HREF = compile_re(rb'href="([^"]+)"')
+"""Finds the links to projects in the HTML form of the index."""
+
+_NAME = compile_re(rb'"name"\s*:\s*"([^"]+)"')
+"""Finds the names of projects in the JSON form of the index."""
+
+_VALID = compile_re(r"[a-z0-9]([a-z0-9-]*[a-z0-9])?")
+"""Matches a valid normalised project name."""
+
+
+##############################################################################
+def normalise(name: str) -> str:
+    """Normalise a project name, or part of one, as PEP 503 describes.
+
+    Args:
+        name: The name to normalise.
+
+    Returns:
+        The normalised name.
+    """
+    return _SEPARATORS.sub("-", name).lower()
+
+
+##############################################################################
+class NameIndex:
+    """A sorted index of normalised project names, held in a buffer."""
+
+    MAGIC = b"PISPYNX1"
+    """The magic value at the start of an index file."""
+
+    HEADER = Struct("=8sII")
+    """The layout of the header of an index file."""
+
+    FILENAME = "names.index"
+    """The name of the index file, within the cache directory."""
+
+    TTL = 24 * 60 * 60
+    """The time, in seconds, before the index is checked for changes."""
+
+    FUZZY_MINIMUM = 3
+    """The shortest text that fuzzy suggestions are looked for with."""
+
+    __slots__ = ("_buffer", "_offsets", "_count", "etag")
+
+    def __init__(self, buffer: bytes | mmap = b"") -> None:
+        """Initialise the index.
+
+        Args:
+            buffer: The content of an index file; an empty buffer makes an
+                empty index.
+
+        Raises:
+            ValueError: If the buffer doesn't hold an index.
+        """
+        self._buffer = buffer
+        self._count = 0
+        self._offsets = memoryview(b"").cast("I")
+        self.etag = ""
+        """The `ETag` of the project listing the index was built from."""
+        if not buffer:
+            return
+        magic, self._count, etag_length = self.HEADER.unpack_from(buffer)
+        if magic != self.MAGIC:
+            raise ValueError("Not a project name index")
+        start = self.HEADER.size + etag_length
+        self.etag = bytes(buffer[self.HEADER.size : start]).decode()
+        start += -start % self._offsets.itemsize
+        self._offsets = memoryview(buffer)[
+            start : start + (self._count + 1) * self._offsets.itemsize
+        ].cast("I")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        target = normalise(name).encode()
+        found = self._lower(target)
+        return found < self._count and self._name(found) == target
+
+    @classmethod
+    def build(cls, names: Iterable[str], etag: str = "") -> bytes:
+        """Build the content of an index file.
+
+        Args:
+            names: The names of the projects; they are normalised, and any
+                that aren't valid names are dropped.
+            etag: The `ETag` of the project listing the names came from.
+
+        Returns:
+            The content of the index file.
+        """
+        packed = sorted(
+            {
+                normalised.encode()
+                for name in names
+                if _VALID.fullmatch(normalised := normalise(name))
+            }
+        )
+        offsets = array("I", [0])
+        for name in packed:
+            offsets.append(offsets[-1] + len(name))
+        header = cls.HEADER.pack(
+            cls.MAGIC, len(packed), len(etag_bytes := etag.encode())
+        )
+        header += etag_bytes
+        header += bytes(-len(header) % offsets.itemsize)
+        # The offsets are relative to the start of the names, so add the
+        # size of everything that comes before them.
+        start = len(header) + len(offsets) * offsets.itemsize
+        return (
+            header
+            + array("I", (offset + start for offset in offsets)).tobytes()
+            + b"".join(packed)
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "NameIndex":
+        """Load an index from a file.
+
+        Args:
+            path: The path to the index file.
+
+        Returns:
+            The index, or an empty index if the file couldn't be loaded.
+        """
+        try:
+            with path.open("rb") as index_file:
+                return cls(mmap(index_file.fileno(), 0, access=ACCESS_READ))
+        except (OSError, ValueError):
+            return cls()
+
+    def _name(self, position: int) -> bytes:
+        """Get the name at a position in the index.
+
+        Args:
+            position: The position of the name.
+
+        Returns:
+            The name, as bytes.
+        """
+        return self._buffer[self._offsets[position] : self._offsets[position + 1]]
+
+    def _lower(self, target: bytes, low: int = 0, high: int | None = None) -> int:
+        """Find the first position whose name isn't before the target.
+
+        Args:
+            target: The name, or prefix, to look for.
+            low: The lowest position to look at.
+            high: The position after the highest to look at.
+
+        Returns:
+            The position.
+        """
+        high = self._count if high is None else high
+        buffer, offsets = self._buffer, self._offsets
+        while low < high:
+            middle = (low + high) // 2
+            if buffer[offsets[middle] : offsets[middle + 1]] < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _range(
+        self, prefix: bytes, low: int = 0, high: int | None = None
+    ) -> tuple[int, int]:
+        """Find the positions of the names that start with a prefix.
+
+        Args:
+            prefix: The prefix to look for.
+            low: The lowest position to look at.
+            high: The position after the highest to look at.
+
+        Returns:
+            The first position, and the position after the last, of the names
+            that start with the prefix.
+        """
+        high = self._count if high is None else high
+        low = self._lower(prefix, low, high)
+        if low == high or not self._name(low).startswith(prefix):
+            return low, low
+        return low, self._lower(prefix + b"\xff", low, high)
+
+    def _branches(
+        self, depth: int, low: int, high: int
+    ) -> Iterator[tuple[int, int, int]]:
+        """Find the branches that follow a common prefix.
+
+        Args:
+            depth: The length of the common prefix.
+            low: The first position of the names with the prefix.
+            high: The position after the last name with the prefix.
+
+        Yields:
+            Each distinct character that follows the prefix, along with the
+            first position, and the position after the last, of the names
+            that continue with it.
+        """
+        while low < high:
+            if len(name := self._name(low)) == depth:
+                low += 1
+                continue
+            end = self._lower(name[: depth + 1] + b"\xff", low, high)
+            yield name[depth], low, end
+            low = end
+
+    def _names(self, low: int, high: int, limit: int) -> list[str]:
+        """Get the names within a range of positions.
+
+        Args:
+            low: The first position.
+            high: The position after the last.
+            limit: The most names to get.
+
+        Returns:
+            The names.
+        """
+        return [
+            self._name(position).decode()
+            for position in range(low, min(high, low + limit))
+        ]
+
+    def _one_edit_away(self, text: bytes) -> Iterator[tuple[int, int]]:
+        """Find the names that start with something one edit away from the text.
+
+        Args:
+            text: The text to look for.
+
+        Yields:
+            The ranges of positions of names that start with a deletion,
+            transposition, substitution or insertion of the text.
+        """
+        # An edit can only be made where the text, so far, is the start of
+        # at least one name; so walk the names with each prefix of the text,
+        # as if they were a trie, only looking within the names that share
+        # the prefix.
+        low, high = 0, self._count
+        for position in range(len(text) + 1):
+            head, rest = text[:position], text[position:]
+            if rest:
+                yield self._range(head + rest[1:], low, high)
+                if len(rest) > 1:
+                    yield self._range(head + rest[1:2] + rest[:1] + rest[2:], low, high)
+            for character, branch_low, branch_high in self._branches(
+                position, low, high
+            ):
+                branch = head + bytes((character,))
+                yield self._range(branch + rest, branch_low, branch_high)
+                if rest and character != rest[0]:
+                    yield self._range(branch + rest[1:], branch_low, branch_high)
+            if rest:
+                low, high = self._range(head + rest[:1], low, high)
+                if low == high:
+                    break
+
+    def complete(self, text: str) -> str | None:
+        """Complete the name of a project.
+
+        Args:
+            text: The start of the name.
+
+        Returns:
+            The first name, in order, that starts with the text, or `None`.
+        """
+        if text and (found := self._names(*self._range(normalise(text).encode()), 1)):
+            return found[0]
+        return None
+
+    def suggest(self, text: str, limit: int = 8) -> list[str]:
+        """Suggest the names of projects for some text.
+
+        Args:
+            text: The text to suggest names for.
+            limit: The most names to suggest.
+
+        Returns:
+            The names that start with the text, followed by (if the text is
+            long enough) those that start with a typo of the text, shortest
+            first.
+        """
+        if not (target := normalise(text.strip()).encode()):
+            return []
+        suggestions = self._names(*self._range(target), limit)
+        if len(suggestions) < limit and len(target) >= self.FUZZY_MINIMUM:
+            suggestions.extend(
+                sorted(
+                    {
+                        name
+                        for low, high in self._one_edit_away(target)
+                        for name in self._names(low, high, limit)
+                    }.difference(suggestions),
+                    key=lambda name: (len(name), name),
+                )[: limit - len(suggestions)]
+            )
+        return suggestions
+
+
+##############################################################################
+def _parse(body: bytes, content_type: str) -> list[str]:
+    """Get the names of the projects from the root of the simple API.
+
+    Args:
+        body: The body of the page.
+        content_type: The content type of the page.
+
+    Returns:
+        The names of the projects.
+    """
+    if content_type.split(";")[0].strip().endswith("json"):
+        return [name.decode() for name in _NAME.findall(body)]
+    return [
+        href.decode().rstrip("/").rsplit("/", 1)[-1] for href in _HREF.findall(body)
+    ]
+
+
+##############################################################################
+def _save(path: Path, content: bytes) -> None:
+    """Save the content of an index file.
+
+    Args:
+        path: The path to save the index to.
+        content: The content of the index.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with NamedTemporaryFile("wb", dir=path.parent, delete=False) as index_file:
+        index_file.write(content)
+    replace(index_file.name, path)
+
+
+##############################################################################
+_names = NameIndex()
+"""The application-wide index of project names."""
+
+
+##############################################################################
+def names() -> NameIndex:
+    """Get the application-wide index of project names.
+
+    Returns:
+        The application-wide index of project names, which is empty until
+        it has been loaded.
+    """
+    return _names
+
+
+##############################################################################
+def _location() -> Path:
+    """Get the location of the index file.
+
+    Returns:
+        The path to the index file.
+    """
+    return cache().location / NameIndex.FILENAME
+
+
+##############################################################################
+def load_names() -> NameIndex:
+    """Load the application-wide index of project names from disk.
+
+    Returns:
+        The application-wide index of project names.
+    """
+    global _names
+    _names = NameIndex.load(_location())
+    return _names
+
+
+##############################################################################
+async def refresh_names() -> NameIndex:
+    """Refresh the application-wide index of project names, if it's stale.
+
+    Returns:
+        The application-wide index of project names.
+
+    Note:
+        The project listing is fetched with a conditional request, so when
+        nothing has changed it isn't downloaded again; when it has, the
+        whole listing is downloaded and the index rebuilt from it, as there
+        is no portable way of asking an index for only the changes. Nothing
+        is fetched at all when working offline.
+    """
+    global _names
+    path = _location()
+    try:
+        age = time() - path.stat().st_mtime
+    except OSError:
+        age = float("inf")
+    if cache().settings.offline or age < NameIndex.TTL:
+        return _names
+    headers = {"Accept": ACCEPT}
+    if _names.etag:
+        headers["If-None-Match"] = _names.etag
+    for route in indexes().routes(f"{index().simple_url.rstrip('/')}/"):
+        started = monotonic()
+        try:
+            response = await client().get(route, headers=headers)
+        except httpx.TransportError:
+            indexes().failed(route)
+            continue
+        indexes().succeeded(route, monotonic() - started)
+        break
+    else:
+        return _names
+    if response.status_code == httpx.codes.NOT_MODIFIED:
+        path.touch()
+    elif response.status_code == httpx.codes.OK:
+        content = await to_thread(
+            lambda: NameIndex.build(
+                _parse(response.content, response.headers.get("Content-Type", "")),
+                response.headers.get("ETag", ""),
+            )
+        )
+        try:
+            await to_thread(_save, path, content)
+        except OSError:
+            _names = NameIndex(content)
+        else:
+            _names = NameIndex.load(path)
+    return _names
+
+
+### name_index.py ends here
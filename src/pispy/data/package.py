@@ -2,78 +2,302 @@
 
 ##############################################################################
 # Python imports.
-from functools import partial
+from asyncio import to_thread
+from functools import lru_cache
 from re import split
-from typing import Any, NamedTuple
+from sys import intern
+from typing import Any, Iterable
 
 ##############################################################################
 # httpx imports.
 import httpx
 
+##############################################################################
+# Packaging imports.
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.tags import Tag, sys_tags
+from packaging.utils import (
+    InvalidWheelFilename,
+    canonicalize_name,
+    parse_wheel_filename,
+)
+from packaging.version import InvalidVersion, Version
+
+##############################################################################
+# Local imports.
+from .cache import CacheEntry, cache
+from .decoding import LazyJSON, SelectiveDecoder
+from .fetch import cached, fetch
+from .index import index
+from .instrumentation import metrics, tracer
+from .package_cache import packages
+from .simple import simple_files, version_of
+from .store import package_store
+
+
+##############################################################################
+@lru_cache(maxsize=None)
+def supported_tags() -> frozenset[Tag]:
+    """Get the wheel tags supported by the running interpreter.
+
+    Returns:
+        The set of supported tags.
+    """
+    return frozenset(sys_tags())
+
 
 ##############################################################################
-def _get(
-    payload: dict[str, dict[str, Any]], via: str, value: str, default: Any = ""
-) -> Any:
-    """Get some data, default if it isn't there or is `None`.
+def _text(value: str | None) -> str:
+    """Intern a string that is likely to be repeated between packages.
 
     Args:
-        payload: The payload from the API.
-        via: The child collection to get the value via.
-        value: The value to get.
-        default: The default to use.
+        value: The string to intern.
 
     Returns:
-        The value found, or the default.
+        The interned string, or an empty string if there was no value.
+    """
+    return intern(value) if value else ""
+
 
-    Note:
-        The default is used if `value` can't be found, or if it is `None`.
+##############################################################################
+def _vocabulary(values: Iterable[str] | None) -> tuple[str, ...]:
+    """Intern a collection of strings that are drawn from a vocabulary.
+
+    Args:
+        values: The strings to intern.
+
+    Returns:
+        The interned strings.
     """
-    return default if (result := payload.get(via, {}).get(value)) is None else result
+    return tuple(map(intern, values or ()))
 
 
 ##############################################################################
-class PackageURL(NamedTuple):
-    """A package's release URL data."""
+DigestLayout = tuple[tuple[str, ...], tuple[int, ...]]
+"""The algorithms of a collection of digests, and the length of each."""
 
-    comment_text: str
-    """The comment text for the URL."""
+_layouts: dict[tuple[str | int, ...], DigestLayout] = {}
+"""The digest layouts that have been seen, so that they can be shared."""
 
-    digests: dict[str, str]
-    """The digests for the URL."""
 
-    downloads: int
-    """The number of downloads for the URL."""
+##############################################################################
+def _compact_digests(digests: dict[str, str]) -> tuple[DigestLayout, bytes | str]:
+    """Compact a collection of hexadecimal digests.
 
-    filename: str
-    """The filename for the URL."""
+    Args:
+        digests: The digests to compact.
 
-    has_sig: bool
-    """Does the URL have a signature?"""
+    Returns:
+        The layout of the digests, and the digests themselves joined
+        together; as bytes if that can be done without loss.
+    """
+    key: tuple[str | int, ...] = (*digests, *map(len, digests.values()))
+    if (layout := _layouts.get(key)) is None:
+        layout = _layouts[key] = (tuple(digests), tuple(map(len, digests.values())))
+    joined = "".join(digests.values())
+    try:
+        if (data := bytes.fromhex(joined)).hex() == joined:
+            return layout, data
+    except ValueError:
+        pass
+    return layout, joined
 
-    md5_digest: str
-    """The MD5 digest for the URL."""
 
-    packagetype: str
-    """The type of package."""
+##############################################################################
+def _expand_digests(layout: DigestLayout, data: bytes | str) -> dict[str, str]:
+    """Expand a compacted collection of hexadecimal digests.
 
-    python_version: str
-    """The version of package for this URL."""
+    Args:
+        layout: The layout of the digests.
+        data: The digests, joined together.
 
-    size: int
-    """The size of the download at this URL."""
+    Returns:
+        The digests, keyed by algorithm.
+    """
+    joined = data.hex() if isinstance(data, bytes) else data
+    digests: dict[str, str] = {}
+    offset = 0
+    for algorithm, length in zip(*layout):
+        digests[algorithm] = joined[offset : offset + length]
+        offset += length
+    return digests
+
+
+##############################################################################
+class PackageURL:
+    """A package's release URL data.
+
+    Many of these are held for each package, so they're kept compact:
+    repeated strings are interned, digests are held as bytes, and the URL
+    is held as the prefix to the path that can be worked out from the
+    file's name and digest.
+    """
 
-    upload_time_iso_8601: str
-    """The upload time of the URL in ISo 8601 format."""
+    __slots__ = (
+        "comment_text",
+        "_core_metadata",
+        "_digest_layout",
+        "_digest_data",
+        "downloads",
+        "filename",
+        "has_sig",
+        "packagetype",
+        "python_version",
+        "size",
+        "upload_time_iso_8601",
+        "_url",
+        "_url_is_prefix",
+        "yanked",
+        "yanked_reason",
+    )
+
+    _FIELDS = (
+        "comment_text",
+        "core_metadata",
+        "digests",
+        "downloads",
+        "filename",
+        "has_sig",
+        "md5_digest",
+        "packagetype",
+        "python_version",
+        "size",
+        "upload_time_iso_8601",
+        "url",
+        "yanked",
+        "yanked_reason",
+    )
+    """The names of the fields of the URL data."""
+
+    def __init__(self, data: dict[str, Any] | None = None) -> None:
+        """Initialise the URL data.
 
-    url: str
-    """The URL itself."""
+        Args:
+            data: The URL data from the JSON API.
+        """
+        get = (data or {}).get
+        digests: dict[str, str] = get("digests") or {}
+        if (md5_digest := get("md5_digest")) and "md5" not in digests:
+            digests = {**digests, "md5": md5_digest}
+        self.comment_text = _text(get("comment_text"))
+        """The comment text for the URL."""
+        metadata = get("core-metadata", get("data-dist-info-metadata")) or False
+        self._core_metadata: tuple[DigestLayout, bytes | str] | bool = (
+            _compact_digests(metadata) if isinstance(metadata, dict) else bool(metadata)
+        )
+        self._digest_layout, self._digest_data = _compact_digests(digests)
+        self.downloads: int = get("downloads") or 0
+        """The number of downloads for the URL."""
+        self.filename: str = get("filename") or ""
+        """The filename for the URL."""
+        self.has_sig: bool = get("has_sig") or False
+        """Does the URL have a signature?"""
+        self.packagetype = _text(get("packagetype"))
+        """The type of package."""
+        self.python_version = _text(get("python_version"))
+        """The version of package for this URL."""
+        self.size: int = get("size") or 0
+        """The size of the download at this URL."""
+        self.upload_time_iso_8601: str = get("upload_time_iso_8601") or ""
+        """The upload time of the URL in ISO 8601 format."""
+        self._url: str = get("url") or ""
+        self._url_is_prefix = False
+        path = self._path(digests.get("blake2b_256"))
+        if path and self._url.endswith(path):
+            self._url = intern(self._url[: -len(path)])
+            self._url_is_prefix = True
+        self.yanked: bool = get("yanked") or False
+        """Has this URL been yanked?"""
+        self.yanked_reason = _text(get("yanked_reason"))
+        """The reason for the yank, if the URL has been yanked."""
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PackageURL):
+            return NotImplemented
+        return all(
+            getattr(self, field) == getattr(other, field) for field in self._FIELDS
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(filename={self.filename!r})"
 
-    yanked: bool
-    """Has this URL been yanked?"""
+    def _path(self, digest: str | None) -> str:
+        """Get the path at which the index keeps the file.
 
-    yanked_reason: str
-    """The reason for the yank, if the URL has been yanked."""
+        Args:
+            digest: The BLAKE2b-256 digest of the file.
+
+        Returns:
+            The path, or an empty string if it can't be worked out.
+        """
+        if not digest:
+            return ""
+        return f"{digest[:2]}/{digest[2:4]}/{digest[4:]}/{self.filename}"
+
+    @property
+    def digests(self) -> dict[str, str]:
+        """The digests for the URL."""
+        return _expand_digests(self._digest_layout, self._digest_data)
+
+    @property
+    def core_metadata(self) -> bool:
+        """Is the core metadata of the file available on its own? (PEP 658)"""
+        return self._core_metadata is not False
+
+    @property
+    def core_metadata_digests(self) -> dict[str, str]:
+        """The digests of the core metadata of the file, if they are known."""
+        if isinstance(self._core_metadata, bool):
+            return {}
+        return _expand_digests(*self._core_metadata)
+
+    @property
+    def md5_digest(self) -> str:
+        """The MD5 digest for the URL."""
+        return self.digests.get("md5", "")
+
+    @property
+    def url(self) -> str:
+        """The URL itself."""
+        if self._url_is_prefix:
+            return self._url + self._path(self.digests.get("blake2b_256"))
+        return self._url
+
+    @property
+    def is_wheel(self) -> bool:
+        """Is this URL for a wheel?"""
+        return self.filename.endswith(".whl")
+
+    @property
+    def tags(self) -> frozenset[Tag]:
+        """The wheel tags for the URL, if it is for a wheel."""
+        if self.is_wheel:
+            try:
+                return parse_wheel_filename(self.filename)[3]
+            except InvalidWheelFilename:
+                pass
+        return frozenset()
+
+    @property
+    def tag(self) -> str:
+        """The compressed wheel tag for the URL, if it is for a wheel."""
+        return "-".join(self.filename[:-4].split("-")[-3:]) if self.is_wheel else ""
+
+    @property
+    def compatible(self) -> bool:
+        """Can the file at this URL be installed by the running interpreter?
+
+        Source distributions are always considered to be compatible.
+        """
+        return not self.is_wheel or bool(self.tags & supported_tags())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the URL data as a dictionary of plain values.
+
+        Returns:
+            The URL data, suitable for serialising as JSON.
+        """
+        return {field: getattr(self, field) for field in self._FIELDS}
 
     @classmethod
     def from_json(cls, data: dict[str, Any]) -> "PackageURL":
@@ -85,158 +309,342 @@ class PackageURL(NamedTuple):
         Returns:
             An instance of a `PackageURL` class.
         """
-        url = partial(_get, {"url": data}, "url")
-        return cls(
-            comment_text=url("comment_text"),
-            digests=url("digests", {}),
-            downloads=url("downloads", 0),
-            filename=url("filename"),
-            has_sig=url("has_sig", False),
-            md5_digest=url("md5_digest"),
-            packagetype=url("packagetype"),
-            python_version=url("python_version"),
-            size=url("size", 0),
-            upload_time_iso_8601=url("upload_time_iso_8601"),
-            url=url("url"),
-            yanked=url("yanked", False),
-            yanked_reason=url("yanked_reason"),
-        )
+        return cls(data)
 
 
 ##############################################################################
-class Package(NamedTuple):
-    """A Package in PyPI."""
+class Package:
+    """A Package in PyPI.
 
-    author: str
-    """The author of the package."""
+    Like `PackageURL` this is kept compact, so that many packages can be
+    held at once. The description, which is often the bulk of the data,
+    may be held undecoded until it is first used.
+    """
 
-    author_email: str
-    """The email address of the author."""
+    __slots__ = (
+        "author",
+        "author_email",
+        "bugtrack_url",
+        "classifiers",
+        "_description",
+        "description_content_type",
+        "docs_url",
+        "download_url",
+        "homepage",
+        "keywords",
+        "license",
+        "maintainer",
+        "maintainer_email",
+        "name",
+        "package_url",
+        "platform",
+        "project_url",
+        "_project_urls",
+        "release_url",
+        "requires_dist",
+        "requires_python",
+        "summary",
+        "version",
+        "yanked",
+        "yanked_reason",
+        "urls",
+    )
+
+    _FIELDS = tuple(field.lstrip("_") for field in __slots__)
+    """The names of the fields of the package data."""
+
+    def __init__(self, data: dict[str, Any] | None = None) -> None:
+        """Initialise the package data.
 
-    bugtrack_url: str
-    """The URL for the package's bug tracker."""
+        Args:
+            data: The data from the JSON API. The description in the
+                package information may be `LazyJSON`, in which case it is
+                decoded when it is first used.
+        """
+        data = data or {}
+        get = (data.get("info") or {}).get
+        self.author = _text(get("author"))
+        """The author of the package."""
+        self.author_email = _text(get("author_email"))
+        """The email address of the author."""
+        self.bugtrack_url: str = get("bugtrack_url") or ""
+        """The URL for the package's bug tracker."""
+        self.classifiers = _vocabulary(get("classifiers"))
+        """The classifiers for the package."""
+        self._description: str | LazyJSON = get("description") or ""
+        self.description_content_type = _text(get("description_content_type"))
+        """The content type of the description."""
+        self.docs_url: str = get("docs_url") or ""
+        """The URL for the packages documentation."""
+        self.download_url: str = get("download_url") or ""
+        """The URL to download the package."""
+        self.homepage: str = get("home_page") or ""
+        """The homepage for the package."""
+        self.keywords = _vocabulary(split("[ ,]+", get("keywords") or ""))
+        """The keywords for the package."""
+        self.license = _text(get("license"))
+        """The licence for the package."""
+        self.maintainer = _text(get("maintainer"))
+        """The name of the maintainer of the package."""
+        self.maintainer_email = _text(get("maintainer_email"))
+        """The email address of the maintainer of the package."""
+        self.name: str = get("name") or ""
+        """The name of the package."""
+        self.package_url: str = get("package_url") or ""
+        """The URL for the package."""
+        self.platform = _text(get("platform"))
+        """The platform for the package."""
+        self.project_url: str = get("project_url") or ""
+        """The URL of the project for the package."""
+        self._project_urls = tuple(
+            (intern(title), url) for title, url in (get("project_urls") or {}).items()
+        )
+        self.release_url: str = get("release_url") or ""
+        """The URL of the latest release of the package."""
+        self.requires_dist = _vocabulary(get("requires_dist"))
+        """The requirements for the distribution of the package."""
+        self.requires_python = _text(get("requires_python"))
+        """The version of Python required for the package."""
+        self.summary: str = get("summary") or ""
+        """The summary of the package."""
+        self.version: str = get("version") or ""
+        """The version of the package."""
+        self.yanked: bool = get("yanked") or False
+        """Has the package been yanked?"""
+        self.yanked_reason = _text(get("yanked_reason"))
+        """The reason for the yank, if the package has been yanked."""
+        self.urls = tuple(map(PackageURL, data.get("urls") or ()))
+        """The URLs for this package."""
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Package):
+            return NotImplemented
+        # The description is compared last as it may need decoding.
+        return all(
+            getattr(self, field) == getattr(other, field)
+            for field in self._FIELDS
+            if field != "description"
+        ) and (self.description == other.description)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(name={self.name!r}, version={self.version!r})"
+        )
 
-    classifiers: list[str]
-    """The list of classifiers for the package."""
+    @property
+    def description(self) -> str:
+        """The description for the package."""
+        if isinstance(self._description, LazyJSON):
+            self._description = self._description.value or ""
+        return self._description
 
-    description: str
-    """The description for the package."""
+    @property
+    def description_size(self) -> int:
+        """The size of the description, without needing to decode it."""
+        if isinstance(self._description, LazyJSON):
+            return self._description.size
+        return len(self._description)
 
-    description_content_type: str
-    """The content type of the description."""
+    @property
+    def project_urls(self) -> dict[str, str]:
+        """The URLs for the project associated with the package."""
+        return dict(self._project_urls)
 
-    docs_url: str
-    """The URL for the packages documentation."""
+    def as_dict(self) -> dict[str, Any]:
+        """Get the package as a dictionary of plain values.
 
-    download_url: str
-    """The URL to download the package."""
+        Returns:
+            The package data, suitable for serialising as JSON.
+        """
+        return {
+            **{field: getattr(self, field) for field in self._FIELDS},
+            "urls": [url.as_dict() for url in self.urls],
+        }
+
+    @property
+    def dependencies(self) -> list[str]:
+        """The sorted, de-duplicated, names of the packages this one requires."""
+        names: set[str] = set()
+        for requirement in self.requires_dist:
+            try:
+                names.add(Requirement(requirement).name)
+            except InvalidRequirement:
+                pass
+        return sorted(names)
+
+    @staticmethod
+    def api_url(package: str, version: str = "") -> str:
+        """Get the URL of the JSON API for the given package.
 
-    homepage: str
-    """The homepage for the package."""
+        Args:
+            package: The name of the package.
+            version: The version of the package, or an empty string for the
+                latest version.
 
-    keywords: list[str]
-    """The keywords for the package."""
+        Returns:
+            The URL for the package's data.
 
-    license: str
-    """The licence for the package."""
+        Note:
+            The name is normalised, so that however it is written the same
+            URL is used, and so the same cached response and request.
+        """
+        base = index().json_url.rstrip("/")
+        package = canonicalize_name(package)
+        if version:
+            return f"{base}/{package}/{version}/json"
+        return f"{base}/{package}/json"
 
-    maintainer: str
-    """The name of the maintainer of the package."""
+    @staticmethod
+    def _decoder() -> SelectiveDecoder:
+        """Create a decoder for the parts of the API's data that we use.
 
-    maintainer_email: str
-    """The email address of the maintainer of the package."""
+        Returns:
+            A decoder that skips the legacy release data, and that leaves
+            the package information to be decoded afterwards.
+        """
+        return SelectiveDecoder(wanted=("urls",), lazy=("info",))
 
-    name: str
-    """The name of the package."""
+    @classmethod
+    def _from_decoder(
+        cls, response: CacheEntry, decoder: SelectiveDecoder
+    ) -> tuple[bool, "Package"]:
+        """Get package information from a response from the API.
 
-    package_url: str
-    """The URL for the package."""
+        Args:
+            response: The response from the API.
+            decoder: The decoder that has been fed the body of the response.
 
-    platform: str
-    """The platform for the package."""
+        Returns:
+            A flag to say if the package was found and package data.
+        """
+        if not (found := response.status == httpx.codes.OK):
+            return found, cls.from_json({})
+        with tracer().span("decode", "data", url=response.url):
+            data = decoder.close()
+            if isinstance(info := data.get("info"), LazyJSON):
+                data["info"] = info.decode(lazy=("description",))
+        with tracer().span("build", "data", url=response.url):
+            return found, cls.from_json(data)
 
-    project_url: str
-    """The URL of the project for the package."""
+    @classmethod
+    def _from_response(cls, response: CacheEntry) -> tuple[bool, "Package"]:
+        """Get package information from a complete response from the API.
+
+        Args:
+            response: The response from the API.
 
-    project_urls: dict[str, str]
-    """The URLs for the project associated with the package."""
+        Returns:
+            A flag to say if the package was found and package data.
+        """
+        decoder = cls._decoder()
+        if response.status == httpx.codes.OK:
+            decoder.feed(response.body)
+        return cls._from_decoder(response, decoder)
+
+    @classmethod
+    async def from_pypi(cls, package: str, version: str = "") -> tuple[bool, "Package"]:
+        """Get information on the given package from PyPI.
 
-    release_url: str
-    """The URL of the latest release of the package."""
+        Args:
+            package: The name of the package to get data for.
+            version: The version of the package to get data for, or an empty
+                string for the latest version.
 
-    requires_dist: list[str]
-    """The requirements for the distribution of the package."""
+        Returns:
+            A flag to say if the package was found and package data.
+        """
 
-    requires_python: str
-    """The version of Python required for the package."""
+        # If we've recently seen the package, just use that.
+        if (recent := packages().get(package, version)) is not None and (
+            recent.age < cache().settings.ttl or cache().settings.offline
+        ):
+            metrics().count("packages.recent")
+            return True, recent.package
 
-    summary: str
-    """The summary of the package."""
+        decoder = cls._decoder()
+        found, data = cls._from_decoder(
+            await fetch(cls.api_url(package, version), decoder.feed), decoder
+        )
+        if not found and "simple" in index().files_from:
+            found, data = await cls._from_simple(package, version)
+        if found:
+            packages().put(package, data, version)
+            # Only the latest release of a package is stored, so that
+            # looking at an older release doesn't replace it.
+            if not version:
+                await to_thread(package_store().put, data)
+        else:
+            packages().discard(package, version)
+        return found, data
 
-    version: str
-    """The version of the package."""
+    @classmethod
+    async def _from_simple(cls, package: str, version: str) -> tuple[bool, "Package"]:
+        """Get what information we can on a package from the simple API.
 
-    yanked: bool
-    """Has the package been yanked?"""
+        Args:
+            package: The name of the package to get data for.
+            version: The version of the package to get data for, or an empty
+                string for the latest version.
 
-    yanked_reason: str
-    """The reason for the yank, if the package has been yanked."""
+        Returns:
+            A flag to say if the package was found and package data.
 
-    urls: list[PackageURL]
-    """The URLs for this package."""
+        Note:
+            This is for indexes that only provide the simple API; all that
+            can be known of the package is its name, its versions, and the
+            files of each version.
+        """
+        files = [
+            (found, file)
+            for file in await simple_files(package) or ()
+            if (found := version_of(file["filename"])) is not None
+        ]
+        if not files:
+            return False, cls.from_json({})
+        try:
+            wanted = Version(version) if version else max(found for found, _ in files)
+        except InvalidVersion:
+            return False, cls.from_json({})
+        if not (urls := [file for found, file in files if found == wanted]):
+            return False, cls.from_json({})
+        return True, cls.from_json(
+            {"info": {"name": package, "version": str(wanted)}, "urls": urls}
+        )
 
     @classmethod
-    async def from_pypi(cls, package: str) -> tuple[bool, "Package"]:
-        """Get information on the given package from PyPI.
+    async def from_cache(cls, package: str, version: str = "") -> "Package | None":
+        """Get information on the given package from the cache only.
 
         Args:
             package: The name of the package to get data for.
+            version: The version of the package to get data for, or an empty
+                string for the latest version.
 
         Returns:
-            A flag to say if the package was found and package data.
+            The package data, or `None` if the package isn't in the cache.
+
+        Note:
+            The data is returned regardless of its age; this is intended
+            for showing something while fresh data is fetched.
         """
+        if (recent := packages().peek(package, version)) is not None:
+            return recent.package
+        if (response := await cached(cls.api_url(package, version))) is None:
+            return None
+        found, data = cls._from_response(response)
+        return data if found else None
 
-        async with httpx.AsyncClient() as client:
-            # Get the package's data from the API.
-            resp = await client.get(
-                f"https://pypi.org/pypi/{package}/json", follow_redirects=True
-            )
-
-            # Extract the main payload data.
-            data = resp.json()
-
-            # Create the function to get the main package information.
-            info = partial(_get, data, "info")
-
-            # TODO: Do this in a less-monolothic way.
-            return resp.status_code == httpx.codes.OK, cls(
-                author=info("author"),
-                author_email=info("author_email"),
-                bugtrack_url=info("bugtrack_url"),
-                classifiers=info("classifiers", []),
-                description=info("description"),
-                description_content_type=info("description_content_type"),
-                docs_url=info("docs_url"),
-                download_url=info("download_url"),
-                homepage=info("home_page"),
-                keywords=split("[ ,]+", info("keywords")),
-                license=info("license"),
-                maintainer=info("maintainer"),
-                maintainer_email=info("maintainer_email"),
-                name=info("name"),
-                package_url=info("package_url"),
-                platform=info("platform"),
-                project_url=info("project_url"),
-                project_urls=info("project_urls", {}),
-                release_url=info("release_url"),
-                requires_dist=info("requires_dist", []),
-                requires_python=info("requires_python"),
-                summary=info("summary"),
-                version=info("version"),
-                yanked=info("yanked", False),
-                yanked_reason=info("yanked_reason"),
-                urls=[PackageURL.from_json(url) for url in data.get("urls", [])],
-            )
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "Package":
+        """Get package information from the given data.
+
+        Args:
+            data: The data from the JSON API.
+
+        Returns:
+            An instance of a `Package` class.
+        """
+        return cls(data)
 
 
 ### package.py ends here
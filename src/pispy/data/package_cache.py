@@ -0,0 +1,172 @@
+"""Provides an in-memory cache of parsed package data."""
+
+##############################################################################
+# Python imports.
+from collections import OrderedDict
+from time import time
+from typing import TYPE_CHECKING, NamedTuple
+
+##############################################################################
+# Packaging imports.
+from packaging.utils import canonicalize_name
+
+##############################################################################
+# Type checking imports.
+if TYPE_CHECKING:
+    from .package import Package
+
+
+##############################################################################
+class CachedPackage(NamedTuple):
+    """A package held in the in-memory cache."""
+
+    package: "Package"
+    """The package."""
+
+    stored: float
+    """The time at which the package was stored."""
+
+    weight: int
+    """The approximate size of the package, in bytes."""
+
+    @property
+    def age(self) -> float:
+        """The time, in seconds, since the package was stored."""
+        return time() - self.stored
+
+
+##############################################################################
+class PackageCache:
+    """A size-bounded, least-recently-used, cache of parsed packages."""
+
+    def __init__(self, max_size: int = 32 * 1024 * 1024) -> None:
+        """Initialise the cache.
+
+        Args:
+            max_size: The approximate maximum size, in bytes, of the cache.
+        """
+        self.max_size = max_size
+        """The approximate maximum size, in bytes, of the cache."""
+        self.size = 0
+        """The approximate current size, in bytes, of the cache."""
+        self.hits = 0
+        """The number of lookups that were found in the cache."""
+        self.misses = 0
+        """The number of lookups that were not found in the cache."""
+        self._packages: OrderedDict[tuple[str, str], CachedPackage] = OrderedDict()
+
+    @staticmethod
+    def _weigh(package: "Package") -> int:
+        """Estimate the size of a package in memory.
+
+        Args:
+            package: The package to weigh.
+
+        Returns:
+            The approximate size of the package, in bytes.
+        """
+        return (
+            1024
+            + package.description_size
+            + 128 * len(package.classifiers)
+            + 64 * len(package.requires_dist)
+            + 512 * len(package.urls)
+        )
+
+    def __len__(self) -> int:
+        return len(self._packages)
+
+    @staticmethod
+    def _key(name: str, version: str) -> tuple[str, str]:
+        """Get the key for a package in the cache.
+
+        Args:
+            name: The name of the package.
+            version: The version of the package, or an empty string for the
+                latest version.
+
+        Returns:
+            The key for the package.
+        """
+        return canonicalize_name(name), version
+
+    def get(self, name: str, version: str = "") -> CachedPackage | None:
+        """Get a package from the cache.
+
+        Args:
+            name: The name of the package to get.
+            version: The version of the package, or an empty string for the
+                latest version.
+
+        Returns:
+            The cached package, or `None` if it isn't in the cache.
+        """
+        if (cached := self._packages.get(key := self._key(name, version))) is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._packages.move_to_end(key)
+        return cached
+
+    def peek(self, name: str, version: str = "") -> CachedPackage | None:
+        """Look at a package in the cache without counting it as a lookup.
+
+        Args:
+            name: The name of the package to look at.
+            version: The version of the package, or an empty string for the
+                latest version.
+
+        Returns:
+            The cached package, or `None` if it isn't in the cache.
+        """
+        return self._packages.get(self._key(name, version))
+
+    def put(self, name: str, package: "Package", version: str = "") -> None:
+        """Put a package into the cache.
+
+        Args:
+            name: The name the package was looked up with.
+            package: The package to cache.
+            version: The version the package was looked up with, or an empty
+                string for the latest version.
+        """
+        self.discard(name, version)
+        cached = CachedPackage(package, time(), self._weigh(package))
+        self._packages[self._key(name, version)] = cached
+        self.size += cached.weight
+        while self.size > self.max_size and len(self._packages) > 1:
+            self.size -= self._packages.popitem(last=False)[1].weight
+
+    def discard(self, name: str, version: str = "") -> None:
+        """Remove a package from the cache, if it is there.
+
+        Args:
+            name: The name of the package to remove.
+            version: The version of the package, or an empty string for the
+                latest version.
+        """
+        if (cached := self._packages.pop(self._key(name, version), None)) is not None:
+            self.size -= cached.weight
+
+    def clear(self) -> None:
+        """Remove everything from the cache."""
+        self._packages.clear()
+        self.size = 0
+
+
+##############################################################################
+_packages = PackageCache()
+"""The application-wide package cache."""
+
+
+##############################################################################
+def packages() -> PackageCache:
+    """Get the application-wide package cache.
+
+    Returns:
+        The application-wide package cache.
+    """
+    return _packages
+
+
+### package_cache.py ends here
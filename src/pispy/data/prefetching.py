@@ -0,0 +1,144 @@
+"""Provides speculative prefetching of packages the user is likely to view."""
+
+##############################################################################
+# Python imports.
+from asyncio import Semaphore, gather, sleep
+from typing import Iterable, Iterator
+from urllib.parse import urlparse
+
+##############################################################################
+# httpx imports.
+import httpx
+
+##############################################################################
+# Local imports.
+from .cache import cache
+from .package import Package
+from .package_cache import packages
+
+
+##############################################################################
+def pypi_projects(urls: Iterable[str]) -> Iterator[str]:
+    """Find the names of any PyPI projects linked to by the given URLs.
+
+    Args:
+        urls: The URLs to look through.
+
+    Yields:
+        The names of projects that are linked to on PyPI.
+    """
+    for url in urls:
+        location = urlparse(url)
+        if location.hostname in ("pypi.org", "www.pypi.org"):
+            match location.path.strip("/").split("/"):
+                case ["project", name, *_]:
+                    yield name
+
+
+##############################################################################
+def prefetch_candidates(package: Package, project_urls: bool = True) -> list[str]:
+    """Get the names of the packages that are worth prefetching for a package.
+
+    Args:
+        package: The package being viewed.
+        project_urls: Include PyPI projects linked to from the project URLs?
+
+    Returns:
+        The names of the packages to prefetch, in priority order.
+    """
+    candidates = package.dependencies
+    if project_urls:
+        candidates += pypi_projects(package.project_urls.values())
+    return list(
+        dict.fromkeys(
+            name
+            for name in candidates
+            if (recent := packages().peek(name)) is None
+            or recent.age >= cache().settings.ttl
+        )
+    )
+
+
+##############################################################################
+async def _prefetch(
+    lookups: Iterable[tuple[str, str]], concurrency: int, delay: float
+) -> None:
+    """Prefetch the given packages, to warm up the caches.
+
+    Args:
+        lookups: The name and version of each package to prefetch.
+        concurrency: The maximum number of packages to fetch at once.
+        delay: The time to wait before starting to prefetch.
+    """
+
+    # Give the foreground a moment to settle before we start.
+    await sleep(delay)
+
+    slots = Semaphore(concurrency)
+
+    async def fetch_one(name: str, version: str) -> None:
+        async with slots:
+            try:
+                await Package.from_pypi(name, version)
+            except (httpx.HTTPError, ValueError):
+                # Prefetching is only ever a nicety; if the package can't be
+                # fetched, or decoded, the foreground will find out for itself.
+                pass
+
+    await gather(*(fetch_one(name, version) for name, version in lookups))
+
+
+##############################################################################
+async def prefetch(
+    names: Iterable[str],
+    concurrency: int = 2,
+    delay: float = 0.25,
+    limit: int = 64,
+) -> None:
+    """Prefetch the given packages, to warm up the caches.
+
+    Args:
+        names: The names of the packages to prefetch, in priority order.
+        concurrency: The maximum number of packages to fetch at once.
+        delay: The time to wait before starting to prefetch.
+        limit: The maximum number of packages to prefetch.
+
+    Note:
+        This is intended to be run in the background, and to be cancelled
+        when it is no longer needed. The concurrency is kept low so that
+        there's always room in the connection pool for foreground lookups.
+    """
+    await _prefetch(((name, "") for name in list(names)[:limit]), concurrency, delay)
+
+
+##############################################################################
+async def prefetch_releases(
+    package: str,
+    versions: Iterable[str],
+    concurrency: int = 4,
+    delay: float = 0.1,
+) -> None:
+    """Prefetch the given releases of a package, to warm up the caches.
+
+    Args:
+        package: The name of the package.
+        versions: The versions of the package to prefetch.
+        concurrency: The maximum number of releases to fetch at once.
+        delay: The time to wait before starting to prefetch.
+
+    Note:
+        Releases that are already held in memory are skipped. As with
+        `prefetch`, this is intended to be run in the background.
+    """
+    await _prefetch(
+        (
+            (package, version)
+            for version in versions
+            if packages().peek(package, version) is None
+        ),
+        concurrency,
+        delay,
+    )
+
+
+### prefetching.py ends here
@@ -0,0 +1,150 @@
+"""Provides a summary of every release of a PyPI package."""
+
+##############################################################################
+# Python imports.
+from asyncio import to_thread
+from typing import Any, NamedTuple
+
+##############################################################################
+# httpx imports.
+import httpx
+
+##############################################################################
+# Packaging imports.
+from packaging.version import InvalidVersion, Version
+
+##############################################################################
+# Local imports.
+from .decoding import decode
+from .fetch import fetch
+from .index import index
+from .package import Package
+from .simple import simple_files, version_of
+
+
+##############################################################################
+class Release(NamedTuple):
+    """A summary of a release of a package."""
+
+    version: str
+    """The version of the release."""
+
+    uploaded: str
+    """The time the first file of the release was uploaded, in ISO 8601 format."""
+
+    yanked: bool
+    """Has the release been yanked?"""
+
+    files: int
+    """The number of files in the release."""
+
+    size: int
+    """The total size of the files in the release."""
+
+    @classmethod
+    def from_json(cls, version: str, files: list[dict[str, Any]]) -> "Release":
+        """Get a release summary from the given data.
+
+        Args:
+            version: The version of the release.
+            files: The data for the files of the release.
+
+        Returns:
+            An instance of a `Release` class.
+        """
+        return cls(
+            version=version,
+            uploaded=min(
+                (file.get("upload_time_iso_8601") or "" for file in files), default=""
+            ),
+            yanked=bool(files) and all(file.get("yanked") for file in files),
+            files=len(files),
+            size=sum(file.get("size") or 0 for file in files),
+        )
+
+
+##############################################################################
+def _newest_first(release: Release) -> tuple[bool, Version]:
+    """Get the key for sorting releases, newest first.
+
+    Args:
+        release: The release to get the key for.
+
+    Returns:
+        The sort key for the release.
+    """
+    try:
+        return True, Version(release.version)
+    except InvalidVersion:
+        return False, Version("0")
+
+
+##############################################################################
+def _summarise(body: bytes) -> list[Release]:
+    """Summarise the releases in a response from the JSON API.
+
+    Args:
+        body: The body of the response.
+
+    Returns:
+        The releases, newest first.
+    """
+    return sorted(
+        (
+            Release.from_json(version, files)
+            for version, files in (
+                decode(body, wanted=("releases",)).get("releases") or {}
+            ).items()
+        ),
+        key=_newest_first,
+        reverse=True,
+    )
+
+
+##############################################################################
+def _group(files: list[dict[str, Any]]) -> list[Release]:
+    """Summarise the releases in a listing of files from the simple API.
+
+    Args:
+        files: The files of the package.
+
+    Returns:
+        The releases, newest first.
+    """
+    releases: dict[str, list[dict[str, Any]]] = {}
+    for file in files:
+        if (version := version_of(file["filename"])) is not None:
+            releases.setdefault(str(version), []).append(file)
+    return sorted(
+        (Release.from_json(version, files) for version, files in releases.items()),
+        key=_newest_first,
+        reverse=True,
+    )
+
+
+##############################################################################
+async def load_releases(package: str) -> list[Release]:
+    """Load a summary of every release of the given package.
+
+    Args:
+        package: The name of the package.
+
+    Returns:
+        The releases of the package, newest first.
+
+    Note:
+        The release data is kept out of `Package`, as it is large and
+        seldom wanted; it is decoded from the (normally already cached)
+        response for the package only when it is asked for. If the index
+        doesn't provide the JSON API, the releases are worked out from the
+        files listed by the simple API.
+    """
+    response = await fetch(Package.api_url(package))
+    if response.status == httpx.codes.OK:
+        return await to_thread(_summarise, response.body)
+    if "simple" in index().files_from:
+        return _group(await simple_files(package) or [])
+    return []
+
+
+### releases.py ends here
@@ -0,0 +1,142 @@
+"""Provides the settings for the data layer.
+
+These are kept apart from the code they configure so that they can be used
+(for example when parsing the command line) without importing anything
+heavy.
+"""
+
+##############################################################################
+# Python imports.
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple
+
+
+##############################################################################
+class ClientSettings(NamedTuple):
+    """Settings for the shared HTTP client."""
+
+    timeout: float = 10.0
+    """The general timeout, in seconds, for read, write and pool operations."""
+
+    connect_timeout: float = 5.0
+    """The timeout, in seconds, for establishing a connection."""
+
+    max_connections: int = 20
+    """The maximum number of concurrent connections."""
+
+    max_keepalive_connections: int = 10
+    """The maximum number of idle connections to keep alive."""
+
+    keepalive_expiry: float = 30.0
+    """How long, in seconds, an idle connection is kept alive for."""
+
+    http2: bool = False
+    """Should HTTP/2 be used if it is available?"""
+
+    retries: int = 3
+    """The number of times to retry a request that fails in a passing way."""
+
+    backoff: float = 0.5
+    """The base delay, in seconds, before a retry; it doubles with each retry."""
+
+    max_backoff: float = 30.0
+    """The longest time, in seconds, to wait before a retry."""
+
+
+##############################################################################
+class CacheSettings(NamedTuple):
+    """Settings for the on-disk cache."""
+
+    location: Path | None = None
+    """The location of the cache, or `None` to use the platform default."""
+
+    ttl: float = 600.0
+    """The time, in seconds, a cached response is considered fresh for."""
+
+    max_size: int = 256 * 1024 * 1024
+    """The maximum size, in bytes, the cache is allowed to grow to."""
+
+    offline: bool = False
+    """Should responses only ever be served from the cache?"""
+
+    enabled: bool = True
+    """Is the cache enabled at all?"""
+
+
+##############################################################################
+class StoreSettings(NamedTuple):
+    """Settings for the local store of package metadata."""
+
+    location: Path | None = None
+    """The location of the store, or `None` to use the platform default."""
+
+    enabled: bool = False
+    """Should the packages that are looked up be kept in the store?"""
+
+
+##############################################################################
+def json_url_for(simple_url: str) -> str:
+    """Work out the base URL of an index's JSON API from that of its simple API.
+
+    Args:
+        simple_url: The base URL of the simple API.
+
+    Returns:
+        The base URL of the JSON API.
+
+    Note:
+        PyPI, and mirrors that follow its layout (such as Artifactory),
+        serve the simple API from `.../simple` and the JSON API from
+        `.../pypi`; any other index is assumed to serve the JSON API, if it
+        has one, from under the simple API. Where there is no JSON API the
+        simple API is used instead.
+    """
+    base = simple_url.rstrip("/")
+    head, _, tail = base.rpartition("/")
+    return f"{head}/pypi" if tail == "simple" else base
+
+
+##############################################################################
+class IndexSettings(NamedTuple):
+    """Settings for the package index."""
+
+    json_url: str = "https://pypi.org/pypi"
+    """The base URL of the index's JSON API."""
+
+    simple_url: str = "https://pypi.org/simple"
+    """The base URL of the index's simple repository API."""
+
+    files_from: tuple[str, ...] = ("simple", "json")
+    """The sources to list the files of a package from, in order of preference."""
+
+    extra_urls: tuple[str, ...] = ()
+    """The base URLs of the simple API of other indexes to use."""
+
+    @classmethod
+    def from_index_url(
+        cls, index_url: str, extra_urls: Iterable[str] = (), **settings: Any
+    ) -> "IndexSettings":
+        """Get the settings for an index, given the URL of its simple API.
+
+        Args:
+            index_url: The base URL of the index's simple API.
+            extra_urls: The base URLs of the simple API of other indexes.
+            settings: Any other settings.
+
+        Returns:
+            The settings for the index.
+        """
+        index_url = index_url.rstrip("/")
+        return cls(
+            json_url=json_url_for(index_url),
+            simple_url=index_url,
+            extra_urls=tuple(
+                url.rstrip("/")
+                for url in dict.fromkeys(extra_urls)
+                if url.rstrip("/") != index_url
+            ),
+            **settings,
+        )
+
+
+### settings.py ends here
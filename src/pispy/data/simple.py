@@ -0,0 +1,310 @@
+"""Provides access to the files listed by an index's simple repository API.
+
+Both the JSON form of the API (PEP 691) and the original HTML form (PEP
+503) are understood, so this works with PyPI, with other index servers such
+as devpi, and with a plain directory of files served over HTTP. Files are
+described using the same keys as the JSON API uses, so that they can be
+used to make `PackageURL`s, or be mixed with data from the JSON API.
+"""
+
+##############################################################################
+# Python imports.
+from asyncio import to_thread
+from functools import lru_cache
+from html.parser import HTMLParser
+from json import loads
+from typing import Any
+from urllib.parse import urldefrag, urljoin
+
+##############################################################################
+# httpx imports.
+import httpx
+
+##############################################################################
+# Packaging imports.
+from packaging.utils import canonicalize_name
+from packaging.version import Version
+
+##############################################################################
+# Local imports.
+from .fetch import fetch
+from .index import index
+
+##############################################################################
+SIMPLE_JSON = "application/vnd.pypi.simple.v1+json"
+"""The content type of the JSON form of the simple API."""
+
+ACCEPT = f"{SIMPLE_JSON}, application/vnd.pypi.simple.v1+html;q=0.2, text/html;q=0.01"
+"""The content types we accept from the simple API, in order of preference."""
+
+_PACKAGE_TYPES = {
+    ".whl": "bdist_wheel",
+    ".egg": "bdist_egg",
+    ".exe": "bdist_wininst",
+    ".msi": "bdist_msi",
+    ".rpm": "bdist_rpm",
+    ".dmg": "bdist_dmg",
+}
+"""The package types of built distributions, by file extension."""
+
+
+##############################################################################
+def project_url(name: str) -> str:
+    """Get the URL of the simple API page for a project.
+
+    Args:
+        name: The name of the project.
+
+    Returns:
+        The URL of the project's page in the simple API.
+    """
+    return f"{index().simple_url.rstrip('/')}/{canonicalize_name(name)}/"
+
+
+##############################################################################
+def version_of(filename: str) -> Version | None:
+    """Get the version of a distribution from its filename.
+
+    Args:
+        filename: The filename of the distribution.
+
+    Returns:
+        The version, or `None` if it can't be worked out.
+
+    Note:
+        Only the version is picked out of the filename, without checking
+        the rest of it (the tags of a wheel take a lot of parsing), and
+        the files of a release share the same few version strings, so this
+        is cheap even for projects with many thousands of files.
+    """
+    if filename.endswith(".whl"):
+        parts = filename[:-4].split("-")
+        if len(parts) not in (5, 6):
+            return None
+        version = parts[1]
+    elif filename.endswith((".tar.gz", ".zip")):
+        name, _, version = (
+            filename.removesuffix(".tar.gz").removesuffix(".zip").rpartition("-")
+        )
+        if not name:
+            return None
+    else:
+        return None
+    try:
+        return _version(version)
+    except ValueError:
+        return None
+
+
+##############################################################################
+@lru_cache(maxsize=1024)
+def _version(text: str) -> Version:
+    """Parse a version, remembering the result.
+
+    Args:
+        text: The version to parse.
+
+    Returns:
+        The version.
+
+    Raises:
+        InvalidVersion: If the version isn't valid.
+    """
+    return Version(text)
+
+
+##############################################################################
+def _file(
+    filename: str,
+    url: str,
+    hashes: dict[str, str],
+    yanked: bool | str,
+    core_metadata: bool | dict[str, str],
+    size: int = 0,
+    uploaded: str = "",
+    requires_python: str = "",
+) -> dict[str, Any]:
+    """Describe a file in the same way as the JSON API does.
+
+    Args:
+        filename: The name of the file.
+        url: The URL of the file.
+        hashes: The hashes of the file.
+        yanked: Has the file been yanked? A string gives the reason.
+        core_metadata: Is the core metadata available? A mapping gives
+            its hashes.
+        size: The size of the file, if known.
+        uploaded: The time the file was uploaded, if known.
+        requires_python: The versions of Python the file needs, if known.
+
+    Returns:
+        The description of the file.
+    """
+    extension = filename[filename.rfind(".") :]
+    return {
+        "filename": filename,
+        "url": url,
+        "digests": hashes,
+        "yanked": bool(yanked),
+        "yanked_reason": yanked if isinstance(yanked, str) else "",
+        "core-metadata": core_metadata,
+        "size": size,
+        "upload_time_iso_8601": uploaded,
+        "requires_python": requires_python,
+        "packagetype": _PACKAGE_TYPES.get(extension, "sdist"),
+        "python_version": (
+            filename[:-4].split("-")[-3] if extension == ".whl" else "source"
+        ),
+    }
+
+
+##############################################################################
+def _from_json(document: dict[str, Any], base: str) -> list[dict[str, Any]]:
+    """Get the files from the JSON form of a project page.
+
+    Args:
+        document: The decoded project page.
+        base: The URL the page was fetched from.
+
+    Returns:
+        The files listed on the page.
+    """
+    return [
+        _file(
+            filename=file["filename"],
+            url=urljoin(base, file["url"]),
+            hashes=file.get("hashes") or {},
+            yanked=file.get("yanked") or False,
+            core_metadata=file.get("core-metadata", file.get("dist-info-metadata"))
+            or False,
+            size=file.get("size") or 0,
+            uploaded=file.get("upload-time") or "",
+            requires_python=file.get("requires-python") or "",
+        )
+        for file in document.get("files") or ()
+        if file.get("filename") and file.get("url")
+    ]
+
+
+##############################################################################
+class _ProjectPage(HTMLParser):
+    """A parser for the HTML form of a project page."""
+
+    def __init__(self, base: str) -> None:
+        """Initialise the parser.
+
+        Args:
+            base: The URL the page was fetched from.
+        """
+        super().__init__()
+        self._base = base
+        self._anchor: dict[str, str | None] | None = None
+        self._text: list[str] = []
+        self.files: list[dict[str, Any]] = []
+        """The files found on the page."""
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "base" and (href := dict(attrs).get("href")):
+            self._base = urljoin(self._base, href)
+        elif tag == "a":
+            self._anchor = dict(attrs)
+            self._text = []
+
+    def handle_data(self, data: str) -> None:
+        if self._anchor is not None:
+            self._text.append(data)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag != "a" or self._anchor is None:
+            return
+        anchor, self._anchor = self._anchor, None
+        if not (href := anchor.get("href")):
+            return
+        url, fragment = urldefrag(urljoin(self._base, href))
+        filename = "".join(self._text).strip() or url.rsplit("/", 1)[-1]
+        algorithm, _, digest = fragment.partition("=")
+        self.files.append(
+            _file(
+                filename=filename,
+                url=url,
+                hashes={algorithm: digest} if digest else {},
+                yanked=(anchor["data-yanked"] or True)
+                if "data-yanked" in anchor
+                else False,
+                core_metadata=self._metadata(
+                    anchor.get("data-core-metadata")
+                    or anchor.get("data-dist-info-metadata")
+                ),
+                requires_python=anchor.get("data-requires-python") or "",
+            )
+        )
+
+    @staticmethod
+    def _metadata(value: str | None) -> bool | dict[str, str]:
+        """Interpret the value of a core metadata attribute.
+
+        Args:
+            value: The value of the attribute.
+
+        Returns:
+            The hashes of the metadata file, if given; otherwise if the
+            metadata file is available.
+        """
+        if value and "=" in value:
+            algorithm, _, digest = value.partition("=")
+            return {algorithm: digest}
+        return value is not None and value.lower() == "true"
+
+
+##############################################################################
+def _from_html(page: str, base: str) -> list[dict[str, Any]]:
+    """Get the files from the HTML form of a project page.
+
+    Args:
+        page: The project page.
+        base: The URL the page was fetched from.
+
+    Returns:
+        The files listed on the page.
+    """
+    parser = _ProjectPage(base)
+    parser.feed(page)
+    parser.close()
+    return parser.files
+
+
+##############################################################################
+def _parse(body: bytes, content_type: str, base: str) -> list[dict[str, Any]]:
+    """Parse a project page.
+
+    Args:
+        body: The body of the page.
+        content_type: The content type of the page.
+        base: The URL the page was fetched from.
+
+    Returns:
+        The files listed on the page.
+    """
+    if content_type.split(";")[0].strip().endswith("json"):
+        return _from_json(loads(body), base)
+    return _from_html(body.decode("utf-8", errors="replace"), base)
+
+
+##############################################################################
+async def simple_files(name: str) -> list[dict[str, Any]] | None:
+    """Get every file of a project from the simple API.
+
+    Args:
+        name: The name of the project.
+
+    Returns:
+        The files of the project, described with the keys used by the JSON
+        API, or `None` if the index doesn't know the project.
+    """
+    response = await fetch(url := project_url(name), accept=ACCEPT)
+    if response.status != httpx.codes.OK:
+        return None
+    return await to_thread(_parse, response.body, response.content_type, url)
+
+
+### simple.py ends here
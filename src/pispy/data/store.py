@@ -0,0 +1,274 @@
+"""Provides a local store of package metadata, with full-text search.
+
+The store is a SQLite database that holds the searchable details of every
+package that has been looked up, along with an FTS5 index of them, so that
+packages can be found by what they do, rather than by name, without going
+near the network.
+"""
+
+##############################################################################
+# Python imports.
+import sqlite3
+from re import findall
+from threading import Lock
+from time import time
+from typing import TYPE_CHECKING, NamedTuple
+
+##############################################################################
+# Platform directory imports.
+from platformdirs import user_data_path
+
+##############################################################################
+# Local imports.
+from .instrumentation import tracer
+from .name_index import normalise
+from .settings import StoreSettings
+
+##############################################################################
+# Type checking imports.
+if TYPE_CHECKING:
+    from .package import Package
+
+##############################################################################
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS packages (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    description TEXT NOT NULL,
+    keywords TEXT NOT NULL,
+    classifiers TEXT NOT NULL,
+    stored REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5(
+    name, summary, description, keywords, classifiers,
+    content='packages', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS packages_added AFTER INSERT ON packages BEGIN
+    INSERT INTO search (rowid, name, summary, description, keywords, classifiers)
+    VALUES (new.rowid, new.name, new.summary, new.description, new.keywords,
+        new.classifiers);
+END;
+CREATE TRIGGER IF NOT EXISTS packages_removed AFTER DELETE ON packages BEGIN
+    INSERT INTO search (search, rowid, name, summary, description, keywords,
+        classifiers)
+    VALUES ('delete', old.rowid, old.name, old.summary, old.description,
+        old.keywords, old.classifiers);
+END;
+CREATE TRIGGER IF NOT EXISTS packages_updated AFTER UPDATE ON packages BEGIN
+    INSERT INTO search (search, rowid, name, summary, description, keywords,
+        classifiers)
+    VALUES ('delete', old.rowid, old.name, old.summary, old.description,
+        old.keywords, old.classifiers);
+    INSERT INTO search (rowid, name, summary, description, keywords, classifiers)
+    VALUES (new.rowid, new.name, new.summary, new.description, new.keywords,
+        new.classifiers);
+END;
+"""
+"""The schema of the store."""
+
+_SEARCH = """
+SELECT packages.name, packages.version, packages.summary
+FROM search JOIN packages ON packages.rowid = search.rowid
+WHERE search MATCH ?
+ORDER BY bm25(search, 10.0, 4.0, 1.0, 6.0, 2.0)
+LIMIT ?
+"""
+"""The query for searching the store, best matches first.
+
+Matches in the name count for the most, followed by the keywords and the
+summary; matches in the long description count for the least.
+"""
+
+
+##############################################################################
+class SearchResult(NamedTuple):
+    """A package found by searching the store."""
+
+    name: str
+    """The name of the package."""
+
+    version: str
+    """The version of the package when it was stored."""
+
+    summary: str
+    """The summary of the package."""
+
+
+##############################################################################
+def match_query(text: str) -> str:
+    """Turn text typed by the user into an FTS5 query.
+
+    Args:
+        text: The text to search for.
+
+    Returns:
+        The query; every word in the text must match, and the last word is
+        matched as a prefix, so that results can be shown while typing.
+        Anything that FTS5 would treat as syntax is ignored.
+    """
+    if not (words := findall(r"\w+", text)):
+        return ""
+    *whole, last = words
+    return " ".join([*(f'"{word}"' for word in whole), f'"{last}"*'])
+
+
+##############################################################################
+class PackageStore:
+    """A local store of package metadata, with full-text search.
+
+    Packages are written to the store from worker threads, so the one
+    connection to the database is shared between threads, and only used by
+    one of them at a time.
+    """
+
+    FILENAME = "packages.db"
+    """The name of the database file for the store."""
+
+    def __init__(self, settings: StoreSettings | None = None) -> None:
+        """Initialise the store.
+
+        Args:
+            settings: The settings for the store.
+        """
+        self.settings = settings or StoreSettings()
+        """The settings for the store."""
+        self.location = (
+            self.settings.location or user_data_path("pispy") / self.FILENAME
+        )
+        """The location of the store on disk."""
+        self._connection: sqlite3.Connection | None = None
+        self._lock = Lock()
+
+    @property
+    def _database(self) -> sqlite3.Connection:
+        """The connection to the database, opened on first use.
+
+        Raises:
+            OSError: If the directory for the database can't be made.
+            sqlite3.Error: If the database can't be opened.
+        """
+        if self._connection is None:
+            self.location.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.location, check_same_thread=False)
+            # Every package that is looked up gets written, so keep the
+            # cost of each write down.
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def put(self, package: "Package") -> None:
+        """Put a package into the store.
+
+        Args:
+            package: The package to store.
+
+        Note:
+            Nothing is stored unless the store is enabled. Failing to store
+            the package isn't an error; it just won't be found later.
+
+            This reads the package's description, so decodes it if it hasn't
+            been already; it is best called from a worker thread.
+        """
+        if not self.settings.enabled or not package.name:
+            return
+        with (
+            tracer().span("store.write", "store", package=package.name),
+            self._lock,
+        ):
+            try:
+                with self._database:
+                    self._database.execute(
+                        "INSERT INTO packages VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT (key) DO UPDATE SET name=excluded.name, "
+                        "version=excluded.version, summary=excluded.summary, "
+                        "description=excluded.description, "
+                        "keywords=excluded.keywords, "
+                        "classifiers=excluded.classifiers, stored=excluded.stored",
+                        (
+                            normalise(package.name),
+                            package.name,
+                            package.version,
+                            package.summary,
+                            package.description,
+                            " ".join(package.keywords),
+                            "\n".join(package.classifiers),
+                            time(),
+                        ),
+                    )
+            except (sqlite3.Error, OSError):
+                pass
+
+    def search(self, text: str, limit: int = 50) -> list[SearchResult]:
+        """Search the store.
+
+        Args:
+            text: The text to search for.
+            limit: The most results to return.
+
+        Returns:
+            The packages that match, best first.
+        """
+        if not (query := match_query(text)) or not self.location.exists():
+            return []
+        with tracer().span("store.search", "store", text=text), self._lock:
+            try:
+                return [
+                    SearchResult(*row)
+                    for row in self._database.execute(_SEARCH, (query, limit))
+                ]
+            except (sqlite3.Error, OSError):
+                return []
+
+    def __len__(self) -> int:
+        if not self.location.exists():
+            return 0
+        with self._lock:
+            try:
+                query = self._database.execute("SELECT count(*) FROM packages")
+                return int(query.fetchone()[0])
+            except (sqlite3.Error, OSError):
+                return 0
+
+    def close(self) -> None:
+        """Close the connection to the store, if it is open."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+##############################################################################
+_store = PackageStore()
+"""The application-wide package store."""
+
+
+##############################################################################
+def configure_store(settings: StoreSettings) -> PackageStore:
+    """Configure the application-wide package store.
+
+    Args:
+        settings: The settings for the store.
+
+    Returns:
+        The application-wide package store.
+    """
+    global _store
+    _store.close()
+    _store = PackageStore(settings)
+    return _store
+
+
+##############################################################################
+def package_store() -> PackageStore:
+    """Get the application-wide package store.
+
+    Returns:
+        The application-wide package store.
+    """
+    return _store
+
+
+### store.py ends here
@@ -0,0 +1,543 @@
+"""Provides inspection of the contents of a wheel, without downloading it.
+
+The core metadata of a wheel is taken from the copy that the index serves
+alongside it (PEP 658) where there is one. Everything else comes from the
+wheel itself, using HTTP range requests to read only the zip central
+directory (which lists the files in the wheel), and then only the members
+that are needed. A wheel is never downloaded in full unless it is small;
+if the server doesn't honour range requests for a large wheel, only what
+the index serves alongside it is shown.
+
+The contents of a wheel never change, so what is found is cached against
+the digest of the wheel.
+"""
+
+##############################################################################
+# Python imports.
+from configparser import ConfigParser
+from configparser import Error as ConfigError
+from hashlib import new as new_hash
+from json import dumps, loads
+from struct import Struct
+from struct import error as StructError
+from time import time
+from typing import NamedTuple
+from zlib import MAX_WBITS, decompressobj
+from zlib import error as ZlibError
+
+##############################################################################
+# httpx imports.
+import httpx
+
+##############################################################################
+# Local imports.
+from .cache import CacheEntry, cache
+from .client import client
+from .fetch import fetch
+from .instrumentation import metrics, tracer
+from .package import PackageURL
+
+##############################################################################
+_END_OF_DIRECTORY = Struct("<4s4H2IH")
+"""The layout of the end of central directory record."""
+
+_ZIP64_LOCATOR = Struct("<4sIQI")
+"""The layout of the zip64 end of central directory locator."""
+
+_ZIP64_END_OF_DIRECTORY = Struct("<4sQ2H2I4Q")
+"""The layout of the zip64 end of central directory record."""
+
+_DIRECTORY_ENTRY = Struct("<4s6H3I5H2I")
+"""The layout of an entry in the central directory."""
+
+_LOCAL_HEADER = Struct("<4s5H3I2H")
+"""The layout of the header of a member of the zip file."""
+
+_TAIL = 64 * 1024
+"""The amount of the end of a wheel to read, which will hopefully hold the
+whole central directory."""
+
+_SMALL = 1024 * 1024
+"""The size, in bytes, of a wheel that is small enough to download in full
+if the server won't honour range requests."""
+
+_TOO_LARGE = (
+    "The server doesn't support range requests, and the wheel is too large to download"
+)
+"""The reason given when a wheel can't be read without downloading it."""
+
+_MAX_MEMBER = 16 * 1024 * 1024
+"""The largest member, compressed, that will be read from a wheel."""
+
+_STORED, _DEFLATED = 0, 8
+"""The compression methods that can be read."""
+
+
+##############################################################################
+class WheelError(Exception):
+    """Raised when a wheel can't be inspected."""
+
+
+##############################################################################
+class WheelMember(NamedTuple):
+    """A member of a wheel, as listed in its central directory."""
+
+    name: str
+    """The name of the member."""
+
+    size: int
+    """The uncompressed size of the member."""
+
+    compressed_size: int
+    """The compressed size of the member."""
+
+    method: int
+    """The compression method of the member."""
+
+    offset: int
+    """The offset of the member's header in the wheel."""
+
+
+##############################################################################
+class WheelContents(NamedTuple):
+    """What has been found inside a wheel."""
+
+    metadata: str = ""
+    """The core metadata of the wheel."""
+
+    entry_points: dict[str, dict[str, str]] = {}
+    """The entry points of the wheel, keyed by group and then by name."""
+
+    files: tuple[tuple[str, int], ...] = ()
+    """The name and size of each file in the wheel."""
+
+    complete: bool = True
+    """Could everything be read? If not, only the metadata is known."""
+
+    fetched: int = 0
+    """The number of bytes fetched to inspect the wheel."""
+
+
+##############################################################################
+class _RangeReader:
+    """Reads ranges of the bytes of a file on a server.
+
+    The end of the file, which holds the zip central directory, is read
+    first; it is kept, and anything later asked for that falls within it
+    is read from it rather than the server. Often the members needed are
+    in there too.
+    """
+
+    def __init__(self, url: str) -> None:
+        """Initialise the reader.
+
+        Args:
+            url: The URL of the file.
+        """
+        self.url = url
+        """The URL of the file."""
+        self.size = 0
+        """The size of the file, once it is known."""
+        self.fetched = 0
+        """The number of bytes that have been fetched."""
+        self._held = b""
+        self._held_from = 0
+        self._whole = False
+
+    async def tail(self, length: int) -> bytes:
+        """Read the end of the file.
+
+        Args:
+            length: The number of bytes to read from the end of the file.
+
+        Returns:
+            The bytes that were read.
+        """
+        body = await self._request(f"bytes=-{length}")
+        if not self._whole:
+            self._held, self._held_from = body, self.size - len(body)
+        return self._held[-length:]
+
+    async def read(self, start: int, end: int) -> bytes:
+        """Read a range of bytes from the file.
+
+        Args:
+            start: The offset of the first byte to read.
+            end: The offset just after the last byte to read.
+
+        Returns:
+            The bytes that were read.
+        """
+        if not (self._held and start >= self._held_from):
+            body = await self._request(f"bytes={start}-{end - 1}")
+            if not self._whole:
+                return body
+        return self._held[start - self._held_from : end - self._held_from]
+
+    async def _request(self, byte_range: str) -> bytes:
+        """Request a range of bytes of the file from the server.
+
+        Args:
+            byte_range: The range to ask for.
+
+        Returns:
+            The bytes that were read.
+
+        Raises:
+            WheelError: If the file couldn't be read.
+
+        Note:
+            If the server ignores the range, and sends the whole file, the
+            file is only accepted if it is small; it is then held, so that
+            everything is read from it from then on.
+        """
+        with tracer().span("wheel.range", "http", url=self.url, range=byte_range):
+            async with client().stream(
+                "GET", self.url, headers={"Range": byte_range}
+            ) as response:
+                metrics().count("wheel.ranges")
+                if response.status_code == httpx.codes.PARTIAL_CONTENT:
+                    body = await self._body(response)
+                    total = response.headers.get("Content-Range", "").rpartition("/")
+                    if total[2].isdigit():
+                        self.size = int(total[2])
+                    return body
+                if response.status_code == httpx.codes.OK:
+                    self._held = await self._body(response, _SMALL)
+                    self._held_from, self.size = 0, len(self._held)
+                    self._whole = True
+                    return self._held
+                raise WheelError(f"The server responded with {response.status_code}")
+
+    async def _body(self, response: httpx.Response, limit: int = 0) -> bytes:
+        """Read the body of a response.
+
+        Args:
+            response: The response to read.
+            limit: The most bytes to accept, or `0` for no limit.
+
+        Returns:
+            The body of the response.
+
+        Raises:
+            WheelError: If the body is larger than the limit.
+        """
+        if limit and int(response.headers.get("Content-Length") or 0) > limit:
+            raise WheelError(_TOO_LARGE)
+        chunks: list[bytes] = []
+        async for chunk in response.aiter_bytes():
+            chunks.append(chunk)
+            self.fetched += len(chunk)
+            metrics().count("bytes.downloaded", len(chunk))
+            if limit and self.fetched > limit:
+                raise WheelError(_TOO_LARGE)
+        return b"".join(chunks)
+
+
+##############################################################################
+def _zip64(extra: bytes, sizes: list[int]) -> list[int]:
+    """Fill in the sizes and offset of a member from its zip64 extra field.
+
+    Args:
+        extra: The extra fields of the member.
+        sizes: The uncompressed size, compressed size and offset of the
+            member, from its directory entry.
+
+    Returns:
+        The sizes and offset, with any that overflowed taken from the zip64
+        extra field.
+    """
+    at = 0
+    while at + 4 <= len(extra):
+        kind, length = Struct("<HH").unpack_from(extra, at)
+        if kind == 1:
+            values = iter(Struct(f"<{length // 8}Q").unpack_from(extra, at + 4))
+            return [
+                next(values, size) if size == 0xFFFFFFFF else size for size in sizes
+            ]
+        at += 4 + length
+    return sizes
+
+
+##############################################################################
+async def _directory(reader: _RangeReader) -> list[WheelMember]:
+    """Read the central directory of a wheel.
+
+    Args:
+        reader: The reader for the wheel.
+
+    Returns:
+        The members of the wheel.
+
+    Raises:
+        WheelError: If the wheel couldn't be read.
+    """
+    tail = await reader.tail(_TAIL)
+    if (at := tail.rfind(b"PK\x05\x06")) < 0:
+        raise WheelError("The wheel isn't a zip file")
+    *_, entries, size, offset, _ = _END_OF_DIRECTORY.unpack_from(tail, at)
+    if 0xFFFFFFFF in (size, offset) or entries == 0xFFFF:
+        signature, _, record, _ = _ZIP64_LOCATOR.unpack_from(
+            tail, at - _ZIP64_LOCATOR.size
+        )
+        if signature != b"PK\x06\x07":
+            raise WheelError("The wheel's zip64 directory can't be found")
+        *_, entries, size, offset = _ZIP64_END_OF_DIRECTORY.unpack_from(
+            await reader.read(record, record + _ZIP64_END_OF_DIRECTORY.size)
+        )
+    directory = await reader.read(offset, offset + size)
+    members: list[WheelMember] = []
+    at = 0
+    for _ in range(entries):
+        (
+            signature,
+            _,
+            _,
+            flags,
+            method,
+            _,
+            _,
+            _,
+            compressed_size,
+            uncompressed_size,
+            name_length,
+            extra_length,
+            comment_length,
+            _,
+            _,
+            _,
+            local_offset,
+        ) = _DIRECTORY_ENTRY.unpack_from(directory, at)
+        if signature != b"PK\x01\x02":
+            raise WheelError("The wheel's zip directory is damaged")
+        at += _DIRECTORY_ENTRY.size
+        name = directory[at : at + name_length].decode(
+            "utf-8" if flags & 0x800 else "cp437", errors="replace"
+        )
+        uncompressed_size, compressed_size, local_offset = _zip64(
+            directory[at + name_length : at + name_length + extra_length],
+            [uncompressed_size, compressed_size, local_offset],
+        )
+        members.append(
+            WheelMember(name, uncompressed_size, compressed_size, method, local_offset)
+        )
+        at += name_length + extra_length + comment_length
+    return members
+
+
+##############################################################################
+async def _read_member(reader: _RangeReader, member: WheelMember) -> bytes:
+    """Read a member of a wheel.
+
+    Args:
+        reader: The reader for the wheel.
+        member: The member to read.
+
+    Returns:
+        The uncompressed content of the member.
+
+    Raises:
+        WheelError: If the member couldn't be read.
+    """
+    if member.compressed_size > _MAX_MEMBER:
+        raise WheelError(f"{member.name} is too large to read")
+    # The local header usually repeats the name, and has no more extra data
+    # than the directory entry, so guess at its size to save a request.
+    start = member.offset
+    guess = _LOCAL_HEADER.size + 2 * len(member.name.encode()) + 64
+    data = await reader.read(start, start + guess + member.compressed_size)
+    signature, *_, name_length, extra_length = _LOCAL_HEADER.unpack_from(data)
+    if signature != b"PK\x03\x04":
+        raise WheelError(f"The header of {member.name} is damaged")
+    begin = _LOCAL_HEADER.size + name_length + extra_length
+    if len(data) < (finish := begin + member.compressed_size):
+        data += await reader.read(start + len(data), start + finish)
+    raw = data[begin:finish]
+    if member.method == _STORED:
+        return raw
+    if member.method == _DEFLATED:
+        try:
+            return decompressobj(-MAX_WBITS).decompress(raw)
+        except ZlibError as error:
+            raise WheelError(f"{member.name} can't be decompressed") from error
+    raise WheelError(f"{member.name} uses an unsupported compression method")
+
+
+##############################################################################
+def _entry_points(text: str) -> dict[str, dict[str, str]]:
+    """Parse the entry points of a wheel.
+
+    Args:
+        text: The content of the wheel's `entry_points.txt`.
+
+    Returns:
+        The entry points, keyed by group and then by name.
+    """
+    parser = ConfigParser(interpolation=None, delimiters=("=",))
+    parser.optionxform = str  # type: ignore[assignment,method-assign]
+    try:
+        parser.read_string(text)
+    except ConfigError:
+        return {}
+    return {group: dict(parser[group]) for group in parser.sections()}
+
+
+##############################################################################
+async def _sidecar_metadata(package_url: PackageURL) -> str:
+    """Get the core metadata the index serves alongside a file (PEP 658).
+
+    Args:
+        package_url: The file to get the core metadata of.
+
+    Returns:
+        The core metadata, or an empty string if it isn't available,
+        couldn't be fetched, or doesn't match its digest.
+    """
+    if not package_url.core_metadata:
+        return ""
+    try:
+        response = await fetch(f"{package_url.url}.metadata")
+    except httpx.HTTPError:
+        # The wheel itself may still be readable.
+        return ""
+    if response.status != httpx.codes.OK:
+        return ""
+    for algorithm, digest in package_url.core_metadata_digests.items():
+        try:
+            if new_hash(algorithm, response.body).hexdigest() != digest:
+                return ""
+        except ValueError:
+            pass
+    return response.body.decode("utf-8", errors="replace")
+
+
+##############################################################################
+async def _read_wheel(package_url: PackageURL) -> WheelContents:
+    """Read what can be read of a wheel.
+
+    Args:
+        package_url: The wheel to read.
+
+    Returns:
+        The contents of the wheel.
+
+    Raises:
+        WheelError: If nothing could be read.
+    """
+    metadata = await _sidecar_metadata(package_url)
+    reader = _RangeReader(package_url.url)
+    try:
+        members = await _directory(reader)
+        info = {
+            member.name.partition("/")[2]: member
+            for member in members
+            if member.name.count("/") == 1
+            and member.name.partition("/")[0].endswith(".dist-info")
+        }
+        if not metadata and "METADATA" in info:
+            metadata = (await _read_member(reader, info["METADATA"])).decode(
+                "utf-8", errors="replace"
+            )
+        entry_points = (
+            _entry_points(
+                (await _read_member(reader, info["entry_points.txt"])).decode(
+                    "utf-8", errors="replace"
+                )
+            )
+            if "entry_points.txt" in info
+            else {}
+        )
+    except (WheelError, httpx.HTTPError, ValueError, StructError) as error:
+        metrics().count("wheel.partial")
+        if metadata:
+            return WheelContents(metadata, complete=False, fetched=reader.fetched)
+        if isinstance(error, WheelError):
+            raise
+        if isinstance(error, StructError):
+            raise WheelError("The wheel's zip directory is damaged") from error
+        raise WheelError(str(error) or type(error).__name__) from error
+    return WheelContents(
+        metadata,
+        entry_points,
+        tuple(
+            (member.name, member.size)
+            for member in members
+            if not member.name.endswith("/")
+        ),
+        fetched=reader.fetched,
+    )
+
+
+##############################################################################
+def _cache_key(package_url: PackageURL) -> str:
+    """Get the key to cache the contents of a wheel against.
+
+    Args:
+        package_url: The wheel.
+
+    Returns:
+        The key; based on the digest of the wheel, if it is known.
+    """
+    digests = package_url.digests
+    for algorithm in ("sha256", "blake2b_256", "md5"):
+        if digest := digests.get(algorithm):
+            return f"pispy:wheel:{algorithm}:{digest}"
+    return f"pispy:wheel:{package_url.url}"
+
+
+##############################################################################
+_inspected: dict[str, WheelContents] = {}
+"""The wheels that have been inspected, keyed by their cache key."""
+
+
+##############################################################################
+async def inspect_wheel(package_url: PackageURL) -> WheelContents:
+    """Inspect the contents of a wheel.
+
+    Args:
+        package_url: The wheel to inspect.
+
+    Returns:
+        The contents of the wheel.
+
+    Raises:
+        WheelError: If the wheel couldn't be inspected.
+    """
+    if not package_url.is_wheel:
+        raise WheelError("Only wheels can be inspected")
+    key = _cache_key(package_url)
+    if (contents := _inspected.get(key)) is not None:
+        return contents
+    if (entry := cache().get(key)) is not None:
+        try:
+            data = loads(entry.body)
+            contents = WheelContents(
+                **{**data, "files": tuple(map(tuple, data["files"]))}
+            )
+        except (ValueError, TypeError, KeyError):
+            # Whatever is cached isn't a usable inspection; inspect again.
+            pass
+        else:
+            _inspected[key] = contents
+            metrics().count("wheel.cached")
+            return contents
+    if cache().settings.offline:
+        raise WheelError("The wheel hasn't been inspected before, and PISpy is offline")
+    with tracer().span("wheel.inspect", "http", url=package_url.url) as details:
+        contents = await _read_wheel(package_url)
+        details["bytes"] = contents.fetched
+    if contents.complete:
+        _inspected[key] = contents
+        cache().put(
+            CacheEntry(
+                key,
+                httpx.codes.OK,
+                dumps(contents._asdict()).encode(),
+                validated=time(),
+                content_type="application/json",
+            )
+        )
+    return contents
+
+
+### wheel.py ends here
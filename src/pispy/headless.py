@@ -0,0 +1,549 @@
+"""Provides headless, batch, lookup of packages."""
+
+##############################################################################
+# Python imports.
+import sys
+from asyncio import Queue, create_task, gather, run, sleep
+from json import dumps
+from os import O_WRONLY, devnull, dup2, environ
+from os import open as open_fd
+from pathlib import Path
+from platform import python_version
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, TextIO
+
+##############################################################################
+# httpx imports.
+import httpx
+
+##############################################################################
+# Packaging imports.
+from packaging.requirements import InvalidRequirement, Requirement
+
+##############################################################################
+# Local imports.
+from .data import ClientSettings, Package, close_client, open_client, split_spec
+
+##############################################################################
+# Type checking imports.
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.table import Table
+
+    from .data import AuditResult
+
+
+##############################################################################
+def names_from(lines: Iterable[str]) -> Iterator[str]:
+    """Get package names from lines of requirements-style text.
+
+    Args:
+        lines: The lines to get the names from.
+
+    Yields:
+        The names of the packages.
+
+    Note:
+        Blank lines, comments, options (such as `-r` or `--hash`) and
+        anything that doesn't parse as a requirement are skipped.
+    """
+    for line in lines:
+        if (line := line.partition("#")[0].strip()) and not line.startswith("-"):
+            try:
+                yield Requirement(line.split(" \\")[0].split(";")[0].strip()).name
+            except InvalidRequirement:
+                pass
+
+
+##############################################################################
+def names_from_file(requirements: Path) -> Iterator[str]:
+    """Get package names from a requirements file.
+
+    Args:
+        requirements: The path to the requirements file.
+
+    Yields:
+        The names of the packages.
+    """
+    with requirements.open(encoding="utf-8") as lines:
+        yield from names_from(lines)
+
+
+##############################################################################
+def result(name: str, found: bool, package: Package | None, error: str = "") -> str:
+    """Format the result of a lookup as a line of JSON.
+
+    Args:
+        name: The name that was looked up.
+        found: Was the package found?
+        package: The package data, if it was found.
+        error: Any error that occurred.
+
+    Returns:
+        The result as a single line of JSON.
+    """
+    data: dict[str, Any] = {"lookup": name, "found": found}
+    if error:
+        data["error"] = error
+    if found and package is not None:
+        data["package"] = package.as_dict()
+    return dumps(data)
+
+
+##############################################################################
+async def lookup(
+    names: Iterable[str], output: TextIO, jobs: int, settings: ClientSettings
+) -> bool:
+    """Look up packages, writing each result as NDJSON as it arrives.
+
+    Args:
+        names: The names of the packages to look up.
+        output: The stream to write the results to.
+        jobs: The number of lookups to run at once.
+        settings: The settings for the HTTP client.
+
+    Returns:
+        `True` if every package was found, `False` if not.
+    """
+    pending: Queue[str] = Queue()
+    for name in dict.fromkeys(names):
+        pending.put_nowait(name)
+    all_found = True
+
+    async def worker() -> None:
+        nonlocal all_found
+        while not pending.empty():
+            name = pending.get_nowait()
+            try:
+                found, package = await Package.from_pypi(name)
+                line = result(name, found, package)
+            except (httpx.HTTPError, ValueError) as error:
+                # A package that can't be fetched, or whose data can't be
+                # decoded, is reported as such; the rest of the batch goes on.
+                found = False
+                line = result(name, found, None, str(error) or type(error).__name__)
+            all_found &= found
+            output.write(f"{line}\n")
+            output.flush()
+
+    open_client(settings)
+    try:
+        await gather(*(worker() for _ in range(max(1, jobs))))
+    finally:
+        await close_client()
+    return all_found
+
+
+##############################################################################
+def run_headless(
+    packages: list[str],
+    from_file: Path | None,
+    jobs: int,
+    settings: ClientSettings,
+) -> int:
+    """Run a headless batch lookup.
+
+    Args:
+        packages: The names of the packages given on the command line.
+        from_file: An optional requirements file to read names from.
+        jobs: The number of lookups to run at once.
+        settings: The settings for the HTTP client.
+
+    Returns:
+        The exit code; `0` if every package was found, `1` if not.
+
+    Note:
+        If no names are given at all, they are read from standard input.
+    """
+    names = list(names_from(packages))
+    if from_file is not None:
+        names += names_from_file(from_file)
+    if not packages and from_file is None:
+        names += names_from(sys.stdin)
+    return 0 if run(lookup(names, sys.stdout, jobs, settings)) else 1
+
+
+##############################################################################
+def run_populate(from_file: Path, jobs: int, settings: ClientSettings) -> int:
+    """Look up packages only to add them to the local store.
+
+    Args:
+        from_file: A requirements file to read names from, or `-` to read
+            them from standard input.
+        jobs: The number of lookups to run at once.
+        settings: The settings for the HTTP client.
+
+    Returns:
+        The exit code; `0` if every package was found, `1` if not.
+    """
+    from .data import package_store
+
+    names = list(
+        names_from(sys.stdin) if str(from_file) == "-" else names_from_file(from_file)
+    )
+    with open(devnull, "w") as output:
+        found = run(lookup(names, output, jobs, settings))
+    print(
+        f"Looked up {len(names):,} packages; {len(package_store()):,} are now "
+        f"in {package_store().location}",
+        file=sys.stderr,
+    )
+    return 0 if found else 1
+
+
+##############################################################################
+def details_of(package: Package) -> list[tuple[str, str]]:
+    """Get the details of a package, as shown in the "Details" pane.
+
+    Args:
+        package: The package.
+
+    Returns:
+        The title and value of each detail that has a value.
+    """
+    return [
+        (title, value)
+        for title, value in (
+            ("Name", package.name),
+            ("Version", package.version),
+            ("Summary", package.summary),
+            ("URL", package.package_url),
+            ("Author", package.author),
+            ("Email", package.author_email),
+            ("Bug Track URL", package.bugtrack_url),
+            ("Classifiers", "\n".join(package.classifiers)),
+            ("Documentation URL", package.docs_url),
+            ("Download URL", package.download_url),
+            ("Homepage", package.homepage),
+            ("Keywords", ", ".join(package.keywords)),
+            ("License", package.license),
+            ("Maintainer", package.maintainer),
+            ("Email", package.maintainer_email),
+            ("Platform", package.platform),
+            ("Project URL", package.project_url),
+            *package.project_urls.items(),
+            ("Release URL", package.release_url),
+            ("Requires", ", ".join(package.dependencies)),
+            ("Yanked", "Yes" if package.yanked else "No"),
+            ("Yanked Reason", package.yanked_reason),
+        )
+        if value
+    ]
+
+
+##############################################################################
+def write_plain(package: Package, output: TextIO) -> None:
+    """Write out a package as plain text.
+
+    Args:
+        package: The package.
+        output: The stream to write to.
+    """
+    for title, value in details_of(package):
+        value = value.replace("\n", "\n    ")
+        output.write(f"{title}: {value}\n")
+    if package.urls:
+        output.write(f"\nFiles ({len(package.urls)}):\n")
+        for url in package.urls:
+            output.write(
+                f"    {url.filename}\t{url.packagetype}\t{url.python_version}\t"
+                f"{url.size}\t{url.upload_time_iso_8601[:16].replace('T', ' ')}\n"
+            )
+    if package.description.strip():
+        output.write(f"\n{package.description.strip()}\n")
+
+
+##############################################################################
+def print_rich(package: Package, console: "Console") -> None:
+    """Print a package with Rich.
+
+    Args:
+        package: The package.
+        console: The console to print to.
+    """
+    from rich.markdown import Markdown
+    from rich.table import Table
+    from rich.text import Text
+
+    from .data.description import is_markup, prepare
+
+    details = Table.grid(padding=(0, 1))
+    details.add_column(style="bold", no_wrap=True)
+    details.add_column()
+    for title, value in details_of(package):
+        details.add_row(f"{title}:", Text(value))
+    console.print(details)
+
+    if package.urls:
+        files = Table(title=f"Files ({len(package.urls)})", title_justify="left")
+        for column in ("Filename", "Type", "Python", "Size", "Uploaded"):
+            files.add_column(column, justify="right" if column == "Size" else "left")
+        for url in package.urls:
+            files.add_row(
+                url.filename,
+                url.packagetype,
+                url.python_version,
+                f"{url.size:,}",
+                url.upload_time_iso_8601[:16].replace("T", " "),
+            )
+        console.print(files)
+
+    if package.description.strip():
+        console.rule()
+        console.print(
+            Markdown("\n\n".join(prepare(package)))
+            if is_markup(package)
+            else Text(package.description)
+        )
+
+
+##############################################################################
+def run_print(spec: str, settings: ClientSettings) -> int:
+    """Look up a package and print it, without the UI.
+
+    Args:
+        spec: The package to look up, as `name` or `name@version`.
+        settings: The settings for the HTTP client.
+
+    Returns:
+        The exit code; `0` if the package was found, `1` if not.
+
+    Note:
+        The package is printed with Rich when writing to a terminal (or if
+        `FORCE_COLOR` is set), and as plain text otherwise; in that case
+        Rich isn't even imported.
+    """
+    name, version = split_spec(spec)
+
+    async def run_it() -> tuple[bool, Package]:
+        open_client(settings)
+        try:
+            return await Package.from_pypi(name, version)
+        finally:
+            await close_client()
+
+    try:
+        found, package = run(run_it())
+    except httpx.HTTPError as error:
+        print(f"pispy: {str(error) or type(error).__name__}", file=sys.stderr)
+        return 1
+    if not found:
+        print(f"pispy: {spec} was not found", file=sys.stderr)
+        return 1
+    try:
+        if sys.stdout.isatty() or environ.get("FORCE_COLOR"):
+            from rich.console import Console
+
+            print_rich(package, Console())
+        else:
+            write_plain(package, sys.stdout)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # Whatever we were writing to has stopped reading, as `head` and
+        # pagers do; that's fine, but Python shouldn't complain about it
+        # when it flushes standard output on the way out.
+        dup2(open_fd(devnull, O_WRONLY), sys.stdout.fileno())
+    return 0
+
+
+##############################################################################
+async def download(
+    name: str, version: str, select: str, destination: Path, connections: int
+) -> Path:
+    """Download a file of a package, reporting progress as it goes.
+
+    Args:
+        name: The name of the package.
+        version: The version of the package, or an empty string for the
+            latest version.
+        select: Text to select the file to download with.
+        destination: The directory to download the file to.
+        connections: The number of chunks to download at once.
+
+    Returns:
+        The path to the downloaded file.
+
+    Raises:
+        DownloadError: If there was no file to download, or the download
+            failed.
+    """
+    from .data import Download, DownloadError, best_file, list_files
+
+    found, package = await Package.from_pypi(name, version)
+    if not found:
+        raise DownloadError(f"{name} {version}".strip() + " was not found")
+    files = await list_files(package.name, package.version, package.urls)
+    if (package_url := best_file(files, select)) is None:
+        raise DownloadError(
+            f"{package.name} {package.version} has no file that matches {select!r}"
+            if select
+            else f"{package.name} {package.version} has no files"
+        )
+    job = Download(package_url, destination, connections)
+    print(f"Downloading {package_url.filename}", file=sys.stderr)
+
+    async def report() -> None:
+        while True:
+            print(f"\r{job.status}  ", end="", file=sys.stderr, flush=True)
+            await sleep(0.5)
+
+    reporter = create_task(report())
+    try:
+        return await job.run()
+    finally:
+        reporter.cancel()
+        print(f"\r{job.status}  ", file=sys.stderr)
+
+
+##############################################################################
+def run_download(
+    spec: str,
+    select: str,
+    destination: Path,
+    connections: int,
+    settings: ClientSettings,
+) -> int:
+    """Download a file of a package, without the UI.
+
+    Args:
+        spec: The package to download from, optionally pinned to a version
+            with `==`.
+        select: Text to select the file to download with.
+        destination: The directory to download the file to.
+        connections: The number of chunks to download at once.
+        settings: The settings for the HTTP client.
+
+    Returns:
+        The exit code; `0` if the file was downloaded and its digest
+        checked out, `1` if not.
+    """
+    from .data import DownloadError
+
+    try:
+        requirement = Requirement(spec)
+    except InvalidRequirement as error:
+        print(f"pispy download: {error}", file=sys.stderr)
+        return 1
+    versions = [
+        specifier.version
+        for specifier in requirement.specifier
+        if specifier.operator in ("==", "===")
+    ]
+    if len(versions) != len(requirement.specifier) or len(versions) > 1:
+        print(
+            "pispy download: only an exact (==) version can be given", file=sys.stderr
+        )
+        return 1
+
+    async def run_it() -> Path:
+        open_client(settings)
+        try:
+            return await download(
+                requirement.name,
+                versions[0] if versions else "",
+                select,
+                destination,
+                connections,
+            )
+        finally:
+            await close_client()
+
+    try:
+        target = run(run_it())
+    except (DownloadError, httpx.HTTPError) as error:
+        print(f"pispy download: {str(error) or type(error).__name__}", file=sys.stderr)
+        return 1
+    print(target)
+    return 0
+
+
+##############################################################################
+def audit_table(results: list["AuditResult"]) -> "Table":
+    """Make a table of the results of an audit.
+
+    Args:
+        results: The results of the audit.
+
+    Returns:
+        A Rich table of the results.
+    """
+    from rich.table import Table
+    from rich.text import Text
+
+    table = Table(title=f"Audit against Python {python_version()}")
+    for column in ("Package", "Pinned", "Latest", "Requires Python", "Wheels"):
+        table.add_column(column, justify="right" if column == "Wheels" else "left")
+    table.add_column("Problems", style="red")
+    for audited in results:
+        table.add_row(
+            audited.name,
+            audited.pinned or Text("unpinned", style="dim"),
+            Text(audited.latest, style="yellow" if audited.outdated else ""),
+            Text(
+                audited.requires_python,
+                style="" if audited.python_supported else "red",
+            ),
+            str(audited.wheels) if audited.release_found else "",
+            "; ".join(audited.problems),
+        )
+    return table
+
+
+##############################################################################
+def run_audit(file: Path, jobs: int, as_json: bool, settings: ClientSettings) -> int:
+    """Audit the packages pinned by a requirements or lock file.
+
+    Args:
+        file: The requirements or lock file.
+        jobs: The number of packages to check at once.
+        as_json: Should the report be written as JSON, rather than a table?
+        settings: The settings for the HTTP client.
+
+    Returns:
+        The exit code; `0` if no problems were found, `1` if there were
+        problems (a newer release isn't counted as a problem).
+    """
+    from .data import AuditResult, audit_pins, pins_from_file
+
+    try:
+        pins = pins_from_file(file)
+    except (OSError, ValueError) as error:
+        print(f"pispy audit: {error}", file=sys.stderr)
+        return 1
+
+    async def run_it() -> list[AuditResult]:
+        open_client(settings)
+        try:
+            return await audit_pins(pins, jobs)
+        finally:
+            await close_client()
+
+    started = perf_counter()
+    results = run(run_it())
+    elapsed = perf_counter() - started
+    if as_json:
+        print(
+            dumps(
+                {
+                    "file": str(file),
+                    "python": python_version(),
+                    "results": [audited.as_dict() for audited in results],
+                },
+                indent=2,
+            )
+        )
+    else:
+        from rich.console import Console
+
+        Console().print(audit_table(results))
+    problems = sum(1 for audited in results if audited.problems)
+    print(
+        f"Audited {len(results):,} packages in {elapsed:.1f}s: "
+        f"{sum(1 for audited in results if audited.outdated):,} have newer releases, "
+        f"{problems:,} have problems",
+        file=sys.stderr,
+    )
+    return 1 if problems else 0
+
+
+### headless.py ends here
@@ -0,0 +1,86 @@
+"""Provides the navigation history for the application."""
+
+##############################################################################
+# Python imports.
+from typing import NamedTuple
+
+
+##############################################################################
+class Location(NamedTuple):
+    """A location in the navigation history."""
+
+    package: str
+    """The name of the package that was being viewed."""
+
+    tab: str = ""
+    """The ID of the tab that was being viewed, if known."""
+
+
+##############################################################################
+class History:
+    """A bounded back/forward navigation history."""
+
+    def __init__(self, max_length: int = 500) -> None:
+        """Initialise the history.
+
+        Args:
+            max_length: The maximum number of locations to remember.
+        """
+        self._max_length = max_length
+        self._locations: list[Location] = []
+        self._current = -1
+
+    @property
+    def current(self) -> Location | None:
+        """The current location, if there is one."""
+        return self._locations[self._current] if self._locations else None
+
+    def visit(self, location: Location) -> None:
+        """Visit a new location.
+
+        Args:
+            location: The location being visited.
+
+        Note:
+            Visiting a new location drops any forward history.
+        """
+        if location.package == getattr(self.current, "package", None):
+            return
+        del self._locations[self._current + 1 :]
+        self._locations.append(location)
+        del self._locations[: -self._max_length]
+        self._current = len(self._locations) - 1
+
+    def remember_tab(self, tab: str) -> None:
+        """Remember the tab being viewed at the current location.
+
+        Args:
+            tab: The ID of the tab being viewed.
+        """
+        if (current := self.current) is not None:
+            self._locations[self._current] = current._replace(tab=tab)
+
+    def back(self) -> Location | None:
+        """Move back in the history.
+
+        Returns:
+            The location moved to, or `None` if there is nowhere to go.
+        """
+        if self._current > 0:
+            self._current -= 1
+            return self.current
+        return None
+
+    def forward(self) -> Location | None:
+        """Move forward in the history.
+
+        Returns:
+            The location moved to, or `None` if there is nowhere to go.
+        """
+        if self._current < len(self._locations) - 1:
+            self._current += 1
+            return self.current
+        return None
+
+
+### history.py ends here
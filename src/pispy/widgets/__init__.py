@@ -1,11 +1,57 @@
 """Widgets used in the application."""
 
 ##############################################################################
-# Local imports.
-from .package_information import PackageInformation
+# Python imports.
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+##############################################################################
+# Type checking imports.
+if TYPE_CHECKING:
+    from .package_information import PackageInformation
+    from .package_name import NameSuggestions, PackageNameInput
+    from .package_search import SearchResults
+    from .performance import PerformancePanel
+
+##############################################################################
+# The module that provides each widget. These are imported on first use, so
+# that importing one widget doesn't import them all.
+_EXPORTS = {
+    "NameSuggestions": "package_name",
+    "PackageInformation": "package_information",
+    "PackageNameInput": "package_name",
+    "PerformancePanel": "performance",
+    "SearchResults": "package_search",
+}
 
 ##############################################################################
 # Export widgets.
-__all__ = ["PackageInformation"]
+__all__ = [
+    "NameSuggestions",
+    "PackageInformation",
+    "PackageNameInput",
+    "PerformancePanel",
+    "SearchResults",
+]
+
+
+##############################################################################
+def __getattr__(name: str) -> Any:
+    """Import a widget on first use.
+
+    Args:
+        name: The name of the widget.
+
+    Returns:
+        The widget.
+
+    Raises:
+        AttributeError: If the name isn't exported from this package.
+    """
+    if (module := _EXPORTS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = export = getattr(import_module(f".{module}", __name__), name)
+    return export
+
 
 ### __init__.py ends here
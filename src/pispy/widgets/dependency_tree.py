@@ -0,0 +1,163 @@
+"""A pane for exploring the dependency tree of a PyPI package."""
+
+##############################################################################
+# Packaging imports.
+from packaging.requirements import Requirement
+from packaging.utils import NormalizedName, canonicalize_name
+
+##############################################################################
+# Rich imports.
+from rich.text import Text
+
+##############################################################################
+# Textual imports.
+from textual import work
+from textual.app import ComposeResult
+from textual.widgets import TabPane, Tree
+from textual.widgets.tree import TreeNode
+
+##############################################################################
+# Local imports.
+from ..data import Package
+from ..data.dependencies import resolve
+
+
+##############################################################################
+def requirement_label(
+    requirement: Requirement, version: str = "", note: str = ""
+) -> Text:
+    """Create the label for a requirement in the dependency tree.
+
+    Args:
+        requirement: The requirement to create the label for.
+        version: The version of the package that was found, if known.
+        note: Any note to add to the label.
+
+    Returns:
+        The label for the requirement.
+    """
+    return Text.assemble(
+        (requirement.name, "bold"),
+        f"[{','.join(sorted(requirement.extras))}]" if requirement.extras else "",
+        f" {requirement.specifier}" if requirement.specifier else "",
+        (f" {version}", "dim") if version else "",
+        (f" {note}", "italic") if note else "",
+    )
+
+
+##############################################################################
+def ancestors(node: TreeNode[NormalizedName]) -> set[NormalizedName]:
+    """Get the names of the given node and all of its ancestors.
+
+    Args:
+        node: The node to start from.
+
+    Returns:
+        The names of the node and its ancestors.
+    """
+    names: set[NormalizedName] = set()
+    current: TreeNode[NormalizedName] | None = node
+    while current is not None:
+        if current.data is not None:
+            names.add(current.data)
+        current = current.parent
+    return names
+
+
+##############################################################################
+class PackageDependencies(TabPane):
+    """A tab pane that shows the dependency tree of a package."""
+
+    BINDINGS = [("m", "toggle_markers", "Toggle markers")]
+
+    def __init__(self, package: Package) -> None:
+        """Initialise the dependency tree pane.
+
+        Args:
+            package: The package to show the dependency tree for.
+        """
+        super().__init__("Dependency Tree", id="dependencies")
+        self._package = package
+        self._evaluate_markers = True
+        self._resolving = False
+
+    def compose(self) -> ComposeResult:
+        """Compose the dependency tree display.
+
+        Returns:
+            The dependency tree layout.
+        """
+        yield Tree[NormalizedName](self._package.name)
+
+    def on_show(self) -> None:
+        """Start resolving the tree the first time it is shown."""
+        if not self._resolving:
+            self._resolving = True
+            self._resolve()
+
+    def action_toggle_markers(self) -> None:
+        """Toggle the evaluation of environment markers, and re-resolve."""
+        self._evaluate_markers = not self._evaluate_markers
+        self._resolve()
+
+    @work(exclusive=True)
+    async def _resolve(self) -> None:
+        """Resolve the dependency tree, filling it in as results arrive."""
+
+        tree = self.query_one(Tree[NormalizedName])
+        tree.clear()
+        tree.root.data = canonicalize_name(self._package.name)
+        tree.root.expand()
+
+        # The node where each package's dependencies are shown, along with
+        # the requirement that caused it to be added to the tree.
+        primaries: dict[NormalizedName, TreeNode[NormalizedName]] = {
+            tree.root.data: tree.root
+        }
+        wanted: dict[NormalizedName, Requirement] = {}
+
+        resolved: set[NormalizedName] = set()
+        markers = "markers evaluated" if self._evaluate_markers else "all requirements"
+        async for resolution in resolve(
+            self._package, evaluate_markers=self._evaluate_markers
+        ):
+            node = primaries[resolution.name]
+            requirement = wanted.get(resolution.name)
+
+            # Update the label of the package's node to show what we found.
+            if resolution.package is None:
+                node.allow_expand = False
+                if requirement is not None:
+                    node.set_label(requirement_label(requirement, note="(not found)"))
+                continue
+            resolved.add(resolution.name)
+            if requirement is not None:
+                node.set_label(
+                    requirement_label(requirement, resolution.package.version)
+                )
+
+            # Add the package's requirements to the tree.
+            lineage = ancestors(node)
+            for child in resolution.requirements:
+                name = canonicalize_name(child.name)
+                if name in lineage:
+                    node.add_leaf(requirement_label(child, note="(cycle)"), name)
+                elif name in primaries:
+                    node.add_leaf(requirement_label(child, note="(see above)"), name)
+                else:
+                    wanted[name] = child
+                    primaries[name] = node.add(
+                        requirement_label(child, note="..."), name
+                    )
+            node.allow_expand = bool(node.children)
+
+            tree.root.set_label(
+                Text.assemble(
+                    (self._package.name, "bold"),
+                    f" {self._package.version}",
+                    (f" ({len(resolved)} packages, {markers})", "dim"),
+                )
+            )
+
+
+### dependency_tree.py ends here
@@ -2,24 +2,45 @@
 
 ##############################################################################
 # Python imports.
-from functools import singledispatch
-from typing import Any, Callable, Iterator
+from asyncio import gather, sleep, to_thread
+from functools import partial, singledispatch
+from typing import Any, Callable, Iterable, Iterator, MutableMapping
 from urllib.parse import urlparse
 from webbrowser import open as visit_url
 
 ##############################################################################
-# Packing imports.
-from packaging.requirements import Requirement
+# httpx imports.
+import httpx
+
+##############################################################################
+# Markdown imports.
+from markdown_it import MarkdownIt
+from markdown_it.token import Token
+
+##############################################################################
+# Platform directory imports.
+from platformdirs import user_downloads_path
+
+##############################################################################
+# Rich imports.
+from rich.text import Text
 
 ##############################################################################
 # Textual imports.
 from textual import on, work
 from textual.app import ComposeResult
-from textual.containers import VerticalScroll
+from textual.containers import Horizontal, Vertical, VerticalScroll
 from textual.css.query import NoMatches
 from textual.message import Message
 from textual.widget import Widget
-from textual.widgets import Label, Markdown, TabbedContent, TabPane, Tabs
+from textual.widgets import (
+    DataTable,
+    Label,
+    Markdown,
+    TabbedContent,
+    TabPane,
+    Tabs,
+)
 
 ##############################################################################
 # Backward compatible typing.
@@ -27,7 +48,28 @@ from typing_extensions import Self
 
 ##############################################################################
 # Local imports.
-from ..data import Package, PackageURL
+from ..data import (
+    Comparison,
+    Difference,
+    Download,
+    DownloadError,
+    Package,
+    PackageURL,
+    WheelContents,
+    WheelError,
+    compare_packages,
+    inspect_wheel,
+    list_files,
+    names,
+    normalise,
+    prefetch,
+    prefetch_candidates,
+    split_spec,
+    tracer,
+)
+from ..data.description import PARSER, is_markup, parse
+from .dependency_tree import PackageDependencies
+from .releases import PackageReleases
 
 
 ##############################################################################
@@ -179,38 +221,393 @@ class TabContent(VerticalScroll):
 
 
 ##############################################################################
-class PackageURLDetails(TabPane):
-    """Tab pane for showing details of a package URL."""
+def url_details(package_url: PackageURL) -> Iterator[Widget]:
+    """Generate the widgets needed to show the details of a package URL.
+
+    Args:
+        package_url: The package URL to show.
+
+    Yields:
+        The widgets required to show the package URL.
+    """
+    yield from widgets_for(
+        ("Filename", package_url.filename, Value),
+        ("URL", package_url.url, URL),
+        ("Package Type", package_url.packagetype, Value),
+        ("Python Version", package_url.python_version, Value),
+        ("Wheel Tag", package_url.tag, Value),
+        ("Compatible", "Yes" if package_url.compatible else "No", Value),
+        ("Size", f"{package_url.size:,}", Value),
+        ("MD5 Digest", package_url.md5_digest, Value),
+        ("Uploaded", package_url.upload_time_iso_8601, Value),
+        ("Has Signature", "Yes" if package_url.has_sig else "No", Value),
+        ("Core Metadata", "Yes" if package_url.core_metadata else "No", Value),
+        ("Comments", package_url.comment_text, Value),
+        *((name, value, Value) for name, value in package_url.digests.items()),
+        ("Yanked", "Yes" if package_url.yanked else "No", Value),
+        ("Yanked Reason", package_url.yanked_reason, Value),
+    )
+
+
+##############################################################################
+def plain(text: str) -> Value:
+    """Make a value that shows text as it is, without any markup.
 
-    def __init__(self, package_url: PackageURL) -> None:
-        """Initialise the object.
+    Args:
+        text: The text.
+
+    Returns:
+        The value.
+    """
+    return Value(Text(text))
+
+
+##############################################################################
+def wheel_details(contents: WheelContents) -> Iterator[Widget]:
+    """Generate the widgets needed to show the contents of a wheel.
+
+    Args:
+        contents: The contents of the wheel.
+
+    Yields:
+        The widgets required to show the contents of the wheel.
+    """
+    yield from widgets_for(
+        (
+            "Inspection",
+            ""
+            if contents.complete
+            else "Only the core metadata is available; the server that holds "
+            "the wheel doesn't support range requests",
+            Value,
+        ),
+        (
+            "Entry Points",
+            "\n".join(
+                f"{group}: {name} = {value}"
+                for group, entry_points in contents.entry_points.items()
+                for name, value in entry_points.items()
+            ),
+            plain,
+        ),
+        (
+            f"Files ({len(contents.files):,})",
+            "\n".join(f"{size:>12,}  {name}" for name, size in contents.files),
+            plain,
+        ),
+        ("Metadata", contents.metadata.strip(), plain),
+    )
+
+
+##############################################################################
+class FileDetails(TabContent):
+    """A display of the details of a single file of a package."""
+
+    async def show(self, package_url: PackageURL) -> None:
+        """Show the details of the given file.
 
         Args:
-            package_url: The package URL to show.
+            package_url: The package URL for the file.
         """
-        super().__init__(package_url.filename)
-        self._url = package_url
+        self.workers.cancel_group(self, "inspect")
+        self.loading = False
+        async with self.batch():
+            await self.remove_children()
+            await self.mount_all(url_details(package_url))
+        self.scroll_home(animate=False)
+
+    @work(group="inspect", exclusive=True)
+    async def inspect(self, package_url: PackageURL) -> None:
+        """Show what is inside the given wheel, under its details.
+
+        Args:
+            package_url: The package URL for the wheel.
+        """
+        if self.query(".wheel"):
+            return
+        self.loading = True
+        try:
+            contents = await inspect_wheel(package_url)
+        except WheelError as error:
+            self.notify(str(error), title="Inspect", severity="error")
+            return
+        finally:
+            self.loading = False
+        widgets = list(wheel_details(contents))
+        for widget in widgets:
+            widget.add_class("wheel")
+        await self.mount_all(widgets)
+        self.scroll_to_widget(widgets[0], top=True)
+
+
+##############################################################################
+class PackageFiles(TabPane):
+    """Tab pane for showing the files of a package."""
+
+    DEFAULT_CSS = """
+    PackageFiles {
+        #filter {
+            width: 1fr;
+            padding: 0 1;
+            color: $text-muted;
+        }
+        #download {
+            display: none;
+            width: 1fr;
+            padding: 0 1;
+            color: $text-accent;
+        }
+        DataTable {
+            height: 1fr;
+        }
+        FileDetails {
+            height: 1fr;
+            border-top: solid $foreground 20%;
+        }
+    }
+    """
+
+    BINDINGS = [
+        ("c", "toggle_compatible", "Compatible only"),
+        ("i", "inspect", "Inspect wheel"),
+        ("d", "download", "Download"),
+    ]
+
+    COLUMNS = (
+        ("Filename", "filename"),
+        ("Type", "packagetype"),
+        ("Python", "python_version"),
+        ("Tag", "tag"),
+        ("Size", "size"),
+        ("Uploaded", "upload_time_iso_8601"),
+    )
+    """The columns of the file table, and the attribute shown in each."""
+
+    def __init__(self, package: Package) -> None:
+        """Initialise the files pane.
+
+        Args:
+            package: The package to show the files of.
+        """
+        super().__init__(f"Files ({len(package.urls)})", id="files")
+        self._package = package
+        self._urls = package.urls
+        self._listed = False
+        self._compatible_only = False
+        self._sort_by = ""
+        self._reverse = False
+        self._download: Download | None = None
 
     def compose(self) -> ComposeResult:
-        """Compose the package URL display.
+        """Compose the files display.
 
         Returns:
-            The package URL data layout.
+            The files layout.
         """
-        with TabContent():
-            yield from widgets_for(
-                ("URL", self._url.url, URL),
-                ("Package Type", self._url.packagetype, Value),
-                ("Python Version", self._url.python_version, Value),
-                ("Size", f"{self._url.size:,}", Value),
-                ("MD5 Digest", self._url.md5_digest, Value),
-                ("Uploaded", self._url.upload_time_iso_8601, Value),
-                ("Has Signature", "Yes" if self._url.has_sig else "No", Value),
-                ("Comments", self._url.comment_text, Value),
-                *((name, value, Value) for name, value in self._url.digests.items()),
-                ("Yanked", "Yes" if self._url.yanked else "No", Value),
-                ("Yanked Reason", self._url.yanked_reason, Value),
+        yield Label(id="filter")
+        yield Label(id="download")
+        yield DataTable[str | Text](cursor_type="row", zebra_stripes=True)
+        yield FileDetails()
+
+    def on_mount(self) -> None:
+        """Populate the table once the pane is mounted."""
+        table = self.query_one(DataTable)
+        for title, attribute in self.COLUMNS:
+            table.add_column(title, key=attribute)
+        self._populate()
+
+    def on_show(self) -> None:
+        """List the files from the preferred source the first time they are shown."""
+        if not self._listed:
+            self._listed = True
+            self._list_files()
+
+    @work(exclusive=True)
+    async def _list_files(self) -> None:
+        """List the files of the package, and show them if they differ."""
+        try:
+            urls = await list_files(
+                self._package.name, self._package.version, self._urls
+            )
+        except (httpx.HTTPError, ValueError) as error:
+            self.notify(str(error), title="Files", severity="error")
+            return
+        if urls != self._urls:
+            self._urls = urls
+            for ancestor in self.ancestors:
+                if isinstance(ancestor, TabbedContent):
+                    ancestor.get_tab(self).label = f"Files ({len(urls)})"
+                    break
+            self._populate()
+
+    def _populate(self) -> None:
+        """Populate the file table, honouring the current filter and sort."""
+        files = [
+            (number, url)
+            for number, url in enumerate(self._urls)
+            if url.compatible or not self._compatible_only
+        ]
+        if self._sort_by:
+            files.sort(key=lambda file: getattr(file[1], self._sort_by))
+            if self._reverse:
+                files.reverse()
+        table = self.query_one(DataTable)
+        table.clear()
+        for number, url in files:
+            table.add_row(
+                url.filename,
+                url.packagetype,
+                url.python_version,
+                url.tag,
+                Text(f"{url.size:,}", justify="right"),
+                url.upload_time_iso_8601[:16].replace("T", " "),
+                key=str(number),
+            )
+        self.query_one("#filter", Label).update(
+            f"{len(files)} of {len(self._urls)} files"
+            f"{' compatible with this Python' if self._compatible_only else ''}"
+            " - [b]c[/] toggles showing only compatible files,"
+            " [b]i[/] inspects the highlighted wheel,"
+            " [b]d[/] downloads the highlighted file"
+        )
+
+    def action_toggle_compatible(self) -> None:
+        """Toggle showing only the files compatible with this Python."""
+        self._compatible_only = not self._compatible_only
+        self._populate()
+
+    @on(DataTable.HeaderSelected)
+    def sort_files(self, event: DataTable.HeaderSelected) -> None:
+        """Sort the files by the selected column.
+
+        Args:
+            event: The header selection event.
+
+        Note:
+            Selecting the same column again reverses the sort.
+        """
+        column = str(event.column_key.value)
+        self._reverse = column == self._sort_by and not self._reverse
+        self._sort_by = column
+        self._populate()
+
+    @on(DataTable.RowSelected)
+    def inspect_file(self) -> None:
+        """Inspect the contents of the selected file."""
+        self.action_inspect()
+
+    @property
+    def _highlighted(self) -> PackageURL | None:
+        """The file that is highlighted in the table, if there is one."""
+        table = self.query_one(DataTable)
+        if not table.row_count:
+            return None
+        row = table.coordinate_to_cell_key(table.cursor_coordinate).row_key.value
+        return None if row is None else self._urls[int(row)]
+
+    def action_inspect(self) -> None:
+        """Inspect the contents of the highlighted file, if it's a wheel."""
+        if (package_url := self._highlighted) is None:
+            return
+        if package_url.is_wheel:
+            self.query_one(FileDetails).inspect(package_url)
+        else:
+            self.notify("Only wheels can be inspected", title="Inspect")
+
+    def action_download(self) -> None:
+        """Download the highlighted file."""
+        if (package_url := self._highlighted) is None:
+            return
+        if self._download is not None:
+            self.notify(
+                f"{self._download.package_url.filename} is still downloading",
+                title="Download",
+                severity="warning",
+            )
+            return
+        self._download = Download(package_url, user_downloads_path())
+        self._download_file(self._download)
+
+    def _show_download(self) -> None:
+        """Show how far the current download has got."""
+        if self._download is not None:
+            self.query_one("#download", Label).update(
+                f"Downloading {self._download.package_url.filename}: "
+                f"{self._download.status}"
+            )
+
+    @work(group="download")
+    async def _download_file(self, download: Download) -> None:
+        """Download a file, showing its progress as it goes.
+
+        Args:
+            download: The download to run.
+        """
+        status = self.query_one("#download", Label)
+        status.display = True
+        self._show_download()
+        progress = self.set_interval(0.5, self._show_download)
+        try:
+            target = await download.run()
+        except (DownloadError, httpx.HTTPError) as error:
+            self.notify(
+                str(error) or type(error).__name__,
+                title=f"Failed to download {download.package_url.filename}",
+                severity="error",
+                timeout=8,
             )
+        else:
+            self.notify(
+                f"Downloaded to {target} ({download.rate / 1_000_000:.1f} MB/s)",
+                title="Download complete",
+            )
+        finally:
+            progress.stop()
+            status.display = False
+            self._download = None
+
+    @on(DataTable.RowHighlighted)
+    async def show_file(self, event: DataTable.RowHighlighted) -> None:
+        """Show the details of the highlighted file.
+
+        Args:
+            event: The row highlight event.
+        """
+        if event.row_key.value is not None:
+            await self.query_one(FileDetails).show(self._urls[int(event.row_key.value)])
+
+
+##############################################################################
+class _Parsed(MarkdownIt):
+    """A Markdown parser that hands back tokens that were parsed earlier.
+
+    This lets the parsing of a description happen in a thread, leaving
+    the `Markdown` widget only the widgets to build on the event loop.
+    """
+
+    def __init__(self, tokens: list[Token]) -> None:
+        """Initialise the parser.
+
+        Args:
+            tokens: The tokens to hand back.
+        """
+        super().__init__(PARSER)
+        self._tokens = tokens
+
+    def parse(
+        self, src: str, env: MutableMapping[str, Any] | None = None
+    ) -> list[Token]:
+        """Hand back the tokens that were parsed earlier.
+
+        Args:
+            src: The Markdown that would be parsed; it's ignored.
+            env: The environment for the parse; it's ignored.
+
+        Returns:
+            The tokens.
+        """
+        del src, env
+        return self._tokens
 
 
 ##############################################################################
@@ -219,16 +616,40 @@ class PackageDescription(TabPane):
 
     def __init__(self, package: Package):
         """Initialise the package description pane."""
-        super().__init__("Description")
+        super().__init__("Description", id="description")
         self._package = package
+        self._rendered = False
 
     def compose(self) -> ComposeResult:
-        with TabContent():
-            yield (
-                Markdown
-                if self._package.description_content_type == "text/markdown"
-                else Value
-            )(self._package.description, id="description")
+        yield TabContent()
+
+    def on_show(self) -> None:
+        """Render the description the first time it is shown."""
+        if not self._rendered:
+            self._rendered = True
+            self._render_description()
+
+    @work(exclusive=True)
+    async def _render_description(self) -> None:
+        """Render the description.
+
+        Descriptions in a markup language are prepared and parsed in a
+        thread, and then rendered a chunk at a time, so that the start of
+        even a very long description can be seen right away.
+        """
+        content = self.query_one(TabContent)
+        if not is_markup(self._package):
+            await content.mount(Value(self._package.description))
+            return
+        content.loading = True
+        with tracer().span("description.prepare", "ui", package=self._package.name):
+            chunks = await to_thread(parse, self._package)
+        content.loading = False
+        for chunk, tokens in chunks:
+            await content.mount(
+                Markdown(chunk, parser_factory=partial(_Parsed, tokens))
+            )
+            await sleep(0)
 
     @on(Markdown.LinkClicked)
     def maybe_handle_url(self, event: Markdown.LinkClicked) -> None:
@@ -260,13 +681,24 @@ class PackageUnknown(TabPane):
     }
     """
 
-    def __init__(self, package_name: str):
-        """Initialise the package unknown pane."""
-        super().__init__("[red]Unknown[/]")
+    def __init__(self, package_name: str, suggestions: list[str] | None = None):
+        """Initialise the package unknown pane.
+
+        Args:
+            package_name: The name of the package that was unknown.
+            suggestions: The names of packages the user might have meant.
+        """
+        super().__init__("[red]Unknown[/]", id="unknown")
         self._package_name = package_name
+        self._suggestions = suggestions or []
 
     def compose(self) -> ComposeResult:
-        yield Label(f"Package '{self._package_name}' is not available on PyPI")
+        message = f"Package '{self._package_name}' is not available on PyPI"
+        if self._suggestions:
+            message += "\n\nDid you mean: " + ", ".join(
+                f"[@click=app.lookup('{name}')]{name}[/]" for name in self._suggestions
+            )
+        yield Label(message)
 
 
 ##############################################################################
@@ -275,7 +707,7 @@ class PackageDetails(TabPane):
 
     def __init__(self, package: Package):
         """Initialise the package details pane."""
-        super().__init__("Details")
+        super().__init__("Details", id="details")
         self._package = package
 
     def compose(self) -> ComposeResult:
@@ -311,15 +743,8 @@ class PackageDetails(TabPane):
                 (
                     "Requires",
                     ", ".join(
-                        sorted(
-                            set(
-                                f"[@click=app.lookup('{pkg.name}')]{pkg.name}[/]"
-                                for pkg in (
-                                    Requirement(requirement)
-                                    for requirement in self._package.requires_dist
-                                )
-                            )
-                        )
+                        f"[@click=app.lookup('{name}')]{name}[/]"
+                        for name in self._package.dependencies
                     ),
                     Value,
                 ),
@@ -328,6 +753,154 @@ class PackageDetails(TabPane):
             )
 
 
+##############################################################################
+_MARKS = {"same": " ", "added": "+", "removed": "-", "changed": "~"}
+"""The mark shown against each kind of difference in a list."""
+
+_STYLES = {"same": "", "added": "green", "removed": "red", "changed": "yellow"}
+"""The style of each kind of difference in a list."""
+
+
+##############################################################################
+def marked_lines(differences: Iterable[Difference], side: str) -> Text:
+    """Make a list of the values on one side of some differences.
+
+    Args:
+        differences: The differences.
+        side: The side to list, either `old` or `new`.
+
+    Returns:
+        The values on that side, each marked with how it differs. Where a
+        value is only on the other side, a blank line is left in its place,
+        so that the two sides line up.
+    """
+    lines = Text()
+    for difference in differences:
+        if line := getattr(difference, side):
+            kind = difference.kind
+            lines.append(f"{_MARKS[kind]} {line}", style=_STYLES[kind])
+        lines.append("\n")
+    lines.rstrip()
+    return lines
+
+
+##############################################################################
+def compared(
+    title: str, old: Any, new: Any, display: Callable[[Any], Widget], kind: str
+) -> Horizontal:
+    """Make a side-by-side display of a value that is being compared.
+
+    Args:
+        title: The title of the value.
+        old: The value on the old side.
+        new: The value on the new side.
+        display: The type of widget to show each side with.
+        kind: The kind of difference between the sides.
+
+    Returns:
+        The side-by-side display.
+    """
+    return Horizontal(
+        Vertical(*widgets_for((title, old, display))),
+        Vertical(*widgets_for((title, new, display))),
+        classes=f"difference {kind}",
+    )
+
+
+##############################################################################
+class PackageComparison(TabPane):
+    """A tab pane that shows two packages, or releases, side by side."""
+
+    DEFAULT_CSS = """
+    PackageComparison {
+        #summary {
+            width: 1fr;
+            padding: 0 1 1 1;
+            color: $text-muted;
+        }
+        .difference, .difference > Vertical {
+            height: auto;
+        }
+        .difference > Vertical {
+            width: 1fr;
+        }
+        .added Title {
+            background: $success 40%;
+        }
+        .removed Title {
+            background: $error 40%;
+        }
+        .changed Title {
+            background: $warning 40%;
+        }
+        .only-differences .same {
+            display: none;
+        }
+    }
+    """
+
+    BINDINGS = [("o", "only_differences", "Only differences")]
+
+    def __init__(self, comparison: Comparison) -> None:
+        """Initialise the comparison pane.
+
+        Args:
+            comparison: The comparison to show.
+        """
+        super().__init__("Compare", id="compare")
+        self._comparison = comparison
+
+    def _summary(self) -> str:
+        """Summarise the comparison.
+
+        Returns:
+            A summary of how much differs between the two sides.
+        """
+        fields = sum(
+            count for count in self._comparison.counts(self._comparison.fields).values()
+        )
+        requirements = self._comparison.counts(self._comparison.requirements)
+        return (
+            f"{fields} details differ; requirements: {requirements['added']} added, "
+            f"{requirements['removed']} removed, {requirements['changed']} changed"
+            " - [b]o[/] toggles showing only what differs"
+        )
+
+    def compose(self) -> ComposeResult:
+        """Compose the comparison display.
+
+        Returns:
+            The comparison layout.
+        """
+        comparison = self._comparison
+        with TabContent():
+            yield Label(self._summary(), id="summary")
+            for difference in comparison.fields:
+                yield compared(
+                    difference.title,
+                    difference.old,
+                    difference.new,
+                    Value,
+                    difference.kind,
+                )
+            for title, differences in (
+                ("Requires", comparison.requirements),
+                ("Classifiers", comparison.classifiers),
+            ):
+                counts = comparison.counts(differences)
+                yield compared(
+                    title,
+                    marked_lines(differences, "old"),
+                    marked_lines(differences, "new"),
+                    Value,
+                    "changed" if any(counts.values()) else "same",
+                )
+
+    def action_only_differences(self) -> None:
+        """Toggle showing only the values that differ."""
+        self.query_one(TabContent).toggle_class("only-differences")
+
+
 ##############################################################################
 class PackageInformation(TabbedContent):
     """A widget for showing information about a PyPI package."""
@@ -353,12 +926,54 @@ class PackageInformation(TabbedContent):
         ("up, down, home, end, pageup, pagedown", "focus_details"),
     ]
 
+    async def _show_package(self, package: Package, releases: bool = True) -> None:
+        """Populate the display with the given package's data.
+
+        Args:
+            package: The package to show.
+            releases: Should the release history pane be added?
+
+        Note:
+            If the release history pane isn't added, the other panes are
+            placed ahead of any that is already being shown.
+        """
+        before = None if releases else "releases"
+        with tracer().span("compose", "ui", package=package.name):
+            await self.add_pane(PackageDetails(package), before=before)
+            if package.description.strip():
+                await self.add_pane(PackageDescription(package), before=before)
+            if package.requires_dist:
+                await self.add_pane(PackageDependencies(package), before=before)
+            if package.urls:
+                await self.add_pane(PackageFiles(package), before=before)
+            if releases:
+                await self.add_pane(PackageReleases(package))
+
+    def _select(self, tab: str) -> None:
+        """Select the given tab, if it exists.
+
+        Args:
+            tab: The ID of the tab to select.
+        """
+        if tab and self.query(f"TabPane#{tab}"):
+            self.active = tab
+
+    @work(group="prefetch", exclusive=True)
+    async def _prefetch(self, package: Package) -> None:
+        """Prefetch the packages the user is likely to look at next.
+
+        Args:
+            package: The package being viewed.
+        """
+        await prefetch(prefetch_candidates(package))
+
     @work(exclusive=True)
-    async def show(self, package_name: str) -> bool:
+    async def show(self, package_name: str, tab: str = "") -> bool:
         """Show the package information for the given package.
 
         Args:
             package_name: The name of the package to lookup and show
+            tab: The ID of the tab to show, if available.
 
         Returns:
             `True` if the package was found, `False` if not.
@@ -371,29 +986,172 @@ class PackageInformation(TabbedContent):
         # Mark that there's content now.
         self.set_class(True, "content")
 
-        # Show we're loading.
-        self.loading = True
+        # Stop any prefetching that's going on; the user has moved on.
+        self.workers.cancel_group(self, "prefetch")
 
         # Clear any existing content.
-        self.clear_panes()
+        await self.clear_panes()
+
+        # If we already have data for the package to hand, show it right
+        # away while we check that it is still current. If what we have
+        # can't be decoded, it's as good as not having it.
+        try:
+            cached = await Package.from_cache(package_name)
+        except ValueError:
+            cached = None
+        if cached is not None:
+            await self._show_package(cached)
+            self._select(tab)
+        else:
+            self.loading = True
 
         # Download the data for the package.
-        found, package = await Package.from_pypi(package_name)
-
-        if found:
-            self.add_pane(PackageDetails(package))
-            if package.description.strip():
-                self.add_pane(PackageDescription(package))
-            for url in package.urls:
-                self.add_pane(PackageURLDetails(url))
-        else:
-            self.add_pane(PackageUnknown(package_name))
+        with tracer().span("lookup", "ui", package=package_name):
+            try:
+                found, package = await Package.from_pypi(package_name)
+            except (httpx.HTTPError, ValueError) as error:
+                # Leave whatever is being shown where it is; it's better
+                # than nothing.
+                self.loading = False
+                self.notify(
+                    f"{package_name} could not be looked up: {error}",
+                    title="Lookup",
+                    severity="error",
+                )
+                return False
+
+        # Only redraw if what we got differs from what we're showing.
+        if not found:
+            await self.clear_panes()
+            await self.add_pane(
+                PackageUnknown(
+                    package_name,
+                    [
+                        name
+                        for name in names().suggest(package_name, 6)
+                        if name != normalise(package_name)
+                    ][:5],
+                )
+            )
+        elif package != cached:
+            await self.clear_panes()
+            await self._show_package(package)
+            self._select(tab)
 
         # We're all done now.
         self.loading = False
 
+        # Warm up the caches for where the user is likely to go next.
+        if found:
+            self._prefetch(package)
+
         return found
 
+    @work(exclusive=True)
+    async def compare(self, old: str, new: str) -> bool:
+        """Show two packages, or two releases of a package, side by side.
+
+        Args:
+            old: The spec of the package to show on the old side.
+            new: The spec of the package to show on the new side.
+
+        Returns:
+            `True` if both packages were found, `False` if not.
+
+        Note:
+            Each spec is a package name, optionally followed by `@` and the
+            version to compare. Both packages are fetched at once.
+        """
+        if not (old.strip() and new.strip()):
+            return False
+        self.set_class(True, "content")
+        self.workers.cancel_group(self, "prefetch")
+        await self.clear_panes()
+        self.loading = True
+        with tracer().span("compare", "ui", old=old, new=new):
+            try:
+                (old_found, old_package), (new_found, new_package) = await gather(
+                    Package.from_pypi(*split_spec(old)),
+                    Package.from_pypi(*split_spec(new)),
+                )
+            except (httpx.HTTPError, ValueError) as error:
+                self.loading = False
+                self.notify(
+                    f"{old} and {new} could not be compared: {error}",
+                    title="Compare",
+                    severity="error",
+                )
+                return False
+        self.loading = False
+        if not (old_found and new_found):
+            await self.add_pane(PackageUnknown(new if old_found else old))
+            return False
+        await self.add_pane(
+            PackageComparison(compare_packages(old_package, new_package))
+        )
+        return True
+
+    @on(PackageReleases.Compare)
+    def compare_releases(self, event: PackageReleases.Compare) -> None:
+        """Handle a request to compare two releases of a package.
+
+        Args:
+            event: The release comparison event.
+        """
+        self.compare(
+            f"{event.package}@{event.shown}", f"{event.package}@{event.version}"
+        )
+
+    @on(PackageReleases.Selected)
+    def release_selected(self, event: PackageReleases.Selected) -> None:
+        """Handle a release being selected for viewing.
+
+        Args:
+            event: The release selection event.
+        """
+        self.show_release(event.package, event.version)
+
+    @work(exclusive=True)
+    async def show_release(self, package_name: str, version: str) -> bool:
+        """Show the package information for a given release of a package.
+
+        Args:
+            package_name: The name of the package.
+            version: The version of the package to show.
+
+        Returns:
+            `True` if the release was found, `False` if not.
+
+        Note:
+            The release history pane is left as it is, so that the user can
+            carry on browsing through the releases.
+        """
+        self.workers.cancel_group(self, "prefetch")
+        self.loading = True
+        try:
+            found, package = await Package.from_pypi(package_name, version)
+        except (httpx.HTTPError, ValueError) as error:
+            self.notify(
+                f"Version {version} of {package_name} could not be looked up: {error}",
+                severity="error",
+            )
+            return False
+        finally:
+            self.loading = False
+        if not found:
+            self.notify(
+                f"Version {version} of {package_name} could not be found",
+                severity="error",
+            )
+            return False
+        for pane in list(self.query(TabPane)):
+            if pane.id is not None and pane.id != "releases":
+                await self.remove_pane(pane.id)
+        await self._show_package(package, releases=False)
+        self.query_one(PackageReleases).show_version(version)
+        self.active = "details"
+        return True
+
     @on(TabContent.GoLeft)
     async def tab_leftward(self) -> None:
         """Handle a request to move leftward."""
@@ -408,7 +1166,7 @@ class PackageInformation(TabbedContent):
         """Handle a request to ensure the content is focused."""
         if self.active_pane is not None and self.screen.focused == self.query_one(Tabs):
             try:
-                self.active_pane.query_one(TabContent).focus()
+                self.active_pane.query("TabContent, DataTable, Tree").first().focus()
             except NoMatches:
                 pass
 
@@ -0,0 +1,142 @@
+"""Widgets for entering the name of a package, with completion."""
+
+##############################################################################
+# Textual imports.
+from textual import on
+from textual.binding import Binding
+from textual.suggester import Suggester
+from textual.widgets import Input, OptionList
+from textual.widgets.option_list import Option
+
+##############################################################################
+# Local imports.
+from ..data import names, normalise
+
+
+##############################################################################
+class NameSuggester(Suggester):
+    """Suggests the completion of a package name from the local name index."""
+
+    def __init__(self) -> None:
+        """Initialise the suggester."""
+        # The index can be loaded, or refreshed, at any time, so don't hang
+        # on to suggestions made before it was.
+        super().__init__(use_cache=False, case_sensitive=True)
+
+    async def get_suggestion(self, value: str) -> str | None:
+        """Get a completion for a partial package name.
+
+        Args:
+            value: The partial package name.
+
+        Returns:
+            The completed name, or `None` if there's nothing to suggest.
+
+        Note:
+            The completion keeps what has been typed as it was typed, so
+            `Typing_Ex` is completed as `Typing_Extensions`.
+        """
+        if (name := names().complete(value)) is None:
+            return None
+        if len(normalise(value)) != len(value):
+            return None
+        return value + name[len(value) :]
+
+
+##############################################################################
+class PackageNameInput(Input):
+    """An input for the name of a package."""
+
+    BINDINGS = [Binding("down", "suggestions", "Suggestions", show=False)]
+
+    LOOKUP_PLACEHOLDER = (
+        "Name of the package to look up in PyPI (or two, such as pkg@1.0 pkg@2.0, "
+        "to compare them)"
+    )
+    """The placeholder for when a package name is being entered."""
+
+    SEARCH_PLACEHOLDER = "Text to search for in the packages in the local store"
+    """The placeholder for when the local store is being searched."""
+
+    def __init__(self) -> None:
+        """Initialise the input."""
+        super().__init__(placeholder=self.LOOKUP_PLACEHOLDER, suggester=NameSuggester())
+
+    def search_mode(self, searching: bool) -> None:
+        """Switch between entering a package name and searching.
+
+        Args:
+            searching: Is the local store being searched?
+        """
+        self.placeholder = (
+            self.SEARCH_PLACEHOLDER if searching else self.LOOKUP_PLACEHOLDER
+        )
+        # Completing package names would only get in the way of a search.
+        self.suggester = None if searching else NameSuggester()
+
+    def action_suggestions(self) -> None:
+        """Move to the list of suggested names or results, if it's showing."""
+        for suggestions in self.screen.query("NameSuggestions, SearchResults"):
+            if suggestions.display and isinstance(suggestions, OptionList):
+                suggestions.highlighted = 0
+                suggestions.focus()
+                return
+
+
+##############################################################################
+class NameSuggestions(OptionList):
+    """A list of suggested package names."""
+
+    DEFAULT_CSS = """
+    NameSuggestions {
+        display: none;
+        height: auto;
+        max-height: 10;
+        border: none;
+        border-bottom: solid $foreground 20%;
+        background: $panel;
+        &:focus {
+            border: none;
+            border-bottom: solid $foreground 30%;
+        }
+    }
+    """
+
+    BINDINGS = [Binding("escape", "dismiss", "Dismiss", show=False)]
+
+    SUGGESTIONS = 8
+    """The most names to suggest."""
+
+    def suggest_for(self, text: str) -> None:
+        """Show the suggested names for some text.
+
+        Args:
+            text: The text to suggest names for.
+
+        Note:
+            If the only suggestion is the text itself there's nothing worth
+            showing, so the suggestions are hidden.
+        """
+        suggestions = names().suggest(text, self.SUGGESTIONS)
+        if suggestions == [normalise(text.strip())]:
+            suggestions = []
+        self.set_options(Option(name, id=name) for name in suggestions)
+        self.display = bool(suggestions)
+
+    def hide(self) -> None:
+        """Hide the suggestions."""
+        self.clear_options()
+        self.display = False
+
+    def action_dismiss(self) -> None:
+        """Dismiss the suggestions and go back to the input."""
+        self.hide()
+        self.screen.query_one(PackageNameInput).focus()
+
+    @on(OptionList.OptionSelected)
+    def _hide_on_selection(self) -> None:
+        """Hide the suggestions once one has been picked."""
+        self.call_after_refresh(self.hide)
+
+
+### package_name.py ends here
@@ -0,0 +1,94 @@
+"""A widget for showing the results of searching the local package store."""
+
+##############################################################################
+# Rich imports.
+from rich.text import Text
+
+##############################################################################
+# Textual imports.
+from textual import on
+from textual.binding import Binding
+from textual.widgets import OptionList
+from textual.widgets.option_list import Option
+
+##############################################################################
+# Local imports.
+from ..data import SearchResult, package_store
+from .package_name import PackageNameInput
+
+
+##############################################################################
+class SearchResults(OptionList):
+    """A list of the packages in the local store that match a search."""
+
+    DEFAULT_CSS = """
+    SearchResults {
+        display: none;
+        height: auto;
+        max-height: 50%;
+        border: none;
+        border-bottom: solid $foreground 20%;
+        background: $panel;
+        &:focus {
+            border: none;
+            border-bottom: solid $foreground 30%;
+        }
+    }
+    """
+
+    BINDINGS = [Binding("escape", "dismiss", "Dismiss", show=False)]
+
+    RESULTS = 50
+    """The most results to show."""
+
+    @staticmethod
+    def _prompt(result: SearchResult) -> Text:
+        """Make the prompt for a search result.
+
+        Args:
+            result: The search result.
+
+        Returns:
+            The prompt.
+        """
+        return Text.assemble(
+            (result.name, "bold"),
+            " ",
+            (result.version, "dim"),
+            "\n",
+            result.summary or "No summary",
+        )
+
+    def search_for(self, text: str) -> None:
+        """Show the packages that match some text.
+
+        Args:
+            text: The text to search for.
+        """
+        if not text.strip():
+            self.hide()
+            return
+        results = package_store().search(text, self.RESULTS)
+        self.set_options(
+            [Option(self._prompt(result), id=result.name) for result in results]
+            or [Option("No packages in the local store match", disabled=True)]
+        )
+        self.display = True
+
+    def hide(self) -> None:
+        """Hide the search results."""
+        self.clear_options()
+        self.display = False
+
+    def action_dismiss(self) -> None:
+        """Dismiss the search results and go back to the input."""
+        self.hide()
+        self.screen.query_one(PackageNameInput).focus()
+
+    @on(OptionList.OptionSelected)
+    def _hide_on_selection(self) -> None:
+        """Hide the search results once one has been picked."""
+        self.call_after_refresh(self.hide)
+
+
+### package_search.py ends here
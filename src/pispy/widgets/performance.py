@@ -0,0 +1,126 @@
+"""A panel for showing where the application has been spending its time."""
+
+##############################################################################
+# Rich imports.
+from rich.text import Text
+
+##############################################################################
+# Textual imports.
+from textual.app import ComposeResult
+from textual.containers import Vertical
+from textual.widgets import DataTable, Label
+
+##############################################################################
+# Local imports.
+from ..data import Span, metrics, tracer
+
+
+##############################################################################
+class PerformancePanel(Vertical):
+    """A panel that shows the most recent timing spans, and the counts."""
+
+    DEFAULT_CSS = """
+    PerformancePanel {
+        display: none;
+        dock: bottom;
+        height: 40%;
+        border-top: solid $foreground 20%;
+        background: $panel;
+        #counts {
+            width: 1fr;
+            padding: 0 1;
+            color: $text-muted;
+        }
+        DataTable {
+            height: 1fr;
+        }
+    }
+    """
+
+    COLUMNS = (
+        ("Started", "start"),
+        ("Span", "name"),
+        ("Category", "category"),
+        ("Lane", "lane"),
+        ("ms", "duration"),
+        ("Details", "args"),
+    )
+    """The columns of the span table."""
+
+    SHOWN = 200
+    """The number of the most recent spans to show."""
+
+    UPDATE_INTERVAL = 1.0
+    """The time, in seconds, between updates of the panel while it's shown."""
+
+    def __init__(self) -> None:
+        """Initialise the panel."""
+        super().__init__()
+        self._latest: Span | None = None
+
+    def compose(self) -> ComposeResult:
+        """Compose the panel.
+
+        Returns:
+            The panel's layout.
+        """
+        yield Label(id="counts")
+        yield DataTable[str | Text](cursor_type="row", zebra_stripes=True)
+
+    def on_mount(self) -> None:
+        """Set up the panel once it is mounted."""
+        table = self.query_one(DataTable)
+        for title, key in self.COLUMNS:
+            table.add_column(title, key=key)
+        self._updater = self.set_interval(
+            self.UPDATE_INTERVAL, self._update, pause=True
+        )
+
+    def toggle(self) -> None:
+        """Toggle showing the panel."""
+        self.display = not self.display
+        if self.display:
+            self._latest = None
+            self._update()
+            self._updater.resume()
+        else:
+            self._updater.pause()
+
+    @staticmethod
+    def _details(span: Span) -> str:
+        """Describe the details of a span.
+
+        Args:
+            span: The span to describe.
+
+        Returns:
+            The details of the span.
+        """
+        return " ".join(f"{name}={value}" for name, value in span.args.items())
+
+    def _update(self) -> None:
+        """Update the panel with the latest counts and spans."""
+        self.query_one("#counts", Label).update(
+            "  ".join(
+                f"{name}: {count:,}" for name, count in metrics().snapshot().items()
+            )
+            or "Nothing counted yet"
+        )
+        spans = list(tracer().recent)[-self.SHOWN :]
+        if not spans or spans[-1] is self._latest:
+            return
+        self._latest = spans[-1]
+        table = self.query_one(DataTable)
+        table.clear()
+        for span in reversed(spans):
+            table.add_row(
+                f"{span.start:.3f}",
+                span.name,
+                span.category,
+                span.lane,
+                Text(f"{span.duration * 1000:,.1f}", justify="right"),
+                self._details(span),
+            )
+
+
+### performance.py ends here
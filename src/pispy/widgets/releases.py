@@ -0,0 +1,226 @@
+"""A pane for browsing the release history of a PyPI package."""
+
+##############################################################################
+# httpx imports.
+import httpx
+
+##############################################################################
+# Rich imports.
+from rich.text import Text
+
+##############################################################################
+# Textual imports.
+from textual import on, work
+from textual.app import ComposeResult
+from textual.message import Message
+from textual.widgets import DataTable, TabbedContent, TabPane
+
+##############################################################################
+# Local imports.
+from ..data import Package, Release, load_releases, prefetch_releases
+
+
+##############################################################################
+class PackageReleases(TabPane):
+    """A tab pane that shows every release of a package."""
+
+    DEFAULT_CSS = """
+    PackageReleases DataTable {
+        height: 1fr;
+    }
+    """
+
+    COLUMNS = (
+        ("", "shown"),
+        ("Version", "version"),
+        ("Uploaded", "uploaded"),
+        ("Yanked", "yanked"),
+        ("Files", "files"),
+        ("Size", "size"),
+    )
+    """The columns of the release table."""
+
+    BINDINGS = [("equals_sign", "compare", "Compare")]
+
+    PREFETCH_BEHIND = 5
+    """The number of releases above the cursor to prefetch."""
+
+    PREFETCH_AHEAD = 10
+    """The number of releases below the cursor to prefetch."""
+
+    class Selected(Message):
+        """Message sent when a release is selected for viewing."""
+
+        def __init__(self, package: str, version: str) -> None:
+            """Initialise the message.
+
+            Args:
+                package: The name of the package.
+                version: The version that was selected.
+            """
+            self.package = package
+            """The name of the package."""
+            self.version = version
+            """The version that was selected."""
+            super().__init__()
+
+    class Compare(Message):
+        """Message sent when two releases are to be compared."""
+
+        def __init__(self, package: str, shown: str, version: str) -> None:
+            """Initialise the message.
+
+            Args:
+                package: The name of the package.
+                shown: The version being viewed.
+                version: The version to compare it with.
+            """
+            self.package = package
+            """The name of the package."""
+            self.shown = shown
+            """The version being viewed."""
+            self.version = version
+            """The version to compare it with."""
+            super().__init__()
+
+    def __init__(self, package: Package) -> None:
+        """Initialise the releases pane.
+
+        Args:
+            package: The package to show the releases of.
+        """
+        super().__init__("Releases", id="releases")
+        self._package = package
+        self._shown = package.version
+        self._releases: list[Release] = []
+        self._loading = False
+
+    def compose(self) -> ComposeResult:
+        """Compose the releases display.
+
+        Returns:
+            The releases layout.
+        """
+        yield DataTable[str | Text](cursor_type="row", zebra_stripes=True)
+
+    def on_mount(self) -> None:
+        """Set up the release table once the pane is mounted."""
+        table = self.query_one(DataTable)
+        for title, key in self.COLUMNS:
+            table.add_column(title, key=key)
+
+    def on_show(self) -> None:
+        """Load the releases the first time they are shown."""
+        if not self._loading:
+            self._loading = True
+            self._load()
+
+    def _marker(self, version: str) -> str:
+        """Get the marker for a release.
+
+        Args:
+            version: The version of the release.
+
+        Returns:
+            The marker to show, which flags the release being viewed.
+        """
+        return "▶" if version == self._shown else ""
+
+    @work(exclusive=True)
+    async def _load(self) -> None:
+        """Load the releases and fill in the table."""
+        table = self.query_one(DataTable)
+        table.loading = True
+        try:
+            self._releases = await load_releases(self._package.name)
+        except (httpx.HTTPError, ValueError) as error:
+            self._loading = False
+            self.notify(str(error), title="Releases", severity="error")
+            return
+        finally:
+            table.loading = False
+        for release in self._releases:
+            table.add_row(
+                self._marker(release.version),
+                release.version,
+                release.uploaded[:16].replace("T", " "),
+                "Yes" if release.yanked else "",
+                Text(f"{release.files:,}", justify="right"),
+                Text(f"{release.size:,}", justify="right"),
+                key=release.version,
+            )
+        for ancestor in self.ancestors:
+            if isinstance(ancestor, TabbedContent):
+                ancestor.get_tab(self).label = f"Releases ({len(self._releases)})"
+                break
+        if self._shown in table.rows:
+            table.move_cursor(row=table.get_row_index(self._shown))
+
+    def show_version(self, version: str) -> None:
+        """Mark the given version as the one being viewed.
+
+        Args:
+            version: The version being viewed.
+        """
+        table = self.query_one(DataTable)
+        previous, self._shown = self._shown, version
+        for row in (previous, version):
+            if row in table.rows:
+                table.update_cell(row, "shown", self._marker(row))
+
+    @work(group="release-prefetch", exclusive=True)
+    async def _prefetch(self, row: int) -> None:
+        """Prefetch the releases around the given row.
+
+        Args:
+            row: The row the cursor is on.
+        """
+        await prefetch_releases(
+            self._package.name,
+            (
+                release.version
+                for release in self._releases[
+                    max(0, row - self.PREFETCH_BEHIND) : row + self.PREFETCH_AHEAD
+                ]
+            ),
+        )
+
+    @on(DataTable.RowHighlighted)
+    def prefetch_nearby(self, event: DataTable.RowHighlighted) -> None:
+        """Prefetch the releases near the highlighted release.
+
+        Args:
+            event: The row highlight event.
+        """
+        if self._releases:
+            self._prefetch(event.cursor_row)
+
+    @on(DataTable.RowSelected)
+    def select_release(self, event: DataTable.RowSelected) -> None:
+        """Request that the selected release be viewed.
+
+        Args:
+            event: The row selection event.
+        """
+        event.stop()
+        if self._releases:
+            self.post_message(
+                self.Selected(
+                    self._package.name, self._releases[event.cursor_row].version
+                )
+            )
+
+    def action_compare(self) -> None:
+        """Compare the highlighted release with the one being viewed."""
+        table = self.query_one(DataTable)
+        if self._releases and table.row_count:
+            self.post_message(
+                self.Compare(
+                    self._package.name,
+                    self._shown,
+                    self._releases[table.cursor_row].version,
+                )
+            )
+
+
+### releases.py ends here